@@ -2,8 +2,10 @@
 from .card_abstractor import (
     compute_ehs, compute_ehs2,
     preflop_bucket, postflop_bucket,
+    build_equity_clusters, load_equity_clusters,
     PREFLOP_BUCKETS, POSTFLOP_BUCKETS,
 )
+from .suit_isomorphism import canonical_hand_board
 from .infoset_encoder import (
     encode_infoset, abstract_action,
     ABSTRACT_ACTIONS, NUM_ACTIONS, ACTION_IDX,
@@ -0,0 +1,260 @@
+"""
+Tabla offline de buckets postflop en memoria mapeada.
+
+La caché LRU de postflop_bucket no cabe los millones de (mano, board)
+distintos que reparte MCCFR, así que el entrenamiento sigue pagando el
+cálculo del bucket en cada fallo. Esta tabla precalcula el bucket de todas
+las manos sobre todos los boards canónicos de una calle (1.755 flops,
+16.432 turns, 134.459 rivers) y lo guarda en un array uint8:
+
+    postflop_buckets_<calle>.npy   uint8 (n_boards, 1326)   – 255 = sin calcular
+    postflop_boards_<calle>.npy    int64 (n_boards,)        – clave de cada fila
+
+Hash perfecto
+-------------
+(mano, board) canónicos (suit_isomorphism) → fila × 1326 + combo:
+- fila  : clave del board = las 4 máscaras de rangos por palo, ordenadas de
+          mayor a menor y empaquetadas en 52 bits (invariante de palos);
+          un dict clave → fila construido al cargar.
+- combo : índice lexicográfico 0..1325 del par de cartas de la mano canónica.
+Sólo se calculan las manos canónicas de cada board (una por órbita).
+
+Tamaño: flop 2,3 MB, turn 22 MB, river 178 MB.
+
+Construcción
+------------
+    python abstracciones/bucket_table.py                     # flop
+    python abstracciones/bucket_table.py --streets flop turn --workers 16
+
+La tabla guarda el bucket que daba postflop_bucket al construirla (clusters
+EMD si existe equity_clusters.pkl, EHS² si no): hay que regenerarla si
+cambian los clusters o POSTFLOP_BUCKETS.
+"""
+
+import os
+import sys
+import time
+from itertools import combinations
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from abstracciones.suit_isomorphism import canonical_hand_board
+from cache_metrics import estimate_bytes, register
+
+STREETS  = {'flop': 3, 'turn': 4, 'river': 5}
+EMPTY    = 255
+N_COMBOS = 1326
+
+TABLE_DIR = os.path.dirname(os.path.abspath(__file__))
+_RANKS    = '23456789TJQKA'
+_SUITS    = 'shdc'
+_CARD2INT = {r + s: i * 4 + j for i, r in enumerate(_RANKS) for j, s in enumerate(_SUITS)}
+_INT2CARD = {v: k for k, v in _CARD2INT.items()}
+
+
+def table_paths(street):
+    """(ruta de buckets, ruta de claves de board) de una calle ('flop', 'turn', 'river')."""
+    return (os.path.join(TABLE_DIR, f'postflop_buckets_{street}.npy'),
+            os.path.join(TABLE_DIR, f'postflop_boards_{street}.npy'))
+
+
+# ── Hash perfecto ─────────────────────────────────────────────────────────────
+
+def _combo_index(a, b):
+    """Índice lexicográfico de la pareja de cartas a < b (0..1325)."""
+    return a * (103 - a) // 2 + b - a - 1
+
+
+def board_key(board):
+    """Clave invariante de palos de un board: máscaras por palo ordenadas, en 52 bits."""
+    masks = [0, 0, 0, 0]
+    for c in board:
+        masks[_SUITS.index(c[1])] |= 1 << _RANKS.index(c[0])
+    m = sorted(masks, reverse=True)
+    return (m[0] << 39) | (m[1] << 26) | (m[2] << 13) | m[3]
+
+
+def _decode_board(key):
+    """Board canónico (palos ordenados por máscara) de una clave."""
+    cards = []
+    for i in range(4):
+        mask = (int(key) >> (13 * (3 - i))) & 0x1FFF
+        cards += [_RANKS[r] + _SUITS[i] for r in range(13) if mask >> r & 1]
+    return tuple(sorted(cards))
+
+
+def canonical_board_keys(n_cards):
+    """Claves ordenadas de todos los boards canónicos de n_cards cartas."""
+    boards = np.array(list(combinations(range(52), n_cards)), dtype=np.int8)
+    bits   = 1 << (boards.astype(np.int64) >> 2)
+    masks  = np.stack([np.where((boards & 3) == s, bits, 0).sum(axis=1) for s in range(4)],
+                      axis=1)
+    masks  = -np.sort(-masks, axis=1)
+    return np.unique((masks[:, 0] << 39) | (masks[:, 1] << 26) | (masks[:, 2] << 13) | masks[:, 3])
+
+
+# ── Construcción ──────────────────────────────────────────────────────────────
+
+def _board_rows(keys):
+    """Tarea del pool: filas de buckets de una lista de claves de board."""
+    from abstracciones.card_abstractor import _compute_postflop_buckets_batch
+    rows = np.full((len(keys), N_COMBOS), EMPTY, dtype=np.uint8)
+    for i, key in enumerate(keys):
+        board = _decode_board(key)
+        used  = {_CARD2INT[c] for c in board}
+        hands, cols = [], []
+        for a, b in combinations(range(52), 2):
+            if a in used or b in used:
+                continue
+            hand = (_INT2CARD[a], _INT2CARD[b])
+            if canonical_hand_board(hand, board)[0] != tuple(sorted(hand)):
+                continue                              # otra mano de la órbita
+            hands.append(tuple(sorted(hand)))
+            cols.append(_combo_index(a, b))
+        rows[i, cols] = _compute_postflop_buckets_batch(hands, board)
+    return rows
+
+
+def build_table(street='flop', workers=None, chunk=8, limit=None, verbose=True):
+    """
+    Calcula la tabla de una calle repartiendo los boards canónicos entre procesos.
+
+    Parámetros
+    ----------
+    street  : str        – 'flop', 'turn' o 'river'
+    workers : int | None – procesos (None = os.cpu_count())
+    chunk   : int        – boards por tarea
+    limit   : int | None – sólo los primeros `limit` boards (pruebas)
+
+    Retorna
+    -------
+    int – boards calculados
+    """
+    from multiprocessing import Pool
+
+    keys = canonical_board_keys(STREETS[street])
+    if limit is not None:
+        keys = keys[:limit]
+    path_b, path_k = table_paths(street)
+    tmp   = path_b + '.tmp.npy'
+    table = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.uint8,
+                                      shape=(len(keys), N_COMBOS))
+    tasks   = [(s, keys[s:s + chunk]) for s in range(0, len(keys), chunk)]
+    workers = workers or os.cpu_count() or 1
+    t0      = time.time()
+    with Pool(workers) as pool:
+        for n, (start, rows) in enumerate(pool.imap_unordered(_start_rows, tasks), 1):
+            table[start:start + len(rows)] = rows
+            if verbose and (n % 20 == 0 or n == len(tasks)):
+                print(f"  {street}: {n}/{len(tasks)} bloques  ({time.time() - t0:.0f}s)")
+    table.flush()
+    del table
+    np.save(path_k, keys)
+    os.replace(tmp, path_b)
+    unload()
+    return len(keys)
+
+
+def _start_rows(args):
+    start, keys = args
+    return start, _board_rows(keys)
+
+
+# ── Carga y consulta ──────────────────────────────────────────────────────────
+
+_tables: dict = {}        # n_cards → (buckets memmap, {clave: fila}) | None
+_lookups = {'hits': 0, 'misses': 0}
+
+
+def _load(n_cards):
+    street = next(s for s, n in STREETS.items() if n == n_cards)
+    path_b, path_k = table_paths(street)
+    try:
+        buckets = np.load(path_b, mmap_mode='r')
+        keys    = np.load(path_k)
+    except (OSError, ValueError):
+        return None
+    if buckets.dtype != np.uint8 or buckets.shape != (len(keys), N_COMBOS):
+        return None
+    return buckets, dict(zip(keys.tolist(), range(len(keys))))
+
+
+def lookup(hand_t, board_t):
+    """
+    Bucket precalculado de (mano, board) canónicos, o None si la calle no
+    tiene tabla o la entrada no está calculada.
+    """
+    n = len(board_t)
+    if n not in _tables:
+        _tables[n] = _load(n) if n in STREETS.values() else None
+    table = _tables[n]
+    if table is None:
+        return None
+    row = table[1].get(board_key(board_t))
+    if row is None:
+        _lookups['misses'] += 1
+        return None
+    a, b = sorted((_CARD2INT[hand_t[0]], _CARD2INT[hand_t[1]]))
+    v = table[0][row, _combo_index(a, b)]
+    if v == EMPTY:
+        _lookups['misses'] += 1
+        return None
+    _lookups['hits'] += 1
+    return int(v)
+
+
+def available(street='flop'):
+    """True si la tabla de la calle existe y tiene el formato esperado."""
+    n = STREETS[street]
+    if n not in _tables:
+        _tables[n] = _load(n)
+    return _tables[n] is not None
+
+
+def unload():
+    """Olvida las tablas cargadas; la siguiente consulta vuelve a leer el disco."""
+    _tables.clear()
+
+
+def stats():
+    """
+    Métricas de las tablas cargadas para el registro de cache_metrics: filas
+    (boards), consultas resueltas y no resueltas (sólo calles con tabla) y
+    bytes = array mapeado + dict de claves. Sin expulsiones ni latencia: un
+    fallo cae en la caché LRU de card_abstractor, que mide su coste.
+    """
+    loaded = [t for t in _tables.values() if t is not None]
+    total  = _lookups['hits'] + _lookups['misses']
+    return {
+        'size'    : sum(len(t[1]) for t in loaded),
+        'hits'    : _lookups['hits'],
+        'misses'  : _lookups['misses'],
+        'hit_rate': _lookups['hits'] / total if total else 0.0,
+        'bytes'   : sum(t[0].nbytes + estimate_bytes(t[1]) for t in loaded),
+    }
+
+
+def reset_stats():
+    _lookups.update(hits=0, misses=0)
+
+
+register('bucket_table', stats, reset_stats)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Construye la tabla offline de buckets postflop')
+    parser.add_argument('--streets', nargs='+', choices=list(STREETS), default=['flop'],
+                        help='Calles a construir (default: flop)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Procesos paralelos (default: todos los núcleos)')
+    parser.add_argument('--limit', type=int, default=None,
+                        help='Sólo los primeros N boards canónicos (pruebas)')
+    args = parser.parse_args()
+
+    for street in args.streets:
+        t0 = time.time()
+        n  = build_table(street, workers=args.workers, limit=args.limit)
+        print(f"Tabla {street}: {n} boards en '{table_paths(street)[0]}'  ({time.time() - t0:.0f}s)")
@@ -13,15 +13,21 @@ Referencia: Johanson et al. (2013) "Measuring the size of large no-limit poker g
 
 Caché
 -----
-- preflop_bucket: caché dict keyed por forma canónica  (169 entradas máx.)
+- preflop_bucket: caché LRU keyed por forma canónica  (169 entradas máx.),
+  precargada con la tabla exacta de preflop_ehs.json.
 - postflop_bucket: caché LRU de 32.768 entradas keyed por (hand_tuple, board_tuple).
   Las llamadas repetidas dentro del mismo árbol CFR — mismo deal, distintas
   ramas — retornan instantáneamente en O(1) sin ninguna simulación Monte Carlo.
+- postflop_bucket_batch: todas las manos pedidas de un board en una llamada,
+  con runouts y rivales compartidos; rellena la misma caché LRU.
+- enable_shared_bucket_cache (opcional, también con POKER_SHARED_BUCKETS):
+  segundo nivel tras la LRU en memoria compartida entre los procesos de la
+  máquina (shared_buckets.py).
 """
 
 import sys
 import os
-from functools import lru_cache
+import time
 from itertools import combinations as _combinations
 
 import numpy as np
@@ -29,6 +35,11 @@ import numpy as np
 # Asegurar que simulacion/ está en el path aunque se importe desde cfr/
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from abstracciones import bucket_table
+from abstracciones.preflop_ehs import load_preflop_ehs
+from cache_metrics import LRUCache, register, unregister
+from abstracciones.suit_isomorphism import canonical_hand_board
+
 PREFLOP_BUCKETS  = 10
 POSTFLOP_BUCKETS = 16
 
@@ -99,8 +110,148 @@ def _eval5_batch(batch: np.ndarray) -> np.ndarray:
     return cat * (13 ** 5) + kicker
 
 
+# ── Evaluador directo de 5-7 cartas (histogramas de rangos + máscaras de bits) ─
+
+_POW13     = 13 ** np.arange(5, dtype=np.int64)
+_RANK_BITS = 1 << np.arange(13, dtype=np.int64)
+_HIGHBIT   = np.array([x.bit_length() - 1 for x in range(1 << 14)], dtype=np.int64)
+_POPCOUNT  = np.array([bin(x).count('1') for x in range(1 << 13)], dtype=np.int64)
+# Kicker de la rueda tal y como lo calcula _eval5_batch: rangos [0,1,2,3,-1]
+_WHEEL_KICKER = int(np.dot([0, 1, 2, 3, -1], _POW13))
+
+
+def _straight_low(mask):
+    """
+    Rango más bajo de la mejor escalera contenida en la máscara de 13 bits.
+    -1 = rueda (A-2-3-4-5), -2 = sin escalera.
+    """
+    ext = (mask << 1) | ((mask >> 12) & 1)          # bit 0 = As como carta baja
+    run = ext & (ext >> 1) & (ext >> 2) & (ext >> 3) & (ext >> 4)
+    return _HIGHBIT[run] - 1
+
+
+def _top_bits(mask, k):
+    """Índices de los k bits más altos de cada máscara → (M, k), descendente."""
+    out = np.empty((len(mask), k), dtype=np.int64)
+    m   = mask.copy()
+    for j in range(k):
+        out[:, j] = _HIGHBIT[m]
+        m &= ~(1 << out[:, j])
+    return out
+
+
+def _eval_direct_batch(cards: np.ndarray) -> np.ndarray:
+    """
+    Mejor mano de 5 entre 5-7 cartas, sin expandir las C(n,5) combinaciones.
+
+    Calcula la categoría a partir del histograma de rangos (N, 13), los conteos
+    de palo y máscaras de bits (escaleras por AND de desplazamientos, top-k por
+    tabla de bit más alto), elige las 5 cartas de la mejor mano y las codifica
+    igual que _eval5_batch. Los valores son idénticos a los de
+    max(_eval5_batch(subconjunto)) sobre los 21 subconjuntos, con memoria
+    O(N × 13) en lugar de O(N × 21 × 5).
+
+    Parámetros
+    ----------
+    cards : np.ndarray shape (N, n), n = 5..7 – enteros de carta [0..51]
+
+    Retorna
+    -------
+    np.ndarray int64 (N,)  – mayor = mejor mano
+    """
+    cards = cards.astype(np.int64)
+    N     = cards.shape[0]
+    r     = cards >> 2
+    s     = cards & 3
+    rows  = np.arange(N)[:, None]
+
+    cnt  = np.bincount((r + 13 * rows).ravel(), minlength=13 * N).reshape(N, 13)
+    scnt = np.bincount((s + 4 * rows).ravel(), minlength=4 * N).reshape(N, 4)
+    m1 = (cnt >= 1).astype(np.int64) @ _RANK_BITS
+    m2 = (cnt >= 2).astype(np.int64) @ _RANK_BITS
+    m3 = (cnt >= 3).astype(np.int64) @ _RANK_BITS
+    m4 = (cnt == 4).astype(np.int64) @ _RANK_BITS
+
+    is_flush = scnt.max(axis=1) >= 5
+    fsuit    = scnt.argmax(axis=1)
+    fmask    = np.where(s == fsuit[:, None], 1 << r, 0).sum(axis=1) * is_flush
+    sf_low   = np.where(is_flush, _straight_low(fmask), -2)
+    st_low   = _straight_low(m1)
+
+    cat = np.zeros(N, dtype=np.int64)
+    n2  = _POPCOUNT[m2]
+    cat[n2 >= 1]                          = 1
+    cat[n2 >= 2]                          = 2
+    cat[m3 != 0]                          = 3
+    cat[(st_low >= -1) & (cat < 4)]       = 4
+    cat[is_flush]                         = 5
+    cat[(m3 != 0) & (n2 >= 2)]            = 6
+    cat[m4 != 0]                          = 7
+    cat[sf_low >= -1]                     = 8
+
+    # 5 rangos de la mejor mano de cada fila (se ordenan al codificar)
+    five = np.zeros((N, 5), dtype=np.int64)
+    low  = np.where(cat == 8, sf_low, st_low)
+    run  = (cat == 8) | (cat == 4)
+    five[run] = low[run, None] + np.arange(5)
+
+    sel = cat == 7
+    if sel.any():
+        q = _HIGHBIT[m4[sel]]
+        five[sel, :4] = q[:, None]
+        five[sel, 4]  = _HIGHBIT[m1[sel] & ~(1 << q)]
+    sel = cat == 6
+    if sel.any():
+        t = _HIGHBIT[m3[sel]]
+        five[sel, :3] = t[:, None]
+        five[sel, 3:] = _HIGHBIT[m2[sel] & ~(1 << t)][:, None]
+    sel = cat == 5
+    if sel.any():
+        five[sel] = _top_bits(fmask[sel], 5)
+    sel = cat == 3
+    if sel.any():
+        t = _HIGHBIT[m3[sel]]
+        five[sel, :3] = t[:, None]
+        five[sel, 3:] = _top_bits(m1[sel] & ~(1 << t), 2)
+    sel = cat == 2
+    if sel.any():
+        pp = _top_bits(m2[sel], 2)
+        five[sel, 0:2] = pp[:, :1]
+        five[sel, 2:4] = pp[:, 1:]
+        five[sel, 4]   = _HIGHBIT[m1[sel] & ~(1 << pp[:, 0]) & ~(1 << pp[:, 1])]
+    sel = cat == 1
+    if sel.any():
+        p = _HIGHBIT[m2[sel]]
+        five[sel, :2] = p[:, None]
+        five[sel, 2:] = _top_bits(m1[sel] & ~(1 << p), 3)
+    sel = cat == 0
+    if sel.any():
+        five[sel] = _top_bits(m1[sel], 5)
+
+    kicker = np.sort(five, axis=1) @ _POW13
+    wheel  = run & (low == -1)
+    kicker[wheel] = _WHEEL_KICKER
+    value  = cat * (13 ** 5) + kicker
+
+    # Con el kicker negativo de la rueda, un trío alto de _eval5_batch puede
+    # valer más que la escalera A-5: se conserva ese orden para no mover buckets.
+    sel = wheel & (cat == 4) & (m3 != 0)
+    if sel.any():
+        t    = _HIGHBIT[m3[sel]]
+        trip = np.empty((sel.sum(), 5), dtype=np.int64)
+        trip[:, :3] = t[:, None]
+        trip[:, 3:] = _top_bits(m1[sel] & ~(1 << t), 2)
+        value[sel]  = np.maximum(value[sel], 3 * (13 ** 5) + np.sort(trip, axis=1) @ _POW13)
+    return value
+
+
 def _best_hand_batch(hole_i: np.ndarray, board_i: np.ndarray) -> np.ndarray:
     """Mejor mano de 5 entre hole+board para cada fila del batch."""
+    return _eval_direct_batch(np.concatenate([hole_i, board_i], axis=1))
+
+
+def _best_hand_batch_combos(hole_i: np.ndarray, board_i: np.ndarray) -> np.ndarray:
+    """Referencia: máximo de _eval5_batch sobre las C(n,5) combinaciones."""
     all_cards = np.concatenate([hole_i, board_i], axis=1)
     n = all_cards.shape[1]
     combos = np.array(list(_combinations(range(n), 5)), dtype=np.int8)
@@ -110,18 +261,129 @@ def _best_hand_batch(hole_i: np.ndarray, board_i: np.ndarray) -> np.ndarray:
     return scores.max(axis=1)
 
 
-# ── EHS vectorizado ───────────────────────────────────────────────────────────
+# ── Muestreo sin reemplazo ────────────────────────────────────────────────────
+
+# Un generador por proceso: crear uno por llamada cuesta más que muestrear, y
+# uno de módulo heredado por fork daría la misma secuencia en todos los hijos
+# (pools de build_equity_clusters, bucket_table, comparador...), así que se
+# vuelve a sembrar desde la entropía del sistema en cada hijo.
+_rng = np.random.default_rng()
+
+
+def _reseed_after_fork():
+    global _rng
+    _rng = np.random.default_rng()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reseed_after_fork)
+
+
+def _card_masks(cards_i):
+    """Máscara de 52 bits de cada fila: (N, k) enteros de carta → (N,) int64."""
+    return np.bitwise_or.reduce(np.int64(1) << cards_i.astype(np.int64), axis=1)
+
+
+def _sample_cards(avail, n_rows, k, rng):
+    """
+    n_rows muestras de k cartas distintas de avail, en una sola llamada:
+    argsort de una matriz aleatoria (n_rows, len(avail)) = una permutación
+    uniforme por fila, de la que se toman las k primeras posiciones.
+
+    Retorna
+    -------
+    np.ndarray (n_rows, k) del dtype de avail
+    """
+    order = np.argsort(rng.random((n_rows, len(avail))), axis=1)[:, :k]
+    return avail[order]
+
+
+# ── Equity exacta en river ────────────────────────────────────────────────────
+
+# Pares (i, j), i < j, de las 47 cartas que quedan fuera de un board de 5, y
+# para cada una de las 47 los 46 pares que la contienen
+_RIVER_PAIRS = np.array(list(_combinations(range(47), 2)), dtype=np.int64)
+_RIVER_CARD_PAIRS = np.array([np.nonzero((_RIVER_PAIRS == k).any(axis=1))[0] for k in range(47)])
+
+_river_cache = register(LRUCache(maxsize=1024, name='river_opponents'))
+
+
+def _river_opponents(board_t):
+    """
+    Fuerza de los 1.081 pares rivales de un board de river (tupla de enteros
+    ordenada). Cacheado: todas las manos del mismo board la comparten.
+
+    Retorna
+    -------
+    (pos, theirs, srt) – pos: índice 0..46 de cada carta fuera del board;
+                         theirs: valor por par; srt: theirs ordenado
+    """
+    hit = _river_cache.get(board_t)
+    if hit is not None:
+        return hit
+    t0      = time.perf_counter()
+    board_i = np.array(board_t, dtype=np.int8)
+    avail   = np.setdiff1d(np.arange(52, dtype=np.int8), board_i)
+    theirs  = _best_hand_batch(avail[_RIVER_PAIRS], np.broadcast_to(board_i, (len(_RIVER_PAIRS), 5)))
+    pos     = np.full(52, -1, dtype=np.int64)
+    pos[avail] = np.arange(len(avail))
+    out = (pos, theirs, np.sort(theirs))
+    _river_cache.put(board_t, out, cost=time.perf_counter() - t0)
+    return out
+
+
+def river_equity(holes, board_i):
+    """
+    Equity exacta en river de cada mano contra una mano rival uniforme.
+
+    Los 1.081 pares de cartas fuera del board se evalúan una vez por board
+    (_river_opponents); cada mano se compara con todos por búsqueda binaria
+    y se descuentan los 91 que tocan sus cartas, quedando los 990 posibles.
+    Sin muestreo: el resultado es determinista.
+
+    Parámetros
+    ----------
+    holes   : np.ndarray int8 (H, 2) – manos sin cartas del board
+    board_i : np.ndarray int8 (5,)
 
-def compute_ehs(hole, board, num_sims=300):
+    Retorna
+    -------
+    np.ndarray float64 (H,) – P(gana) + ½·P(empata)
+    """
+    board_i = np.asarray(board_i, dtype=np.int8)
+    holes   = np.asarray(holes, dtype=np.int8)
+    pos, theirs, srt = _river_opponents(tuple(sorted(board_i.tolist())))
+    mine    = _best_hand_batch(holes, np.broadcast_to(board_i, (len(holes), 5)))
+
+    below = np.searchsorted(srt, mine, side='left')
+    ties  = np.searchsorted(srt, mine, side='right') - below
+    score = below + 0.5 * ties
+
+    # Card removal: restar los pares que contienen alguna carta de la mano
+    # (el propio par (a, b) aparece en ambos grupos: se repone una vez)
+    a, b  = np.sort(pos[holes.astype(np.int64)], axis=1).T
+    group = theirs[np.concatenate([_RIVER_CARD_PAIRS[a], _RIVER_CARD_PAIRS[b]], axis=1)]
+    score -= ((group < mine[:, None]) + 0.5 * (group == mine[:, None])).sum(axis=1)
+    own    = theirs[a * (93 - a) // 2 + b - a - 1]
+    score += (own < mine) + 0.5 * (own == mine)
+    return score / 990.0
+
+
+def compute_ehs(hole, board, num_sims=300, rng=None):
     """
     Expected Hand Strength montecarlo vectorizado con NumPy.
     ~20x más rápido que la versión Python-pura, misma calidad estadística.
 
+    En river (5 cartas) no hay nada que muestrear: se enumeran las 990 manos
+    rivales posibles (river_equity) y el resultado es exacto; num_sims y rng
+    no se usan.
+
     Parámetros
     ----------
     hole     : list[str]  — 2 cartas del jugador
     board    : list[str]  — 0-5 cartas comunitarias visibles
     num_sims : int        — muestras Monte Carlo
+    rng      : np.random.Generator | None — None = generador del proceso
 
     Retorna
     -------
@@ -132,11 +394,11 @@ def compute_ehs(hole, board, num_sims=300):
     board_i   = known_i[2:]
     n_fill    = 5 - len(board)
 
-    avail = np.array([c for c in range(52) if c not in set(known_i.tolist())], dtype=np.int8)
-    rng   = np.random.default_rng()
+    if n_fill == 0:
+        return float(river_equity(hole_i[None, :], board_i)[0])
 
-    needed  = 2 + n_fill
-    samples = np.stack([rng.permutation(avail)[:needed] for _ in range(num_sims)])
+    avail   = np.setdiff1d(np.arange(52, dtype=np.int8), known_i)
+    samples = _sample_cards(avail, num_sims, 2 + n_fill, rng or _rng)
 
     opp_i      = samples[:, :2]
     fill_i     = samples[:, 2:]
@@ -154,7 +416,7 @@ def compute_ehs(hole, board, num_sims=300):
 
 # ── EHS² vectorizado ──────────────────────────────────────────────────────────
 
-def compute_ehs2(hole, board, num_sims=300):
+def compute_ehs2(hole, board, num_sims=300, rng=None):
     """
     EHS² = EHS + (1 - EHS) * ppot - EHS * npot  (Johanson et al. 2013)
 
@@ -167,23 +429,22 @@ def compute_ehs2(hole, board, num_sims=300):
     hole     : list[str]
     board    : list[str]  — 0-4 cartas (si len≥5 retorna EHS puro)
     num_sims : int
+    rng      : np.random.Generator | None — None = generador del proceso
 
     Retorna
     -------
     float en [0, 1]
     """
     if len(board) >= 5:
-        return compute_ehs(hole, board, num_sims)
+        return compute_ehs(hole, board, num_sims, rng)
 
     known_i = _cards_to_ints(hole + board)
     hole_i  = known_i[:2]
     board_i = known_i[2:]
     n_fill  = 5 - len(board)
 
-    avail   = np.array([c for c in range(52) if c not in set(known_i.tolist())], dtype=np.int8)
-    rng     = np.random.default_rng()
-    needed  = 2 + n_fill
-    samples = np.stack([rng.permutation(avail)[:needed] for _ in range(num_sims)])
+    avail   = np.setdiff1d(np.arange(52, dtype=np.int8), known_i)
+    samples = _sample_cards(avail, num_sims, 2 + n_fill, rng or _rng)
 
     opp_i     = samples[:, :2]
     fill_i    = samples[:, 2:]
@@ -227,9 +488,129 @@ def compute_ehs2(hole, board, num_sims=300):
     return max(0.0, min(1.0, ehs2))
 
 
+# ── EHS / EHS² por lotes: muchas manos, un board ─────────────────────────────
+
+def _oversample(n, m, k):
+    """
+    Muestras a sacar de m cartas para que, descartando las que tocan las 2
+    cartas de una mano, queden ~n válidas: n · C(m, k) / C(m-2, k).
+    """
+    from math import ceil, comb
+    return int(ceil(n * comb(m, k) / comb(m - 2, k)))
+
+
+def compute_ehs_batch(holes, board, num_sims=300, rng=None):
+    """
+    EHS de muchas manos sobre el mismo board con un único juego de muestras.
+
+    Los rivales y runouts se sacan del mazo sin el board y se comparten entre
+    todas las manos; cada mano descarta las muestras que tocan sus cartas
+    (card removal). Se sobremuestrea para que cada mano conserve ~num_sims.
+    En river es exacto (river_equity).
+
+    Parámetros
+    ----------
+    holes    : np.ndarray int8 (H, 2) – manos, ninguna con cartas del board
+    board    : np.ndarray int8 (0-5,)
+    num_sims : int – muestras válidas aproximadas por mano
+
+    Retorna
+    -------
+    np.ndarray float64 (H,)
+    """
+    board   = np.asarray(board, dtype=np.int8)
+    if len(board) >= 5:
+        return river_equity(holes, board)
+    rng     = rng or _rng
+    avail   = np.setdiff1d(np.arange(52, dtype=np.int8), board)
+    n_fill  = 5 - len(board)
+    S       = _oversample(num_sims, len(avail), 2 + n_fill)
+    samples = _sample_cards(avail, S, 2 + n_fill, rng)
+    valid   = (_card_masks(samples)[:, None] & _card_masks(holes)[None, :]) == 0   # (S, H)
+
+    full_b = np.concatenate([np.broadcast_to(board, (S, len(board))), samples[:, 2:]], axis=1)
+    H      = len(holes)
+    my     = _best_hand_batch(np.tile(holes, (S, 1)), np.repeat(full_b, H, axis=0)).reshape(S, H)
+    opp    = _best_hand_batch(samples[:, :2], full_b)[:, None]
+    score  = (my > opp) + 0.5 * (my == opp)
+    return (score * valid).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+
+
+def compute_ehs2_batch(holes, board, num_sims=300, rng=None):
+    """
+    EHS² (ver compute_ehs2) de muchas manos sobre el mismo board, con
+    muestras compartidas y card removal como compute_ehs_batch.
+
+    Parámetros
+    ----------
+    holes    : np.ndarray int8 (H, 2)
+    board    : np.ndarray int8 (0-5,) – con 5 cartas retorna EHS
+    num_sims : int
+
+    Retorna
+    -------
+    np.ndarray float64 (H,) en [0, 1]
+    """
+    board = np.asarray(board, dtype=np.int8)
+    if len(board) >= 5:
+        return compute_ehs_batch(holes, board, num_sims, rng)
+
+    rng     = rng or _rng
+    avail   = np.setdiff1d(np.arange(52, dtype=np.int8), board)
+    n_fill  = 5 - len(board)
+    S       = _oversample(num_sims, len(avail), 2 + n_fill)
+    samples = _sample_cards(avail, S, 2 + n_fill, rng)
+    valid   = (_card_masks(samples)[:, None] & _card_masks(holes)[None, :]) == 0   # (S, H)
+    n_valid = np.maximum(valid.sum(axis=0), 1)
+
+    H       = len(holes)
+    opp_i   = samples[:, :2]
+    full_b  = np.concatenate([np.broadcast_to(board, (S, len(board))), samples[:, 2:]], axis=1)
+    my_fut  = _best_hand_batch(np.tile(holes, (S, 1)), np.repeat(full_b, H, axis=0)).reshape(S, H)
+    opp_fut = _best_hand_batch(opp_i, full_b)[:, None]
+    if len(board) >= 3:
+        my_cur  = _best_hand_batch(holes, np.broadcast_to(board, (H, len(board))))[None, :]
+        opp_cur = _best_hand_batch(opp_i, np.broadcast_to(board, (S, len(board))))[:, None]
+    else:
+        my_cur  = np.zeros((1, H), dtype=np.int64)
+        opp_cur = np.zeros((S, 1), dtype=np.int64)
+
+    cur_ahead = (my_cur > opp_cur) & valid
+    cur_tie   = (my_cur == opp_cur) & valid
+    cur_behind= (my_cur < opp_cur) & valid
+    fut_win   = my_fut > opp_fut
+    fut_lose  = my_fut < opp_fut
+    fut_tie   = my_fut == opp_fut
+
+    ehs_cur = (cur_ahead.sum(axis=0) + 0.5 * cur_tie.sum(axis=0)) / n_valid
+
+    ppot_mask = cur_behind | cur_tie
+    ppot = ((ppot_mask & fut_win).sum(axis=0) + 0.5 * (ppot_mask & fut_tie).sum(axis=0)) \
+        / np.maximum(ppot_mask.sum(axis=0), 1)
+    npot_mask = cur_ahead | cur_tie
+    npot = ((npot_mask & fut_lose).sum(axis=0) + 0.5 * (npot_mask & fut_tie).sum(axis=0)) \
+        / np.maximum(npot_mask.sum(axis=0), 1)
+
+    return np.clip(ehs_cur + (1.0 - ehs_cur) * ppot - ehs_cur * npot, 0.0, 1.0)
+
+
 # ── Caché de EHS preflop ──────────────────────────────────────────────────────
 
-_preflop_ehs_cache: dict = {}
+# 169 formas canónicas: nunca expulsa
+_preflop_ehs_cache = register(LRUCache(maxsize=169, name='preflop_ehs'))
+
+
+def _class_canon(label):
+    """'AKs' → ('A', 'K', True); 'AKo' → ('A', 'K', False); 'AA' → ('A', 'A', False)."""
+    return (label[0], label[1], label.endswith('s'))
+
+
+# Tabla exacta distribuida con el código (abstracciones/preflop_ehs.json):
+# las 169 entradas quedan en la caché desde la importación.
+_shipped = load_preflop_ehs()
+if _shipped is not None:
+    for _c, _e in _shipped.items():
+        _preflop_ehs_cache.put(_class_canon(_c), _e)
 
 
 def _canonical_preflop(hand):
@@ -250,7 +631,10 @@ def preflop_bucket(hand, num_sims=300):
     Asigna un bucket 0..PREFLOP_BUCKETS-1 a una mano preflop.
     Bucket 0 = mano débil, bucket PREFLOP_BUCKETS-1 = mano fuerte.
 
-    Usa EHS simulado cacheado sobre las 169 formas canónicas.
+    Usa la equity exacta contra mano aleatoria de la tabla distribuida
+    (preflop_ehs.json, cargada al importar); si falta o su checksum no cuadra,
+    la de preflop_equity si la matriz está construida y, si no, EHS simulado.
+    Cacheado sobre las 169 formas canónicas.
 
     Parámetros
     ----------
@@ -261,9 +645,15 @@ def preflop_bucket(hand, num_sims=300):
     int
     """
     canon = _canonical_preflop(hand)
-    if canon not in _preflop_ehs_cache:
-        _preflop_ehs_cache[canon] = compute_ehs(list(hand), [], num_sims)
-    ehs = _preflop_ehs_cache[canon]
+    ehs   = _preflop_ehs_cache.get(canon)
+    if ehs is None:
+        import preflop_equity
+        t0 = time.perf_counter()
+        if preflop_equity.available():
+            ehs = preflop_equity.equity_vs_random(hand)
+        else:
+            ehs = compute_ehs(list(hand), [], num_sims)
+        _preflop_ehs_cache.put(canon, ehs, cost=time.perf_counter() - t0)
 
     # EHS preflop en [~0.32, ~0.85] → normalizar
     low, high = 0.32, 0.86
@@ -272,6 +662,298 @@ def preflop_bucket(hand, num_sims=300):
     return max(0, min(PREFLOP_BUCKETS - 1, bucket))
 
 
+# ── Histogramas de equity y clustering EMD ────────────────────────────────────
+
+CLUSTERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'equity_clusters.pkl')
+
+_HIST_RUNOUTS   = 32     # runouts muestreados por histograma (flop / turn)
+_HIST_OPPONENTS = 128    # manos rivales muestreadas por runout
+_KMEANS_ITERS   = 50
+_KMEANS_CHUNK   = 8192   # filas por bloque al calcular distancias
+
+
+def _equity_histogram(hole_i, board_i, bins, rng,
+                      runouts=_HIST_RUNOUTS, opponents=_HIST_OPPONENTS):
+    """
+    Histograma de la equity final (river) de la mano contra una mano aleatoria,
+    sobre los runouts posibles del board.
+
+    Cada runout aporta la equity en river contra `opponents` rivales
+    muestreados; en river (sin runouts) se enumeran los 990 rivales y el
+    histograma es una delta en la equity exacta.
+
+    Parámetros
+    ----------
+    hole_i  : np.ndarray int8 (2,)
+    board_i : np.ndarray int8 (3-5,)
+    bins    : int – cubetas de equity en [0, 1]
+
+    Retorna
+    -------
+    np.ndarray float64 (bins,) – suma 1
+    """
+    known  = np.concatenate([hole_i, board_i]).astype(np.int64)
+    avail  = np.setdiff1d(np.arange(52), known)
+    n_fill = 5 - len(board_i)
+
+    if n_fill == 0:
+        eq = river_equity(np.asarray(hole_i, dtype=np.int8)[None, :], board_i)
+    else:
+        perm   = np.argsort(rng.random((runouts, len(avail))), axis=1)
+        fill   = avail[perm[:, :n_fill]]                          # (R, n_fill)
+        rest   = avail[perm[:, n_fill:]]                          # (R, m)
+        m      = rest.shape[1]
+        i      = rng.integers(0, m, size=(runouts, opponents))
+        j      = rng.integers(0, m - 1, size=(runouts, opponents))
+        j     += j >= i                                           # dos cartas distintas
+        rows   = np.arange(runouts)[:, None]
+        opp    = np.stack([rest[rows, i], rest[rows, j]], axis=2).reshape(-1, 2)
+        full   = np.concatenate([np.broadcast_to(board_i, (runouts, len(board_i))), fill], axis=1)
+        mine   = _best_hand_batch(np.broadcast_to(hole_i, (runouts, 2)).astype(np.int8),
+                                  full.astype(np.int8))
+        theirs = _best_hand_batch(opp.astype(np.int8),
+                                  np.repeat(full, opponents, axis=0).astype(np.int8))
+        theirs = theirs.reshape(runouts, opponents)
+        eq = (mine[:, None] > theirs).mean(axis=1) + 0.5 * (mine[:, None] == theirs).mean(axis=1)
+
+    idx = np.minimum((eq * bins).astype(np.int64), bins - 1)
+    return np.bincount(idx, minlength=bins) / len(eq)
+
+
+def _equity_histograms_batch(holes, board_i, bins, rng,
+                             runouts=_HIST_RUNOUTS, opponents=_HIST_OPPONENTS):
+    """
+    _equity_histogram de muchas manos sobre el mismo board: runouts y rivales
+    se muestrean una vez del mazo sin el board y cada mano descarta los que
+    tocan sus cartas (sobremuestreando para conservar ~runouts × opponents).
+
+    Retorna
+    -------
+    np.ndarray float64 (H, bins) – cada fila suma 1
+    """
+    board_i = np.asarray(board_i, dtype=np.int8)
+    avail   = np.setdiff1d(np.arange(52, dtype=np.int8), board_i)
+    n_fill  = 5 - len(board_i)
+    H       = len(holes)
+    h_mask  = _card_masks(holes)
+    rows_h  = np.arange(H)
+    hist    = np.zeros((H, bins))
+
+    if n_fill == 0:
+        eq = river_equity(holes, board_i)
+        hist[rows_h, np.minimum((eq * bins).astype(np.int64), bins - 1)] = 1.0
+        return hist
+
+    R      = _oversample(runouts, len(avail), n_fill)
+    O      = _oversample(opponents, len(avail) - n_fill, 2)
+    perm   = np.argsort(rng.random((R, len(avail))), axis=1)
+    fill   = avail[perm[:, :n_fill]]
+    rest   = avail[perm[:, n_fill:]]
+    m      = rest.shape[1]
+    i      = rng.integers(0, m, size=(R, O))
+    j      = rng.integers(0, m - 1, size=(R, O))
+    j     += j >= i
+    rows   = np.arange(R)[:, None]
+    opp    = np.stack([rest[rows, i], rest[rows, j]], axis=2)                # (R, O, 2)
+    full   = np.concatenate([np.broadcast_to(board_i, (R, len(board_i))), fill], axis=1)
+    mine   = _best_hand_batch(np.tile(holes, (R, 1)), np.repeat(full, H, axis=0)).reshape(R, H)
+    theirs = _best_hand_batch(opp.reshape(-1, 2), np.repeat(full, O, axis=0)).reshape(R, O)
+    f_mask = _card_masks(fill)
+    o_mask = _card_masks(opp.reshape(-1, 2)).reshape(R, O)
+
+    for r in range(R):
+        v_opp = (o_mask[r][:, None] & h_mask[None, :]) == 0                  # (O, H)
+        score = (mine[r][None, :] > theirs[r][:, None]) + 0.5 * (mine[r][None, :] == theirs[r][:, None])
+        eq    = (score * v_opp).sum(axis=0) / np.maximum(v_opp.sum(axis=0), 1)
+        v_run = (f_mask[r] & h_mask) == 0
+        hist[rows_h, np.minimum((eq * bins).astype(np.int64), bins - 1)] += v_run
+    return hist / np.maximum(hist.sum(axis=1, keepdims=True), 1)
+
+
+def _emd_to_centroids(cdf, centroid_cdf):
+    """EMD 1-D = distancia L1 entre CDFs. (N, bins) × (k, bins) → (N, k)."""
+    out = np.empty((len(cdf), len(centroid_cdf)))
+    for s in range(0, len(cdf), _KMEANS_CHUNK):
+        block = cdf[s:s + _KMEANS_CHUNK]
+        out[s:s + _KMEANS_CHUNK] = np.abs(block[:, None, :] - centroid_cdf[None, :, :]).sum(axis=2)
+    return out
+
+
+def _kmeans_emd(hists, k, rng, iters=_KMEANS_ITERS):
+    """
+    k-means con EMD: asignación al centroide más cercano en EMD, centroide =
+    histograma medio del cluster (su CDF es la CDF media). Inicialización
+    k-means++. Los centroides salen ordenados por equity media creciente, de
+    modo que el cluster 0 es el más débil (misma semántica que EHS²).
+
+    Retorna
+    -------
+    (centroids (k, bins), labels (N,))
+    """
+    cdf = np.cumsum(hists, axis=1)
+    k   = min(k, len(hists))
+    centers = [cdf[rng.integers(len(cdf))]]
+    d = _emd_to_centroids(cdf, np.array(centers))[:, 0]
+    for _ in range(1, k):
+        p = d / d.sum() if d.sum() > 0 else None
+        centers.append(cdf[rng.choice(len(cdf), p=p)])
+        d = np.minimum(d, _emd_to_centroids(cdf, np.array(centers[-1:]))[:, 0])
+    centers = np.array(centers)
+
+    labels = None
+    for _ in range(iters):
+        new = _emd_to_centroids(cdf, centers).argmin(axis=1)
+        if labels is not None and np.array_equal(new, labels):
+            break
+        labels = new
+        for c in range(k):
+            members = cdf[labels == c]
+            if len(members):
+                centers[c] = members.mean(axis=0)
+
+    hist_c = np.diff(centers, axis=1, prepend=0.0)
+    mids   = (np.arange(hists.shape[1]) + 0.5) / hists.shape[1]
+    order  = np.argsort(hist_c @ mids, kind='stable')
+    rank   = np.empty(k, dtype=np.int64)
+    rank[order] = np.arange(k)
+    return hist_c[order], rank[labels]
+
+
+def _sample_histograms(args):
+    """Tarea del pool: `count` (mano, board) aleatorios de una calle."""
+    street, count, bins, seed = args
+    rng   = np.random.default_rng(seed)
+    names = [r + s for r in RANKS for s in SUITS]
+    keys, hists = [], np.empty((count, bins))
+    for n in range(count):
+        deal = rng.choice(52, size=2 + street, replace=False).astype(np.int8)
+        hists[n] = _equity_histogram(deal[:2], deal[2:], bins, rng)
+        keys.append(canonical_hand_board([names[c] for c in deal[:2]],
+                                         [names[c] for c in deal[2:]]))
+    return street, keys, hists
+
+
+def build_equity_clusters(n_samples=100000, bins=20, k=POSTFLOP_BUCKETS,
+                          workers=None, path=CLUSTERS_PATH, seed=None,
+                          chunk=500, verbose=True):
+    """
+    Construye la abstracción postflop por clustering EMD y la guarda en `path`.
+
+    Reparte n_samples (mano, board) aleatorios entre flop, turn y river,
+    calcula en un pool de procesos el histograma de equity de cada uno y
+    agrupa cada calle por separado con k-means bajo EMD.
+
+    Parámetros
+    ----------
+    n_samples : int        – pares (mano, board) en total (un tercio por calle)
+    bins      : int        – cubetas del histograma de equity
+    k         : int        – clusters por calle (= buckets postflop)
+    workers   : int | None – procesos (None = os.cpu_count())
+    path      : str        – fichero pickle de salida
+    seed      : int | None – semilla (reproducible si se fija)
+    chunk     : int        – muestras por tarea del pool
+
+    Retorna
+    -------
+    dict – {'bins', 'k', 'centroids': {n_board: (k, bins)},
+            'index': {(hand canónica, board canónico): bucket}}
+    """
+    import pickle
+    import time
+    from multiprocessing import Pool
+
+    ss    = np.random.SeedSequence(seed)
+    tasks = []
+    for street in (3, 4, 5):
+        todo = n_samples // 3 + (1 if street - 3 < n_samples % 3 else 0)
+        for s in range(0, todo, chunk):
+            tasks.append((street, min(chunk, todo - s), bins))
+    tasks = [t + (int(child.generate_state(1)[0]),)
+             for t, child in zip(tasks, ss.spawn(len(tasks)))]
+
+    workers = workers or os.cpu_count() or 1
+    keys    = {3: [], 4: [], 5: []}
+    hists   = {3: [], 4: [], 5: []}
+    t0      = time.time()
+    with Pool(workers) as pool:
+        for n, (street, kk, hh) in enumerate(pool.imap_unordered(_sample_histograms, tasks), 1):
+            keys[street].extend(kk)
+            hists[street].append(hh)
+            if verbose and (n % 20 == 0 or n == len(tasks)):
+                print(f"  {n}/{len(tasks)} bloques de histogramas  ({time.time() - t0:.0f}s)")
+
+    rng       = np.random.default_rng(ss.spawn(1)[0])
+    centroids = {}
+    index     = {}
+    for street in (3, 4, 5):
+        if not hists[street]:
+            continue
+        cents, labels = _kmeans_emd(np.concatenate(hists[street]), k, rng)
+        centroids[street] = cents.astype(np.float32)
+        index.update(zip(keys[street], labels.astype(np.uint8).tolist()))
+        if verbose:
+            print(f"  calle {street} cartas: {len(labels)} muestras → {len(cents)} clusters")
+
+    clusters = {'bins': bins, 'k': k, 'centroids': centroids, 'index': index}
+    with open(path, 'wb') as f:
+        pickle.dump(clusters, f, protocol=pickle.HIGHEST_PROTOCOL)
+    load_equity_clusters(path)
+    return clusters
+
+
+_clusters = None          # dict cargado de equity_clusters.pkl | False = no existe
+
+
+def load_equity_clusters(path=CLUSTERS_PATH):
+    """
+    Carga (o recarga) los clusters EMD que usará postflop_bucket.
+
+    Retorna
+    -------
+    dict | None – None si el fichero no existe o no es válido
+    """
+    import pickle
+    global _clusters
+    _postflop_cache.clear()
+    try:
+        with open(path, 'rb') as f:
+            _clusters = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        _clusters = False
+        return None
+    return _clusters
+
+
+def _get_clusters():
+    if _clusters is None:
+        load_equity_clusters()
+    return _clusters or None
+
+
+def _cluster_bucket(hand_t, board_t, clusters):
+    """Bucket por el índice de asignaciones o, si no está, por el centroide EMD más cercano."""
+    bucket = clusters['index'].get((hand_t, board_t))
+    if bucket is not None:
+        return int(bucket)
+    cents = clusters['centroids'][len(board_t)]
+    hist  = _equity_histogram(_cards_to_ints(list(hand_t)), _cards_to_ints(list(board_t)),
+                              clusters['bins'], _rng)
+    dist  = _emd_to_centroids(np.cumsum(hist)[None, :], np.cumsum(cents, axis=1))
+    return int(dist[0].argmin())
+
+
+def _cluster_buckets_batch(hands_t, board_t, clusters):
+    """_cluster_bucket de muchas manos canónicas sobre el mismo board canónico."""
+    out  = np.array([clusters['index'].get((h, board_t), -1) for h in hands_t], dtype=np.int64)
+    miss = np.nonzero(out < 0)[0]
+    if len(miss):
+        holes = np.array([_cards_to_ints(list(hands_t[n])) for n in miss], dtype=np.int8)
+        hists = _equity_histograms_batch(holes, _cards_to_ints(list(board_t)), clusters['bins'], _rng)
+        cents = clusters['centroids'][len(board_t)]
+        out[miss] = _emd_to_centroids(np.cumsum(hists, axis=1), np.cumsum(cents, axis=1)).argmin(axis=1)
+    return out
+
+
 # ── Buckets postflop ──────────────────────────────────────────────────────────
 
 # CACHE-1 fix: num_sims NO forma parte de la clave de caché.
@@ -281,22 +963,97 @@ def preflop_bucket(hand, num_sims=300):
 _POSTFLOP_CACHE_SIMS: int = 200
 
 
-@lru_cache(maxsize=32768)
+def _compute_postflop_bucket(hand_t: tuple, board_t: tuple) -> int:
+    """
+    Bucket de (mano, board) canónicos, sin caché.
+
+    Si existe equity_clusters.pkl (build_equity_clusters) el bucket sale del
+    clustering EMD: índice de asignaciones o centroide más cercano al
+    histograma de equity. Sin clusters se usa EHS² con _POSTFLOP_CACHE_SIMS.
+    """
+    clusters = _get_clusters()
+    if clusters is not None and len(board_t) in clusters['centroids']:
+        return _cluster_bucket(hand_t, board_t, clusters)
+    ehs2   = compute_ehs2(list(hand_t), list(board_t), _POSTFLOP_CACHE_SIMS)
+    bucket = int(ehs2 * POSTFLOP_BUCKETS)
+    return max(0, min(POSTFLOP_BUCKETS - 1, bucket))
+
+
+def _compute_postflop_buckets_batch(hands_t, board_t):
+    """_compute_postflop_bucket de muchas manos canónicas sobre el mismo board canónico."""
+    clusters = _get_clusters()
+    if clusters is not None and len(board_t) in clusters['centroids']:
+        return _cluster_buckets_batch(hands_t, board_t, clusters)
+    holes = np.array([_cards_to_ints(list(h)) for h in hands_t], dtype=np.int8)
+    ehs2  = compute_ehs2_batch(holes, _cards_to_ints(list(board_t)), _POSTFLOP_CACHE_SIMS)
+    return np.clip((ehs2 * POSTFLOP_BUCKETS).astype(np.int64), 0, POSTFLOP_BUCKETS - 1)
+
+
+# LRUCache (cache_metrics) en lugar de functools.lru_cache: postflop_bucket_batch
+# inserta en ella los buckets que calcula en bloque.
+_postflop_cache = register(LRUCache(maxsize=32768, name='postflop_bucket'))
+
+# Segundo nivel opcional compartido entre procesos (ver enable_shared_bucket_cache)
+_shared_buckets = None
+
+
+def enable_shared_bucket_cache(name=None, slots=None):
+    """
+    Activa la caché de buckets en memoria compartida (shared_buckets.py) como
+    segundo nivel tras la LRU: los fallos de la LRU se buscan ahí antes de
+    calcular y lo calculado se publica para el resto de procesos.
+
+    Parámetros
+    ----------
+    name  : str | None – segmento; None = shared_buckets.DEFAULT_NAME
+    slots : int | None – posiciones si hay que crearlo; None = DEFAULT_SLOTS
+
+    Retorna
+    -------
+    SharedBucketCache – la caché activa
+    """
+    global _shared_buckets
+    from abstracciones.shared_buckets import SharedBucketCache, DEFAULT_NAME, DEFAULT_SLOTS
+    disable_shared_bucket_cache()
+    _shared_buckets = SharedBucketCache(name or DEFAULT_NAME, slots or DEFAULT_SLOTS)
+    register('shared_buckets', _shared_buckets.stats, _shared_buckets.reset_stats)
+    return _shared_buckets
+
+
+def disable_shared_bucket_cache():
+    """Suelta la caché compartida (la borra si este proceso la creó); la LRU sigue activa."""
+    global _shared_buckets
+    if _shared_buckets is not None:
+        unregister('shared_buckets')
+        _shared_buckets.close()
+        _shared_buckets = None
+
+
 def _postflop_bucket_cached(hand_t: tuple, board_t: tuple) -> int:
     """
-    Versión cacheada de postflop_bucket. Acepta tuplas para ser hashable.
+    Versión cacheada de postflop_bucket sobre (mano, board) canónicos.
 
-    La caché LRU de 32.768 entradas evita recalcular EHS² para el mismo
+    La caché LRU de 32.768 entradas evita recalcular el bucket para el mismo
     (mano, board) dentro del mismo árbol de traversal — varias ramas del
     árbol comparten el mismo deal e inspeccionan el mismo nodo desde distintos
-    caminos.  Hit rate típico > 90 % durante el entrenamiento.
+    caminos.  Hit rate típico > 90 % durante el entrenamiento (medido en
+    cache_metrics.cache_report(), entrada 'postflop_bucket').
 
     num_sims es fijo (_POSTFLOP_CACHE_SIMS) para garantizar que todos los
     callers compartan la misma entrada de caché.
     """
-    ehs2   = compute_ehs2(list(hand_t), list(board_t), _POSTFLOP_CACHE_SIMS)
-    bucket = int(ehs2 * POSTFLOP_BUCKETS)
-    return max(0, min(POSTFLOP_BUCKETS - 1, bucket))
+    key    = (hand_t, board_t)
+    bucket = _postflop_cache.get(key)
+    if bucket is None:
+        t0     = time.perf_counter()
+        shared = _shared_buckets
+        bucket = shared.get(hand_t, board_t) if shared is not None else None
+        if bucket is None:
+            bucket = _compute_postflop_bucket(hand_t, board_t)
+            if shared is not None:
+                shared.put(hand_t, board_t, bucket)
+        _postflop_cache.put(key, bucket, cost=time.perf_counter() - t0)
+    return bucket
 
 
 def postflop_bucket(hand, board, num_sims=200):  # noqa: ARG001  (num_sims ignorado)
@@ -304,8 +1061,10 @@ def postflop_bucket(hand, board, num_sims=200):  # noqa: ARG001  (num_sims ignor
     Asigna un bucket 0..POSTFLOP_BUCKETS-1 a una (mano, board).
     Usa EHS² para incorporar potencial de mejora.
 
-    La función convierte las listas a tuplas y delega en la caché LRU
-    _postflop_bucket_cached para obtener O(1) en llamadas repetidas.
+    La función lleva (mano, board) a su forma canónica por palos. Si la
+    tabla offline de bucket_table cubre la calle, el bucket es una lectura
+    del array; si no, delega en la caché LRU _postflop_bucket_cached para
+    obtener O(1) en llamadas repetidas (situaciones isomorfas comparten entrada).
 
     Parámetros
     ----------
@@ -318,9 +1077,83 @@ def postflop_bucket(hand, board, num_sims=200):  # noqa: ARG001  (num_sims ignor
     -------
     int
     """
-    return _postflop_bucket_cached(tuple(hand), tuple(board))
+    hand_t, board_t = canonical_hand_board(hand, board)
+    bucket = bucket_table.lookup(hand_t, board_t)
+    if bucket is not None:
+        return bucket
+    return _postflop_bucket_cached(hand_t, board_t)
+
+
+_ALL_HANDS = None          # los 1.326 combos en orden lexicográfico de enteros
+
+
+def postflop_bucket_batch(board, hands=None):
+    """
+    Buckets de muchas manos sobre el mismo board en una sola llamada.
+
+    Las entradas de la tabla offline y de la caché LRU se leen directamente;
+    el resto se calcula en bloque compartiendo un único juego de runouts y
+    manos rivales (compute_ehs2_batch / histogramas EMD por lotes) con card
+    removal por mano, y se inserta en la caché LRU. Situaciones isomorfas
+    se calculan una sola vez.
+
+    Parámetros
+    ----------
+    board : list[str]              – 3-5 cartas comunitarias
+    hands : list[list[str]] | None – manos; None = los 1.326 combos en el
+                                     orden de preflop_equity._COMBOS
+
+    Retorna
+    -------
+    np.ndarray int64 (len(hands),) – bucket de cada mano; -1 si choca con el board
+    """
+    global _ALL_HANDS
+    if hands is None:
+        if _ALL_HANDS is None:
+            names      = [r + s for r in RANKS for s in SUITS]
+            _ALL_HANDS = [[names[a], names[b]] for a, b in _combinations(range(52), 2)]
+        hands = _ALL_HANDS
+    on_board = set(board)
+    out      = np.full(len(hands), -1, dtype=np.int64)
+    pending  = {}                                   # clave canónica → posiciones
+    for n, hand in enumerate(hands):
+        if hand[0] in on_board or hand[1] in on_board:
+            continue
+        key    = canonical_hand_board(hand, board)
+        bucket = bucket_table.lookup(*key)
+        if bucket is None:
+            bucket = _postflop_cache.get(key)
+        if bucket is None and _shared_buckets is not None:
+            bucket = _shared_buckets.get(*key)
+            if bucket is not None:
+                _postflop_cache.put(key, bucket)
+        if bucket is None:
+            pending.setdefault(key, []).append(n)
+        else:
+            out[n] = bucket
+    if pending:
+        keys    = list(pending)
+        t0      = time.perf_counter()
+        buckets = _compute_postflop_buckets_batch([k[0] for k in keys], keys[0][1])
+        cost    = (time.perf_counter() - t0) / len(keys)
+        for key, bucket in zip(keys, buckets.tolist()):
+            _postflop_cache.put(key, bucket, cost=cost)
+            if _shared_buckets is not None:
+                _shared_buckets.put(*key, bucket)
+            out[pending[key]] = bucket
+    return out
 
 
 def clear_postflop_cache():
-    """Invalida la caché LRU postflop (útil al cambiar POSTFLOP_BUCKETS)."""
-    _postflop_bucket_cached.cache_clear()
+    """
+    Invalida la caché LRU postflop, la tabla cargada y, si está activa, la
+    caché compartida (útil al cambiar POSTFLOP_BUCKETS).
+    """
+    _postflop_cache.clear()
+    bucket_table.unload()
+    if _shared_buckets is not None:
+        _shared_buckets.clear()
+
+
+if os.environ.get('POKER_SHARED_BUCKETS'):
+    enable_shared_bucket_cache(os.environ['POKER_SHARED_BUCKETS'])
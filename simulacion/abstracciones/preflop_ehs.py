@@ -0,0 +1,103 @@
+"""
+Tabla estática de EHS preflop de las 169 clases de mano.
+
+preflop_bucket necesita la equity de cada clase contra una mano aleatoria.
+En lugar de simularla en el arranque (169 Monte Carlo cuyo resultado
+dependía del num_sims del primer caller), se distribuye ya calculada en
+preflop_ehs.json y se carga al importar card_abstractor.
+
+Formato
+-------
+    {"classes": [...169 etiquetas en el orden de preflop_equity.HAND_CLASSES],
+     "ehs":     [...169 equities exactas contra mano aleatoria],
+     "sha256":  "<digest de classes + ehs>"}
+
+Si el digest no coincide, load_preflop_ehs avisa y retorna None, y
+preflop_bucket vuelve al camino anterior (matriz preflop_equity o EHS simulado).
+
+Regeneración (valores exactos de preflop_equity; construye la matriz
+169×169 si no existe, ~11 min por núcleo):
+    python abstracciones/preflop_ehs.py [--workers N]
+    python abstracciones/preflop_ehs.py --check
+"""
+
+import hashlib
+import json
+import os
+import sys
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+PREFLOP_EHS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preflop_ehs.json')
+
+
+def _digest(classes, ehs):
+    payload = json.dumps({'classes': classes, 'ehs': ehs}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_preflop_ehs(path=PREFLOP_EHS_PATH):
+    """
+    Lee la tabla y comprueba su checksum.
+
+    Retorna
+    -------
+    dict[str, float] | None – etiqueta de clase ('AKs', 'AKo', 'AA') → EHS;
+                              None si falta el fichero o el checksum no cuadra
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        classes, ehs = data['classes'], data['ehs']
+    except (OSError, ValueError, KeyError):
+        return None
+    if len(classes) != 169 or len(ehs) != 169 or _digest(classes, ehs) != data.get('sha256'):
+        warnings.warn(f"{path}: checksum o tamaño inválido; regenerar con "
+                      "'python abstracciones/preflop_ehs.py'. Se usa el EHS simulado.")
+        return None
+    return dict(zip(classes, ehs))
+
+
+def build_preflop_ehs(workers=None, path=PREFLOP_EHS_PATH):
+    """
+    Escribe la tabla a partir de la matriz exacta de preflop_equity
+    (construyéndola antes si no existe).
+
+    Retorna
+    -------
+    dict[str, float] – la tabla escrita
+    """
+    import numpy as np
+    import preflop_equity
+
+    if not preflop_equity.available():
+        np.save(preflop_equity.TABLE_PATH, preflop_equity.build_table(workers=workers))
+        preflop_equity._matrix = None
+    classes = list(preflop_equity.HAND_CLASSES)
+    ehs     = [round(float(e), 6) for e in preflop_equity.vs_random_vector()]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'classes': classes, 'ehs': ehs, 'sha256': _digest(classes, ehs)}, f, indent=1)
+        f.write('\n')
+    return dict(zip(classes, ehs))
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Genera o comprueba preflop_ehs.json')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Procesos para construir la matriz preflop (default: todos)')
+    parser.add_argument('--check', action='store_true',
+                        help='Sólo comprobar el checksum del fichero existente')
+    args = parser.parse_args()
+
+    if args.check:
+        table = load_preflop_ehs()
+        if table is None:
+            sys.exit(f"'{PREFLOP_EHS_PATH}' no existe o no es válido")
+        print(f"OK: {len(table)} clases, checksum correcto")
+    else:
+        table = build_preflop_ehs(workers=args.workers)
+        print(f"Tabla guardada en '{PREFLOP_EHS_PATH}'")
+        print(f"  AA  = {table['AA']:.4f}")
+        print(f"  72o = {table['72o']:.4f}")
@@ -0,0 +1,182 @@
+"""
+Caché de buckets postflop compartida entre procesos (multiprocessing.shared_memory).
+
+La caché LRU de card_abstractor es local: cada worker del trainer, de los
+benchmarks o del servidor web la calienta por su cuenta. SharedBucketCache
+es una tabla hash de tamaño fijo en memoria compartida que todos los procesos
+de la máquina leen y escriben sin locks: un bucket calculado una vez lo
+reutiliza cualquier otro proceso.
+
+Formato
+-------
+Array uint64 de `slots` posiciones (potencia de 2), direccionamiento abierto
+con sondeo lineal (máx. _MAX_PROBE posiciones). Cada posición es una palabra
+de 64 bits:
+
+    (clave << 8) | bucket        0 = vacía
+
+clave = las 7 cartas canónicas (mano + board, +1 para que el 0 signifique
+"sin carta") empaquetadas a 6 bits → 42 bits. Clave y bucket van en la
+misma palabra alineada, así que un lector nunca ve una entrada a medias.
+
+Carreras benignas: dos escritores pueden ocupar la misma posición vacía a la
+vez y una de las dos entradas se pierde; la siguiente consulta la recalcula
+y la vuelve a escribir. Con el sondeo lleno la entrada no se guarda (cuenta
+como expulsión); no hay borrado.
+
+Uso
+---
+    from abstracciones.card_abstractor import enable_shared_bucket_cache
+    enable_shared_bucket_cache()                  # nombre y tamaño por defecto
+
+    # o para cualquier proceso que importe card_abstractor:
+    POKER_SHARED_BUCKETS=poker_buckets python cfr/train_blueprint.py
+
+El primer proceso crea el segmento y lo borra al salir; el resto se
+adjunta por nombre. Los hijos creados con fork heredan la tabla ya abierta.
+Si el creador muere sin salir limpiamente el segmento queda en /dev/shm y
+el siguiente proceso se adjunta a él (clear() lo vacía si cambian los
+clusters o POSTFLOP_BUCKETS).
+"""
+
+import atexit
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+DEFAULT_NAME  = 'poker_buckets'
+DEFAULT_SLOTS = 1 << 22           # 32 MB
+
+_MAX_PROBE = 8
+_MASK64    = (1 << 64) - 1
+_GOLDEN    = 0x9E3779B97F4A7C15   # hash multiplicativo de Fibonacci
+
+_RANKS    = '23456789TJQKA'
+_SUITS    = 'shdc'
+_CARD2INT = {r + s: i * 4 + j for i, r in enumerate(_RANKS) for j, s in enumerate(_SUITS)}
+
+
+def pack_key(hand_t, board_t):
+    """Clave de 42 bits de (mano, board) canónicos: 6 bits por carta, 0 = sin carta."""
+    key = 0
+    for i, c in enumerate(hand_t + board_t):
+        key |= (_CARD2INT[c] + 1) << (6 * i)
+    return key
+
+
+class SharedBucketCache:
+    """
+    Tabla (mano, board) canónicos → bucket uint8 en memoria compartida.
+
+    Parámetros
+    ----------
+    name  : str – nombre del segmento; si ya existe se adjunta a él
+    slots : int – posiciones al crearlo (se redondea a potencia de 2);
+                  ignorado al adjuntarse
+    """
+
+    def __init__(self, name=DEFAULT_NAME, slots=DEFAULT_SLOTS):
+        slots = 1 << max(9, int(slots - 1).bit_length())
+        try:
+            self._shm  = shared_memory.SharedMemory(name=name, create=True, size=slots * 8)
+            self.owner = True
+            atexit.register(self.close)
+        except FileExistsError:
+            self._shm  = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        # El borrado lo hace close() del creador: fuera del resource_tracker,
+        # que en Python < 3.13 también borraría el segmento al salir cualquier
+        # proceso que sólo se adjuntó
+        resource_tracker.unregister(self._shm._name, 'shared_memory')
+        self.name  = name
+        self.slots = 1 << ((self._shm.size // 8).bit_length() - 1)
+        self._bits = self.slots.bit_length() - 1
+        self._mv   = self._shm.buf.cast('Q')
+        self.reset_stats()
+
+    # ── Acceso ────────────────────────────────────────────────────────────────
+
+    def _home(self, key):
+        return ((key * _GOLDEN) & _MASK64) >> (64 - self._bits)
+
+    def get(self, hand_t, board_t):
+        """Bucket guardado de (mano, board) canónicos, o None."""
+        key  = pack_key(hand_t, board_t)
+        mv   = self._mv
+        mask = self.slots - 1
+        i    = self._home(key)
+        for _ in range(_MAX_PROBE):
+            word = mv[i]
+            if word == 0:
+                break
+            if word >> 8 == key:
+                self.hits += 1
+                return word & 0xFF
+            i = (i + 1) & mask
+        self.misses += 1
+        return None
+
+    def put(self, hand_t, board_t, bucket):
+        """Guarda el bucket (0..255) en la primera posición libre o con la misma clave."""
+        key  = pack_key(hand_t, board_t)
+        word = (key << 8) | int(bucket)
+        mv   = self._mv
+        mask = self.slots - 1
+        i    = self._home(key)
+        for _ in range(_MAX_PROBE):
+            cur = mv[i]
+            if cur == 0 or cur >> 8 == key:
+                mv[i] = word
+                return
+            i = (i + 1) & mask
+        self.evictions += 1
+
+    def clear(self):
+        """Vacía la tabla para todos los procesos."""
+        np.frombuffer(self._shm.buf, dtype=np.uint64)[:] = 0
+
+    def close(self):
+        """Suelta el segmento; el proceso que lo creó además lo borra."""
+        if self._mv is None:
+            return
+        self._mv.release()
+        self._mv = None
+        self._shm.close()
+        if self.owner:
+            try:
+                # unlink() también da de baja el segmento en el resource_tracker
+                resource_tracker.register(self._shm._name, 'shared_memory')
+                self._shm.unlink()
+            except FileNotFoundError:
+                resource_tracker.unregister(self._shm._name, 'shared_memory')
+            atexit.unregister(self.close)
+
+    # ── Métricas ──────────────────────────────────────────────────────────────
+
+    def reset_stats(self):
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+
+    def stats(self):
+        """
+        Retorna
+        -------
+        dict – claves de cache_metrics.LRUCache.stats(); aciertos, fallos y
+               expulsiones (sondeo lleno) son de este proceso; size es la
+               ocupación de la tabla compartida
+        """
+        total = self.hits + self.misses
+        size  = 0
+        if self._mv is not None:
+            size = int(np.count_nonzero(np.frombuffer(self._shm.buf, dtype=np.uint64)))
+        return {
+            'name'     : f'shared:{self.name}',
+            'size'     : size,
+            'maxsize'  : self.slots,
+            'hits'     : self.hits,
+            'misses'   : self.misses,
+            'hit_rate' : self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+            'bytes'    : self.slots * 8,
+        }
@@ -0,0 +1,46 @@
+"""
+Canonicalización de (hole, board) bajo permutación de palos.
+
+Dos situaciones que sólo difieren en el nombre de los palos (AhKh en 2c7d9s y
+AsKs en 2h7c9d) tienen la misma equity, el mismo bucket y la misma estrategia.
+canonical_hand_board devuelve la misma clave para todas ellas.
+
+Algoritmo
+---------
+Cada palo recibe la firma (máscara de rangos en el board, máscara de rangos en
+la mano). Los palos se ordenan por firma descendente y se renombran a
+'s', 'h', 'd', 'c' en ese orden. Dos palos con la misma firma son
+intercambiables, así que el resultado no depende de cómo se desempaten: la
+clave es un invariante completo (mismas claves ⇔ existe una permutación de
+palos que lleva una situación a la otra).
+"""
+
+RANKS = '23456789TJQKA'
+SUITS = 'shdc'
+
+_RANK_BIT = {r: 1 << i for i, r in enumerate(RANKS)}
+_SUIT_IDX = {s: i for i, s in enumerate(SUITS)}
+
+
+def canonical_hand_board(hole, board=()):
+    """
+    Forma canónica de (hole, board) bajo permutación de palos.
+
+    Parámetros
+    ----------
+    hole  : iterable[str] – cartas propias, p.ej. ['Ah', 'Kh']
+    board : iterable[str] – cartas comunitarias (0-5)
+
+    Retorna
+    -------
+    tuple(tuple[str], tuple[str]) – (hole canónico, board canónico), cada uno ordenado
+    """
+    sig = [[0, 0] for _ in range(4)]
+    for c in board:
+        sig[_SUIT_IDX[c[1]]][0] |= _RANK_BIT[c[0]]
+    for c in hole:
+        sig[_SUIT_IDX[c[1]]][1] |= _RANK_BIT[c[0]]
+    order = sorted(range(4), key=sig.__getitem__, reverse=True)
+    remap = {SUITS[s]: SUITS[i] for i, s in enumerate(order)}
+    return (tuple(sorted(c[0] + remap[c[1]] for c in hole)),
+            tuple(sorted(c[0] + remap[c[1]] for c in board)))
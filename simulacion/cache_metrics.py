@@ -0,0 +1,292 @@
+"""
+Caché LRU acotada con métricas de uso.
+
+LRUCache sustituye a los dict con "borrado de la mitad más antigua": al
+llenarse expulsa sólo la entrada usada hace más tiempo, así que las entradas
+calientes sobreviven. Cuenta aciertos, fallos, expulsiones y el tiempo de
+cálculo ahorrado (cada entrada guarda lo que costó calcularla y cada acierto
+suma ese coste). El mismo coste, sumado en cada inserción, da la latencia
+acumulada de los fallos.
+
+Registro
+--------
+Las cachés de abstracción y equity se registran con register(); los scripts
+de entrenamiento imprimen cache_report() en cada intervalo de log:
+
+    register(cache)                       # LRUCache
+    register('tabla', lambda: {...})      # o una función que devuelve stats
+    all_stats()     # [stats de cada caché registrada]
+    cache_report()  # tabla de texto (aciertos, tamaño, bytes, latencia...)
+
+Uso
+---
+    cache = LRUCache(maxsize=4096, name='equity')
+    val = cache.get(key)                 # None si no está (cuenta fallo)
+    if val is None:
+        t0 = time.perf_counter()
+        val = calcular(...)
+        cache.put(key, val, cost=time.perf_counter() - t0)
+    cache.stats()   # {'name', 'size', 'maxsize', 'hits', 'misses', 'hit_rate', ...}
+
+Hilos: get / peek / put / resize / clear / nbytes toman un lock por caché
+(los hilos de petición de Flask comparten las cachés de módulo). El lock se
+recrea en el hijo de un fork por si otro hilo del padre lo tenía tomado.
+"""
+
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from itertools import islice
+
+_BYTES_SAMPLE = 32        # entradas muestreadas para estimar el tamaño en bytes
+
+_CACHES = weakref.WeakSet()          # LRUCache vivas (locks nuevos tras fork)
+
+
+def _reset_locks_after_fork():
+    for cache in list(_CACHES):
+        cache._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+
+def estimate_bytes(obj):
+    """
+    Tamaño aproximado en bytes de obj, recorriendo tuplas, listas y dicts
+    (sys.getsizeof de un array numpy ya incluye sus datos si son propios).
+    Los objetos compartidos se cuentan una vez por referencia: es una cota
+    superior, suficiente para dimensionar maxsize.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (tuple, list, set, frozenset)):
+        size += sum(estimate_bytes(x) for x in obj)
+    elif isinstance(obj, dict):
+        size += sum(estimate_bytes(k) + estimate_bytes(v) for k, v in obj.items())
+    return size
+
+
+class LRUCache:
+    """
+    Caché LRU acotada por número de entradas.
+
+    Parámetros
+    ----------
+    maxsize : int – entradas máximas (>= 1)
+    name    : str – etiqueta para stats()
+    """
+
+    def __init__(self, maxsize=4096, name='cache'):
+        if maxsize < 1:
+            raise ValueError(f"maxsize debe ser >= 1, recibió {maxsize}")
+        self.maxsize = maxsize
+        self.name    = name
+        self._data   = OrderedDict()   # key → (value, cost)
+        self._lock   = threading.Lock()
+        self.reset_stats()
+        _CACHES.add(self)
+
+    # ── Acceso ────────────────────────────────────────────────────────────────
+
+    def get(self, key, default=None, valid=None):
+        """
+        Valor de key (y lo marca como reciente), o default. Cuenta acierto/fallo.
+
+        valid : callable | None – si devuelve False para el valor guardado, la
+                consulta cuenta como fallo y retorna default (p.ej. una
+                estimación con menos precisión de la pedida). Se llama con
+                el lock tomado: no debe usar la misma caché.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or (valid is not None and not valid(item[0])):
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits       += 1
+            self.time_saved += item[1]
+            return item[0]
+
+    def peek(self, key, default=None):
+        """Valor de key sin tocar el orden LRU ni las métricas."""
+        with self._lock:
+            item = self._data.get(key)
+        return default if item is None else item[0]
+
+    def put(self, key, value, cost=0.0):
+        """
+        Inserta o actualiza key. cost = segundos que costó calcular value;
+        en una actualización se acumula con el coste previo.
+        """
+        with self._lock:
+            self.miss_time += cost
+            prev = self._data.pop(key, None)
+            if prev is not None:
+                cost += prev[1]
+            self._data[key] = (value, cost)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def resize(self, maxsize):
+        """Cambia el límite de entradas y expulsa las sobrantes (LRU primero)."""
+        if maxsize < 1:
+            raise ValueError(f"maxsize debe ser >= 1, recibió {maxsize}")
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Vacía la caché (las métricas se conservan; ver reset_stats)."""
+        with self._lock:
+            self._data.clear()
+
+    # ── Métricas ──────────────────────────────────────────────────────────────
+
+    def reset_stats(self):
+        self.hits       = 0
+        self.misses     = 0
+        self.evictions  = 0
+        self.time_saved = 0.0
+        self.miss_time  = 0.0
+
+    def nbytes(self):
+        """
+        Bytes estimados de la caché: el OrderedDict más el tamaño medio de
+        _BYTES_SAMPLE entradas (clave, valor y coste) por el número de entradas.
+        """
+        with self._lock:
+            n      = len(self._data)
+            sample = list(islice(self._data.items(), _BYTES_SAMPLE))
+        if not n:
+            return sys.getsizeof(self._data)
+        per    = sum(estimate_bytes(k) + estimate_bytes(v) for k, v in sample) / len(sample)
+        return int(sys.getsizeof(self._data) + n * per)
+
+    def stats(self):
+        """
+        Retorna
+        -------
+        dict – name, size, maxsize, hits, misses, hit_rate, evictions,
+               time_saved_s (segundos de cálculo evitados por aciertos),
+               miss_time_s (segundos de cálculo de las entradas insertadas),
+               bytes (estimados, ver nbytes)
+        """
+        total = self.hits + self.misses
+        return {
+            'name'        : self.name,
+            'size'        : len(self._data),
+            'maxsize'     : self.maxsize,
+            'hits'        : self.hits,
+            'misses'      : self.misses,
+            'hit_rate'    : self.hits / total if total else 0.0,
+            'evictions'   : self.evictions,
+            'time_saved_s': self.time_saved,
+            'miss_time_s' : self.miss_time,
+            'bytes'       : self.nbytes(),
+        }
+
+    # ── Protocolo de contenedor (sin efecto en LRU ni métricas) ───────────────
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __getitem__(self, key):
+        return self._data[key][0]
+
+
+# ── Registro de cachés ────────────────────────────────────────────────────────
+
+_registry = {}            # nombre → LRUCache | (stats, reset) callables
+
+_STAT_DEFAULTS = {'size': 0, 'maxsize': None, 'hits': 0, 'misses': 0, 'hit_rate': 0.0,
+                  'evictions': 0, 'time_saved_s': 0.0, 'miss_time_s': 0.0, 'bytes': 0}
+
+
+def register(cache, stats=None, reset=None):
+    """
+    Añade una caché al registro global (sustituye a otra del mismo nombre).
+
+    Parámetros
+    ----------
+    cache : LRUCache | str – la caché, o su nombre si se pasa stats
+    stats : callable | None – función sin argumentos que devuelve un dict
+            con las claves de LRUCache.stats() (las que falten valen 0)
+    reset : callable | None – pone a cero sus métricas (reset_all_stats)
+
+    Retorna
+    -------
+    cache (para usarlo como expresión en la definición del módulo)
+    """
+    if stats is None:
+        _registry[cache.name] = cache
+    else:
+        _registry[cache] = (stats, reset)
+    return cache
+
+
+def unregister(name):
+    """Quita una caché del registro (no hace nada si no estaba)."""
+    _registry.pop(name, None)
+
+
+def all_stats():
+    """
+    Métricas de todas las cachés registradas, en orden de registro.
+
+    Retorna
+    -------
+    list[dict] – una entrada por caché con las claves de LRUCache.stats()
+    """
+    out = []
+    for name, src in _registry.items():
+        st = src.stats() if isinstance(src, LRUCache) else src[0]()
+        out.append({**_STAT_DEFAULTS, **st, 'name': name})
+    return out
+
+
+def reset_all_stats():
+    """Pone a cero las métricas de las cachés registradas (conserva entradas)."""
+    for src in _registry.values():
+        if isinstance(src, LRUCache):
+            src.reset_stats()
+        elif src[1] is not None:
+            src[1]()
+
+
+def _fmt_bytes(n):
+    for unit in ('B', 'KB', 'MB'):
+        if n < 1024:
+            return f"{n:.0f}{unit}" if unit == 'B' else f"{n:.1f}{unit}"
+        n /= 1024
+    return f"{n:.1f}GB"
+
+
+def cache_report(stats=None):
+    """
+    Tabla de texto con las métricas de las cachés registradas (o de `stats`).
+
+    Columnas: tamaño/máximo, aciertos, fallos, tasa de acierto, expulsiones,
+    bytes estimados y latencia acumulada de los fallos.
+    """
+    stats = all_stats() if stats is None else stats
+    lines = [f"  {'caché':<16} {'tamaño':>17} {'aciertos':>10} {'fallos':>9} "
+             f"{'hit%':>6} {'expuls.':>8} {'bytes':>9} {'t_fallo':>8}"]
+    for st in stats:
+        cap = '-' if st['maxsize'] is None else f"{st['maxsize']:,}"
+        lines.append(
+            f"  {st['name']:<16} {st['size']:>7,}/{cap:<9} {st['hits']:>10,} {st['misses']:>9,} "
+            f"{100 * st['hit_rate']:>5.1f}% {st['evictions']:>8,} {_fmt_bytes(st['bytes']):>9} "
+            f"{st['miss_time_s']:>7.2f}s")
+    return "\n".join(lines)
@@ -0,0 +1,285 @@
+"""
+Árbol de apuestas abstracto precompilado en arrays planos.
+
+El árbol abstracto (7 acciones, raise_max=2, stacks de 100 BB) es el mismo
+en todos los repartos; sólo cambian los buckets. Recorrerlo rehaciendo el
+estado en cada arista (máscara nueva, copias de stacks / contribs,
+bet_hist + [acción]) repetía el mismo trabajo millones de veces en el
+trainer, el best response y el real-time search. compile_tree lo recorre
+una vez y guarda cada nodo como una fila de arrays:
+
+Nodos de decisión (id ≥ 0, raíz = 0)
+    player, street        list[int]            – quién actúa y en qué calle
+    hist                  list[tuple]          – bet_hist de la calle (tuplas compartidas)
+    legal                 list[tuple[int]]     – índices de acción válidos, en orden
+    mask                  bool   (n, NUM_ACTIONS)
+    child                 int32  (n, NUM_ACTIONS) – hijo por acción; NO_CHILD si no es válida
+    pot, to_call          float64 (n,)
+    stacks                float64 (n, 2)
+
+Nodos terminales (hijo t < 0 → fila ~t)
+    term_kind             int8 (m,)      – FOLDED, SHOWDOWN o LEAF (horizonte del search)
+    term_player           int8 (m,)      – quién foldea (-1 si no es FOLDED)
+    term_street           int8 (m,)      – calle del showdown / de la hoja
+    term_pot              float64 (m,)   – bote final
+    term_contrib          float64 (m, 2) – contribuciones de la calle
+    term_invested         float64 (m, 2) – stack de la raíz − stack final
+
+Con esos coeficientes cada traversal resuelve su pago sin reconstruir nada:
+fold del rival → pot, fold propio → −contrib (trainer) o −invested (best
+response); showdown → eq × pot − contrib / invested.
+
+    tree = blueprint_tree()                        # árbol completo, una vez por proceso
+    tree = subgame_tree(street_idx, pot, stacks,   # subárbol del search, caché LRU
+                        contribs, bet_hist, n_raises, to_call, position, depth)
+
+Las transiciones son las de MCCFRTrainer._apply_action (limp del SB con
+opción del BB, BUG-7: raise de 0 fichas → CALL). Con stack 0 el ALLIN no es
+válido: un all-in de 0 fichas no cambia el estado y hacía el árbol infinito.
+"""
+
+import os
+import sys
+import time
+from array import array
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from abstracciones.infoset_encoder import (
+    FOLD, CALL, RAISE_THIRD, RAISE_HALF, RAISE_POT, RAISE_2POT, ALLIN,
+    ABSTRACT_ACTIONS, NUM_ACTIONS, ACTION_IDX, RAISE_RATIOS,
+)
+from cache_metrics import LRUCache, register
+
+# Tipos de nodo terminal
+FOLDED, SHOWDOWN, LEAF = 1, 2, 3
+
+NO_CHILD = np.iinfo(np.int32).min
+
+# Raíz de la mano: blinds SB=0.5, BB=1.0 pagadas, actúa el SB
+ROOT_STATE = dict(street_idx=0, pot=1.5, stacks=(99.5, 99.0), contribs=(0.5, 1.0),
+                  bet_hist=(), n_raises=0, to_call=0.5, position=0)
+
+_RAISES = [ACTION_IDX[a] for a in (RAISE_THIRD, RAISE_HALF, RAISE_POT, RAISE_2POT)]
+
+
+def legal_actions(to_call, stack, n_raises, raise_max=2):
+    """Índices de las acciones válidas en este estado, en orden."""
+    legal = list(range(NUM_ACTIONS))
+    if to_call == 0.0:
+        legal.remove(ACTION_IDX[FOLD])       # no se puede fold sin apuesta
+    if n_raises >= raise_max or stack <= to_call:
+        legal = [i for i in legal if i not in _RAISES]   # límite / sin fichas para raise
+    if stack <= 0.0:
+        legal.remove(ACTION_IDX[ALLIN])      # ya all-in: sólo queda CALL (0 fichas)
+    return tuple(legal)
+
+
+def legal_mask(to_call, stack, n_raises, raise_max=2):
+    """Booleano por acción: True = acción válida en este estado."""
+    m = np.zeros(NUM_ACTIONS, dtype=bool)
+    m[list(legal_actions(to_call, stack, n_raises, raise_max))] = True
+    return m
+
+
+# ── Árbol compilado ───────────────────────────────────────────────────────────
+
+class BettingTree:
+    """Arrays de nodos de decisión y terminales (ver docstring del módulo)."""
+
+    def __init__(self, b, root_stacks, raise_max):
+        n, m = len(b.player), len(b.term_kind)
+        self.player      = b.player
+        self.street      = b.street
+        self.hist        = b.hist
+        self.legal       = b.legal
+        self.child       = np.frombuffer(b.child, dtype=np.int32).reshape(n, NUM_ACTIONS)
+        self.mask        = self.child != NO_CHILD
+        self.pot         = np.frombuffer(b.pot, dtype=np.float64)
+        self.to_call     = np.frombuffer(b.to_call, dtype=np.float64)
+        self.stacks      = np.frombuffer(b.stacks, dtype=np.float64).reshape(n, 2)
+        self.term_kind   = np.frombuffer(b.term_kind, dtype=np.int8)
+        self.term_player = np.frombuffer(b.term_player, dtype=np.int8)
+        self.term_street = np.frombuffer(b.term_street, dtype=np.int8)
+        self.term_pot    = np.frombuffer(b.term_pot, dtype=np.float64)
+        self.term_contrib  = np.frombuffer(b.term_contrib, dtype=np.float64).reshape(m, 2)
+        self.term_invested = (np.asarray(root_stacks, dtype=np.float64)
+                              - np.frombuffer(b.term_stacks, dtype=np.float64).reshape(m, 2))
+        self.root_stacks = tuple(root_stacks)
+        self.raise_max   = raise_max
+
+    @property
+    def n_nodes(self):
+        return len(self.player)
+
+    @property
+    def n_terminals(self):
+        return len(self.term_kind)
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self.nbytes()
+
+    def nbytes(self):
+        """Bytes de los arrays numéricos (sin las listas de Python)."""
+        return sum(getattr(self, a).nbytes for a in (
+            'child', 'mask', 'pot', 'to_call', 'stacks', 'term_kind', 'term_player',
+            'term_street', 'term_pot', 'term_contrib', 'term_invested'))
+
+
+class _Builder:
+    """Recorre el árbol una vez y va rellenando los arrays (preorden)."""
+
+    def __init__(self, raise_max):
+        self.raise_max = raise_max
+        self.player, self.street, self.hist, self.legal = [], [], [], []
+        self.child   = array('i')
+        self.pot     = array('d')
+        self.to_call = array('d')
+        self.stacks  = array('d')
+        self.term_kind   = array('b')
+        self.term_player = array('b')
+        self.term_street = array('b')
+        self.term_pot     = array('d')
+        self.term_contrib = array('d')
+        self.term_stacks  = array('d')
+        self._interned = {}
+
+    def _intern(self, t):
+        return self._interned.setdefault(t, t)
+
+    def node(self, street_idx, pot, stacks, contribs, hist, n_raises, to_call, position, depth):
+        n = len(self.player)
+        legal = self._intern(legal_actions(to_call, stacks[position], n_raises, self.raise_max))
+        self.player.append(position)
+        self.street.append(street_idx)
+        self.hist.append(self._intern(tuple(hist)))
+        self.legal.append(legal)
+        self.child.extend([NO_CHILD] * NUM_ACTIONS)
+        self.pot.append(pot)
+        self.to_call.append(to_call)
+        self.stacks.extend(stacks)
+        for idx in legal:
+            self.child[n * NUM_ACTIONS + idx] = self.edge(
+                ABSTRACT_ACTIONS[idx], street_idx, pot, stacks, contribs, hist,
+                n_raises, to_call, position, depth)
+        return n
+
+    def terminal(self, kind, player, street_idx, pot, stacks, contribs):
+        t = len(self.term_kind)
+        self.term_kind.append(kind)
+        self.term_player.append(player)
+        self.term_street.append(street_idx)
+        self.term_pot.append(pot)
+        self.term_contrib.extend(contribs)
+        self.term_stacks.extend(stacks)
+        return ~t
+
+    def edge(self, action, street_idx, pot, stacks, contribs, hist, n_raises, to_call,
+             position, depth):
+        """Hijo de aplicar action: id de decisión (≥ 0) o ~terminal (< 0)."""
+        active   = position
+        opponent = 1 - active
+
+        if action == FOLD:
+            return self.terminal(FOLDED, active, street_idx, pot, stacks, contribs)
+
+        if action not in (CALL, ALLIN):
+            ratio       = RAISE_RATIOS.get(action, 1.0)
+            raise_extra = min(ratio * pot, stacks[active] - to_call)
+            if raise_extra == 0:
+                action = CALL                # BUG-7: raise de 0 fichas = CALL
+            else:
+                total_add = to_call + raise_extra
+                if total_add >= stacks[active]:
+                    total_add = stacks[active]
+                    action    = ALLIN
+                ns = list(stacks);  nc = list(contribs)
+                ns[active] -= total_add
+                nc[active] += total_add
+                return self.node(street_idx, pot + total_add, ns, nc, list(hist) + [action],
+                                 n_raises + 1, nc[active] - nc[opponent], opponent, depth)
+
+        if action == ALLIN:
+            amount = stacks[active]
+            ns = list(stacks);  nc = list(contribs)
+            ns[active] = 0.0
+            nc[active] += amount
+            return self.node(street_idx, pot + amount, ns, nc, list(hist) + [ALLIN],
+                             n_raises + 1, max(0.0, nc[active] - nc[opponent]), opponent, depth)
+
+        amount = min(to_call, stacks[active])
+        ns = list(stacks);  nc = list(contribs)
+        ns[active] -= amount
+        nc[active] += amount
+        new_pot = pot + amount
+        if nc[0] == nc[1] or ns[active] == 0.0:
+            # Limp del SB preflop: el BB tiene opción de check o raise
+            if street_idx == 0 and active == 0 and not hist:
+                return self.node(street_idx, new_pot, ns, nc, [CALL], n_raises, 0.0,
+                                 opponent, depth)
+            if street_idx == 3:
+                return self.terminal(SHOWDOWN, -1, 3, new_pot, ns, nc)
+            if depth is not None and depth <= 0:
+                return self.terminal(LEAF, -1, street_idx + 1, new_pot, ns, (0.0, 0.0))
+            return self.node(street_idx + 1, new_pot, ns, [0.0, 0.0], [], 0, 0.0, 1,
+                             None if depth is None else depth - 1)
+        return self.node(street_idx, new_pot, ns, nc, list(hist) + [CALL], n_raises,
+                         nc[opponent] - nc[active], opponent, depth)
+
+
+def compile_tree(street_idx=0, pot=1.5, stacks=(99.5, 99.0), contribs=(0.5, 1.0),
+                 bet_hist=(), n_raises=0, to_call=0.5, position=0,
+                 depth=None, raise_max=2):
+    """
+    Compila el árbol abstracto desde un estado.
+
+    Parámetros
+    ----------
+    street_idx … position : estado de la raíz (como en MCCFRTrainer._cfr)
+    depth     : int | None – cambios de calle antes de cortar con nodos LEAF
+                             (None = hasta showdown)
+    raise_max : int        – raises por calle
+
+    Retorna
+    -------
+    BettingTree – raíz en el nodo 0
+    """
+    b = _Builder(raise_max)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 10_000))
+    try:
+        b.node(street_idx, float(pot), [float(s) for s in stacks],
+               [float(c) for c in contribs], list(bet_hist), n_raises, float(to_call),
+               position, depth)
+    finally:
+        sys.setrecursionlimit(limit)
+    return BettingTree(b, [float(s) for s in stacks], raise_max)
+
+
+# ── Árboles compartidos ───────────────────────────────────────────────────────
+
+_blueprint_tree = None
+_subgame_trees  = register(LRUCache(maxsize=32, name='betting_tree'))
+
+
+def blueprint_tree():
+    """Árbol completo desde ROOT_STATE (se compila en el primer uso del proceso)."""
+    global _blueprint_tree
+    if _blueprint_tree is None:
+        _blueprint_tree = compile_tree(**ROOT_STATE)
+    return _blueprint_tree
+
+
+def subgame_tree(street_idx, pot, stacks, contribs, bet_hist, n_raises, to_call,
+                 position, depth):
+    """Subárbol con horizonte depth desde un estado de la partida (caché LRU)."""
+    key = (street_idx, float(pot), tuple(map(float, stacks)), tuple(map(float, contribs)),
+           tuple(bet_hist), n_raises, float(to_call), position, depth)
+    tree = _subgame_trees.get(key)
+    if tree is None:
+        t0   = time.perf_counter()
+        tree = compile_tree(*key)
+        _subgame_trees.put(key, tree, cost=time.perf_counter() - t0)
+    return tree
@@ -0,0 +1,159 @@
+"""
+Almacenamiento de InfoSets en arrays contiguos.
+
+Con dicts clave → np.ndarray(7) cada InfoSet pagaba dos entradas de dict,
+dos cabeceras de ndarray (~112 B cada una) y la tupla clave por 2 × 56 B
+de datos. InfosetTable guarda un único índice clave → fila y dos arrays
+float32 (n_infosets, NUM_ACTIONS) que crecen duplicando su capacidad:
+
+    table = InfosetTable(NUM_ACTIONS)
+    table.regret_row(key)[:] += delta      # vista de la fila (la crea si falta)
+    table.strategy_row(key)[:] += sigma
+    table.regrets, table.strategy          # (n, NUM_ACTIONS) de las filas usadas
+
+Las vistas de fila sólo son válidas hasta la siguiente fila nueva (al crecer
+los arrays se reubican): se piden y se usan en el acto.
+
+table.regret_sum / table.strategy_sum exponen la interfaz de dict de antes
+(len, in, get, [key], items, values) para el código que los consultaba así.
+
+float32 basta para regret matching y para la estrategia media (se normaliza
+por fila); a partir de ~2²⁴ visitas de un mismo InfoSet los incrementos
+pequeños de strategy_sum empiezan a perder precisión.
+"""
+
+from collections.abc import MutableMapping
+
+import numpy as np
+
+
+class InfosetTable:
+    """
+    Índice clave → fila y arrays de regrets / estrategia acumulada.
+
+    Parámetros
+    ----------
+    n_actions : int        – columnas (acciones abstractas)
+    capacity  : int        – filas reservadas al inicio
+    dtype     : np.dtype   – tipo de los arrays (float32 por defecto)
+    """
+
+    def __init__(self, n_actions, capacity=1024, dtype=np.float32):
+        self.n_actions = n_actions
+        self.index     = {}                    # clave → fila
+        self._R        = np.zeros((capacity, n_actions), dtype=dtype)
+        self._S        = np.zeros((capacity, n_actions), dtype=dtype)
+        self.regret_sum   = _RowMapping(self, '_R')
+        self.strategy_sum = _RowMapping(self, '_S')
+
+    # ── Filas ─────────────────────────────────────────────────────────────────
+
+    def find(self, key):
+        """Fila de key, o None si no existe."""
+        return self.index.get(key)
+
+    def row(self, key):
+        """Fila de key; la crea (a ceros) si no existe."""
+        r = self.index.get(key)
+        if r is None:
+            r = len(self.index)
+            if r == len(self._R):
+                self._grow(2 * r)
+            self.index[key] = r
+        return r
+
+    def regret_row(self, key):
+        """Vista (NUM_ACTIONS,) de los regrets de key."""
+        r = self.row(key)                  # antes de leer _R: puede reubicarlo
+        return self._R[r]
+
+    def strategy_row(self, key):
+        """Vista (NUM_ACTIONS,) de la estrategia acumulada de key."""
+        r = self.row(key)
+        return self._S[r]
+
+    def _grow(self, capacity):
+        for name in ('_R', '_S'):
+            old = getattr(self, name)
+            new = np.zeros((capacity, self.n_actions), dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    # ── Arrays de las filas usadas ────────────────────────────────────────────
+
+    @property
+    def regrets(self):
+        return self._R[:len(self.index)]
+
+    @property
+    def strategy(self):
+        return self._S[:len(self.index)]
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def nbytes(self):
+        """Bytes reservados por los dos arrays (sin el índice)."""
+        return self._R.nbytes + self._S.nbytes
+
+    # ── Serialización ─────────────────────────────────────────────────────────
+
+    def to_state(self):
+        """Dict serializable: claves en orden de fila y los dos arrays recortados."""
+        return {'keys': list(self.index), 'regrets': self.regrets.copy(),
+                'strategy': self.strategy.copy()}
+
+    @classmethod
+    def from_state(cls, state):
+        """Inversa de to_state (copia en bloque de los arrays)."""
+        regrets = np.asarray(state['regrets'])
+        table   = cls(regrets.shape[1], capacity=max(1024, len(regrets)), dtype=regrets.dtype)
+        table.index = {k: i for i, k in enumerate(state['keys'])}
+        table._R[:len(regrets)] = regrets
+        table._S[:len(regrets)] = state['strategy']
+        return table
+
+    @classmethod
+    def from_dicts(cls, regret_sum, strategy_sum, n_actions, dtype=np.float32):
+        """Tabla a partir del formato anterior (dicts clave → ndarray)."""
+        keys  = list(regret_sum) + [k for k in strategy_sum if k not in regret_sum]
+        table = cls(n_actions, capacity=max(1024, len(keys)), dtype=dtype)
+        table.index = {k: i for i, k in enumerate(keys)}
+        for k, v in regret_sum.items():
+            table._R[table.index[k]] = v
+        for k, v in strategy_sum.items():
+            table._S[table.index[k]] = v
+        return table
+
+
+class _RowMapping(MutableMapping):
+    """Vista con interfaz de dict (clave → fila) de uno de los arrays de la tabla."""
+
+    def __init__(self, table, attr):
+        self._table = table
+        self._attr  = attr
+
+    def __getitem__(self, key):
+        r = self._table.index.get(key)
+        if r is None:
+            raise KeyError(key)
+        return getattr(self._table, self._attr)[r]
+
+    def __setitem__(self, key, value):
+        r = self._table.row(key)
+        getattr(self._table, self._attr)[r] = value
+
+    def __delitem__(self, key):
+        raise TypeError("InfosetTable no admite borrar filas")
+
+    def __iter__(self):
+        return iter(self._table.index)
+
+    def __len__(self):
+        return len(self._table.index)
+
+    def __contains__(self, key):
+        return key in self._table.index
@@ -18,6 +18,8 @@ Eficiencia
 Los buckets (EHS / EHS²) se precomputan UNA sola vez por iteración antes de
 iniciar el traversal del árbol. Dentro del árbol solo se hacen accesos O(1)
 a la tabla de buckets → cada iteración tarda milisegundos, no minutos.
+El árbol de apuestas (máscaras, hijos, pagos terminales) se compila una vez
+por proceso en cfr/betting_tree.py; el traversal recorre ids de nodo.
 
 Convergencia
 ------------
@@ -49,15 +51,15 @@ import numpy as np
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from abstracciones.card_abstractor import (
-    preflop_bucket, postflop_bucket, POSTFLOP_BUCKETS,
-)
-from abstracciones.infoset_encoder import (
-    FOLD, CALL, RAISE_THIRD, RAISE_HALF, RAISE_POT, RAISE_2POT, ALLIN,
-    ABSTRACT_ACTIONS, NUM_ACTIONS, ACTION_IDX,
-    RAISE_RATIOS, encode_infoset,
+    preflop_bucket, postflop_bucket, postflop_bucket_batch, POSTFLOP_BUCKETS,
 )
+from cfr.betting_tree import FOLDED, blueprint_tree, legal_mask
+from cfr.infoset_table import InfosetTable
+from abstracciones.infoset_encoder import ABSTRACT_ACTIONS, NUM_ACTIONS, encode_infoset
 
 BLUEPRINT_PATH = os.path.join(os.path.dirname(__file__), 'blueprint.pkl')
+TRAIN_MODES    = ('external', 'vector')
+VARIANTS       = ('vanilla', 'cfr+', 'linear', 'dcfr')
 
 RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
 SUITS = ['s', 'h', 'd', 'c']
@@ -84,7 +86,7 @@ def _regret_match(regrets, mask):
     Regret Matching: σ(a) = max(0, R(a)) / Σ max(0, R(·))
     Si todos los regrets son ≤ 0, distribuye uniformemente entre acciones válidas.
     """
-    pos   = np.maximum(0.0, regrets) * mask
+    pos   = np.maximum(0.0, regrets, dtype=np.float64) * mask
     total = pos.sum()
     if total > 0.0:
         return pos / total
@@ -112,6 +114,34 @@ def _fast_key(player, street_idx, bkts, bet_hist):
     return (player, street_idx, hb, tuple(bet_hist))
 
 
+# ── Reducción de tablas entre procesos ───────────────────────────────────────
+
+def _table_delta(table, before):
+    """Incremento de las claves tocadas: table[k] − before[k] (before[k] None = nueva)."""
+    return {k: table[k] - b if b is not None else table[k].copy()
+            for k, b in before.items() if k in table}
+
+
+def _merge_deltas(deltas):
+    """Suma varios dicts clave → incremento."""
+    out = {}
+    for d in deltas:
+        for k, v in d.items():
+            if k in out:
+                out[k] = out[k] + v
+            else:
+                out[k] = v
+    return out
+
+
+def _apply_delta(table, delta, sign=1.0):
+    for k, v in delta.items():
+        if k in table:
+            table[k] += sign * v
+        else:
+            table[k] = sign * v
+
+
 # ── Trainer ───────────────────────────────────────────────────────────────────
 
 class MCCFRTrainer:
@@ -120,31 +150,127 @@ class MCCFRTrainer:
 
     Atributos públicos
     ------------------
-    regret_sum   : dict[tuple, np.ndarray]  – regrets acumulados
-    strategy_sum : dict[tuple, np.ndarray]  – estrategia acumulada (para promedio)
-    iterations   : int                      – iteraciones completadas
+    table        : InfosetTable  – índice clave → fila y arrays float32 de
+                                   regrets y estrategia acumulada
+    regret_sum   : vista tipo dict clave → fila de regrets (table.regret_sum)
+    strategy_sum : vista tipo dict clave → fila de estrategia acumulada
+    iterations   : int           – iteraciones completadas
+    variant, alpha, beta, gamma, avg_delay – variante de CFR (ver set_variant)
     """
 
-    def __init__(self):
-        self.regret_sum:   dict = {}
-        self.strategy_sum: dict = {}
-        self.iterations:   int  = 0
+    def __init__(self, variant='vanilla', alpha=1.5, beta=0.0, gamma=2.0, avg_delay=0):
+        self.table:      InfosetTable = InfosetTable(NUM_ACTIONS)
+        self.iterations: int          = 0
+        # Worker de train_parallel: valores previos de las claves tocadas
+        # desde la última reducción ({clave: array | None} × 2)
+        self._touched = None
+        # mode='vector': VectorCFR (filas por nodo del árbol), creado al usarlo
+        self._vector  = None
+        self.set_variant(variant, alpha, beta, gamma, avg_delay)
 
     # ── Acceso a tablas ──────────────────────────────────────────────────────
 
+    @property
+    def regret_sum(self):
+        return self.table.regret_sum
+
+    @property
+    def strategy_sum(self):
+        return self.table.strategy_sum
+
     def _regrets(self, key) -> np.ndarray:
-        if key not in self.regret_sum:
-            self.regret_sum[key] = np.zeros(NUM_ACTIONS, dtype=np.float64)
-        return self.regret_sum[key]
+        """Vista de la fila de regrets de key (válida hasta crear otra fila)."""
+        if self._touched is not None and key not in self._touched[0]:
+            r = self.table.find(key)
+            self._touched[0][key] = None if r is None else self.table.regrets[r].copy()
+        return self.table.regret_row(key)
 
     def _strat_sum(self, key) -> np.ndarray:
-        if key not in self.strategy_sum:
-            self.strategy_sum[key] = np.zeros(NUM_ACTIONS, dtype=np.float64)
-        return self.strategy_sum[key]
+        """Vista de la fila de estrategia acumulada de key."""
+        if self._touched is not None and key not in self._touched[1]:
+            r = self.table.find(key)
+            self._touched[1][key] = None if r is None else self.table.strategy[r].copy()
+        return self.table.strategy_row(key)
 
     def _strategy(self, key, mask) -> np.ndarray:
         return _regret_match(self._regrets(key), mask)
 
+    # ── Variantes de CFR ─────────────────────────────────────────────────────
+
+    def set_variant(self, variant='vanilla', alpha=1.5, beta=0.0, gamma=2.0, avg_delay=0):
+        """
+        Elige cómo se acumulan regrets y estrategia media.
+
+        Parámetros
+        ----------
+        variant   : str   – 'vanilla': sumas sin ponderar
+                            'cfr+'   : regrets truncados a ≥ 0 tras cada
+                                       actualización y media ponderada por t
+                            'linear' : regrets y media ponderados por t
+                                       (Linear CFR = DCFR con α = β = γ = 1)
+                            'dcfr'   : al final de cada iteración t los regrets
+                                       positivos se multiplican por tᵅ/(tᵅ+1),
+                                       los negativos por tᵝ/(tᵝ+1) y la media
+                                       por (t/(t+1))ᵞ
+        alpha, beta, gamma : float – exponentes de DCFR (por defecto 1.5, 0, 2)
+        avg_delay : int   – iteraciones iniciales que no entran en la
+                            estrategia media (con cfr+ / linear el peso
+                            pasa a ser t − avg_delay)
+        """
+        if variant not in VARIANTS:
+            raise ValueError(f"variant debe ser uno de {VARIANTS}, no {variant!r}")
+        self.variant   = variant
+        self.alpha     = float(alpha)
+        self.beta      = float(beta)
+        self.gamma     = float(gamma)
+        self.avg_delay = int(avg_delay)
+        self._begin_iteration()
+
+    def variant_config(self):
+        """Argumentos de set_variant de este trainer (se guardan con el blueprint)."""
+        return {'variant': self.variant, 'alpha': self.alpha, 'beta': self.beta,
+                'gamma': self.gamma, 'avg_delay': self.avg_delay}
+
+    def _begin_iteration(self):
+        """Pesos de las actualizaciones de la iteración t = iterations + 1."""
+        t = self.iterations + 1
+        self._w_regret = float(t) if self.variant == 'linear' else 1.0
+        if t <= self.avg_delay:
+            self._w_strategy = 0.0
+        elif self.variant in ('cfr+', 'linear'):
+            self._w_strategy = float(t - self.avg_delay)
+        else:
+            self._w_strategy = 1.0
+
+    def _end_iteration(self):
+        if self.variant == 'dcfr':
+            self._discount(self.iterations + 1)
+
+    def _discount(self, t):
+        """Descuento de DCFR de la iteración t sobre toda la tabla."""
+        R  = self.table.regrets
+        ta = t ** self.alpha
+        tb = t ** self.beta
+        R *= np.where(R > 0, ta / (ta + 1.0), tb / (tb + 1.0))
+        self.table.strategy[:] *= (t / (t + 1.0)) ** self.gamma
+
+    def _after_reduction(self, t):
+        """train_parallel: la suma de incrementos puede dejar regrets < 0 (cfr+)
+        y el descuento de DCFR se aplica una vez por reducción."""
+        if self.variant == 'cfr+':
+            np.maximum(self.table.regrets, 0.0, out=self.table.regrets)
+        elif self.variant == 'dcfr':
+            self._discount(t)
+
+    def _update(self, key, action_vals, ev, strategy, mask):
+        """Regrets y estrategia media de un nodo del traverser, según la variante."""
+        r  = self._regrets(key)
+        r += self._w_regret * (action_vals - ev) * mask
+        if self.variant == 'cfr+':
+            np.maximum(r, 0.0, out=r)
+        if self._w_strategy:
+            self._strat_sum(key)[:] += self._w_strategy * strategy
+
     # ── Precompute de buckets ────────────────────────────────────────────────
 
     @staticmethod
@@ -153,19 +279,22 @@ class MCCFRTrainer:
         Calcula todos los buckets necesarios para UN traversal completo.
         Solo se llama UNA vez por iteración (fuera del bucle recursivo).
 
+        Las dos manos de cada calle se resuelven con una llamada a
+        postflop_bucket_batch (runouts y rivales compartidos).
+
         Retorna dict {(player_idx, street_idx) → bucket_int}.
         """
         bkts = {}
-        flop_board  = boards[0]
-        turn_board  = boards[0] + boards[1]
-        river_board = boards[0] + boards[1] + boards[2]
+        street_boards = (boards[0],
+                         boards[0] + boards[1],
+                         boards[0] + boards[1] + boards[2])
 
         for p in [0, 1]:
-            hand = hands[p]
-            bkts[(p, 0)] = preflop_bucket(hand,            num_sims=sims)
-            bkts[(p, 1)] = postflop_bucket(hand, flop_board,  num_sims=sims)
-            bkts[(p, 2)] = postflop_bucket(hand, turn_board,  num_sims=sims)
-            bkts[(p, 3)] = postflop_bucket(hand, river_board, num_sims=sims)
+            bkts[(p, 0)] = preflop_bucket(hands[p], num_sims=sims)
+        for s, board in enumerate(street_boards, start=1):
+            b0, b1 = postflop_bucket_batch(board, hands).tolist()
+            bkts[(0, s)] = b0
+            bkts[(1, s)] = b1
         return bkts
 
     # ── Máscara de acciones válidas ──────────────────────────────────────────
@@ -173,107 +302,14 @@ class MCCFRTrainer:
     @staticmethod
     def _mask(to_call, stack, n_raises, raise_max=2):
         """Booleano por acción: True = acción válida en este estado."""
-        m = np.ones(NUM_ACTIONS, dtype=bool)
-        if to_call == 0.0:
-            m[ACTION_IDX[FOLD]] = False          # no se puede fold sin apuesta
-        if n_raises >= raise_max:
-            for a in [RAISE_THIRD, RAISE_HALF, RAISE_POT, RAISE_2POT]:
-                m[ACTION_IDX[a]] = False         # límite de raises alcanzado
-        if stack <= to_call:
-            for a in [RAISE_THIRD, RAISE_HALF, RAISE_POT, RAISE_2POT]:
-                m[ACTION_IDX[a]] = False         # no hay fichas para raise
-        return m
-
-    # ── Lógica de transición ─────────────────────────────────────────────────
-
-    def _apply_action(self, action, traverser,
-                      bkts, boards, street_idx,
-                      pot, stacks, contribs, bet_hist, n_raises, to_call,
-                      position):
-        """
-        Aplica una acción abstracta y devuelve el valor (en BBs) para el traverser.
-        """
-        active   = position
-        opponent = 1 - active
+        return legal_mask(to_call, stack, n_raises, raise_max)
 
-        if action == FOLD:
-            if traverser == opponent:
-                return float(pot)
-            else:
-                return -float(contribs[active])
-
-        elif action == CALL:
-            amount = min(to_call, stacks[active])
-            ns = list(stacks);  nc = list(contribs)
-            ns[active]  -= amount
-            nc[active]  += amount
-            new_pot = pot + amount
-
-            if nc[0] == nc[1] or ns[active] == 0.0:
-                # Caso especial: limp de SB preflop (street_idx=0, active=0,
-                # bet_hist vacío). En HUNL el BB tiene opción de subir tras el limp.
-                if street_idx == 0 and active == 0 and not bet_hist:
-                    return self._cfr(
-                        traverser, bkts, boards, street_idx, new_pot,
-                        ns, nc, [CALL],
-                        n_raises, 0.0, opponent)   # to_call=0: BB puede check o raise
-                if street_idx < 3:
-                    return self._next_street(
-                        traverser, bkts, boards, street_idx + 1, new_pot, ns)
-                else:
-                    return self._showdown(traverser, bkts, new_pot, nc[traverser])
-            else:
-                return self._cfr(
-                    traverser, bkts, boards, street_idx, new_pot,
-                    ns, nc, bet_hist + [CALL],
-                    n_raises, nc[opponent] - nc[active], opponent)
-
-        elif action == ALLIN:
-            amount = stacks[active]
-            ns = list(stacks);  nc = list(contribs)
-            ns[active] = 0.0
-            nc[active] += amount
-            new_pot    = pot + amount
-            new_to_call = max(0.0, nc[active] - nc[opponent])
-            return self._cfr(
-                traverser, bkts, boards, street_idx, new_pot,
-                ns, nc, bet_hist + [ALLIN],
-                n_raises + 1, new_to_call, opponent)
+    @property
+    def tree(self):
+        """Árbol abstracto compilado (betting_tree.blueprint_tree, uno por proceso)."""
+        return blueprint_tree()
 
-        else:
-            # Raise proporcional
-            ratio       = RAISE_RATIOS.get(action, 1.0)
-            raise_extra = min(ratio * pot, stacks[active] - to_call)
-
-            # BUG-7 fix: si pot==0 el raise_extra sería 0, ejecutando en realidad
-            # un CALL pero registrando la acción como RAISE en bet_hist.
-            # Degradar a CALL para mantener la coherencia del historial.
-            if raise_extra == 0:
-                return self._apply_action(
-                    CALL, traverser, bkts, boards, street_idx,
-                    pot, stacks, contribs, bet_hist, n_raises, to_call, position)
-
-            total_add   = to_call + raise_extra
-            if total_add >= stacks[active]:
-                total_add = stacks[active]
-                action    = ALLIN
-
-            ns = list(stacks);  nc = list(contribs)
-            ns[active]  -= total_add
-            nc[active]  += total_add
-            new_pot      = pot + total_add
-            new_to_call  = nc[active] - nc[opponent]
-            return self._cfr(
-                traverser, bkts, boards, street_idx, new_pot,
-                ns, nc, bet_hist + [action],
-                n_raises + 1, new_to_call, opponent)
-
-    def _next_street(self, traverser, bkts, boards, next_street_idx, pot, stacks):
-        """Inicia la siguiente calle. BB actúa primero en postflop."""
-        return self._cfr(
-            traverser, bkts, boards, next_street_idx, pot,
-            stacks, [0.0, 0.0], [], 0, 0.0,
-            position=1)
+    # ── Showdown con buckets ─────────────────────────────────────────────────
 
     def _showdown(self, traverser, bkts, pot, my_contrib=None):
         """
@@ -298,52 +334,89 @@ class MCCFRTrainer:
         contrib = my_contrib if my_contrib is not None else pot / 2.0
         return eq * pot - contrib
 
+    def _value(self, traverser, bkts, child):
+        """Valor de un hijo del árbol: recursión si es de decisión, pago si es terminal."""
+        if child >= 0:
+            return self._cfr(traverser, bkts, child)
+        tree = self.tree
+        t    = ~child
+        if tree.term_kind[t] == FOLDED:
+            folder = tree.term_player[t]
+            if traverser != folder:
+                return float(tree.term_pot[t])
+            return -float(tree.term_contrib[t, folder])
+        return self._showdown(traverser, bkts, float(tree.term_pot[t]),
+                              float(tree.term_contrib[t, traverser]))
+
     # ── CFR recursivo (External Sampling) ────────────────────────────────────
 
-    def _cfr(self, traverser,
-             bkts, boards, street_idx,
-             pot, stacks, contribs,
-             bet_hist, n_raises, to_call, position):
+    def _cfr(self, traverser, bkts, node=0):
         """
-        External Sampling MCCFR sobre el árbol abstracto.
-        Usa bkts (precomputado) para InfoSet keys → O(1) por nodo.
+        External Sampling MCCFR sobre el árbol abstracto compilado.
+        Usa bkts (precomputado) para InfoSet keys → O(1) por nodo; el estado
+        de apuestas (máscara, hijos, pagos) se lee de self.tree por id de nodo.
 
         - traverser: explora TODAS las acciones  → actualiza regrets
         - oponente : muestrea UNA acción según estrategia actual
         """
-        active  = position
+        tree   = self.tree
+        active = tree.player[node]
 
         # Construir la clave del InfoSet sin Monte Carlo (O(1))
-        key      = _fast_key(active, street_idx, bkts, bet_hist)
-        mask     = self._mask(to_call, stacks[active], n_raises)
+        key      = _fast_key(active, tree.street[node], bkts, tree.hist[node])
+        mask     = tree.mask[node]
         strategy = self._strategy(key, mask)
+        child    = tree.child[node]
 
         if active == traverser:
-            valid_idxs  = np.where(mask)[0]
             action_vals = np.zeros(NUM_ACTIONS)
-            for idx in valid_idxs:
-                action_vals[idx] = self._apply_action(
-                    ABSTRACT_ACTIONS[idx], traverser,
-                    bkts, boards, street_idx,
-                    pot, stacks, contribs, bet_hist, n_raises, to_call, position)
+            for idx in tree.legal[node]:
+                action_vals[idx] = self._value(traverser, bkts, int(child[idx]))
 
             ev = float(np.dot(strategy, action_vals))
-            self._regrets(key)[:] += (action_vals - ev) * mask
-            self._strat_sum(key)[:] += strategy
+            self._update(key, action_vals, ev, strategy, mask)
             return ev
 
         else:
             idx = int(np.random.choice(NUM_ACTIONS, p=strategy))
-            self._strat_sum(key)[:] += strategy
-            return self._apply_action(
-                ABSTRACT_ACTIONS[idx], traverser,
-                bkts, boards, street_idx,
-                pot, stacks, contribs, bet_hist, n_raises, to_call, position)
+            if self._w_strategy:
+                self._strat_sum(key)[:] += self._w_strategy * strategy
+            return self._value(traverser, bkts, int(child[idx]))
 
     # ── Entrenamiento ─────────────────────────────────────────────────────────
 
+    def _iteration(self, bucket_sims):
+        """Una iteración: reparto, buckets y un traversal por jugador."""
+        hand0, hand1, flop, turn, river = _deal()
+        hands  = [hand0, hand1]
+        boards = [flop, turn, river]
+
+        # Precomputar buckets UNA sola vez para este deal
+        bkts = self._precompute_buckets(hands, boards, sims=bucket_sims)
+
+        # Raíz del árbol: blinds SB=0.5, BB=1.0 → pot=1.5, SB to_call=0.5
+        for traverser in [0, 1]:
+            self._cfr(traverser, bkts)
+
+    def train_on(self, bkts):
+        """
+        Una iteración completa sobre buckets ya calculados (p.ej. de una mano
+        jugada, ver web/app.py): pesos de la variante, traversal de P0 y P1,
+        descuento de DCFR e iterations += 1.
+
+        Parámetros
+        ----------
+        bkts : dict – resultado de _precompute_buckets(hands, boards)
+        """
+        self._begin_iteration()
+        for traverser in [0, 1]:
+            self._cfr(traverser, bkts)
+        self._end_iteration()
+        self.iterations += 1
+
     def train(self, num_iterations: int = 50_000, log_every: int = 5_000,
-              bucket_sims: int = 50, save_every: int = 10_000):
+              bucket_sims: int = 50, save_every: int = 10_000, on_log=None,
+              mode: str = 'external'):
         """
         Ejecuta num_iterations iteraciones de External Sampling MCCFR.
 
@@ -353,6 +426,11 @@ class MCCFRTrainer:
           3. Traversal desde perspectiva P0
           4. Traversal desde perspectiva P1
 
+        Con mode='vector' cada iteración muestrea sólo el board y recorre el
+        árbol una vez por jugador con vectores sobre todas las manos
+        (cfr/vector_cfr.py): mucho más cara por iteración, pero cada una
+        equivale a todos los repartos de ese board.
+
         Parámetros
         ----------
         num_iterations : int  – iteraciones de entrenamiento
@@ -363,31 +441,30 @@ class MCCFRTrainer:
         save_every     : int  – (MEMORY-1) checkpoint automático cada N iteraciones.
                                Previene pérdida total si el proceso muere durante
                                entrenamientos largos. 0 = desactivado.
+        on_log         : callable | None – on_log(i) tras cada línea de log
+                               (p.ej. imprimir cache_metrics.cache_report()).
+        mode           : str  – 'external' (External Sampling) o 'vector'
         """
-        print(f"Iniciando MCCFR. Objetivo: {num_iterations:,} iteraciones.")
+        if mode not in TRAIN_MODES:
+            raise ValueError(f"mode debe ser uno de {TRAIN_MODES}, no {mode!r}")
+        if mode == 'vector':
+            if self._vector is None:
+                from cfr.vector_cfr import VectorCFR
+                self._vector = VectorCFR(self)
+            step = self._vector.iteration
+        else:
+            step = self._iteration
+        label = ' vectorial' if mode == 'vector' else ''
+        print(f"Iniciando MCCFR{label}. Objetivo: {num_iterations:,} iteraciones.")
         for i in range(1, num_iterations + 1):
-            hand0, hand1, flop, turn, river = _deal()
-            hands  = [hand0, hand1]
-            boards = [flop, turn, river]
-
-            # Precomputar buckets UNA sola vez para este deal
-            bkts = self._precompute_buckets(hands, boards, sims=bucket_sims)
-
-            # Blinds: SB=0.5, BB=1.0 → pot=1.5, SB to_call=0.5
-            init_kwargs = dict(
-                bkts=bkts, boards=boards,
-                street_idx=0, pot=1.5,
-                stacks=[99.5, 99.0],
-                contribs=[0.5, 1.0],
-                bet_hist=[], n_raises=0,
-                to_call=0.5, position=0,
-            )
-            for traverser in [0, 1]:
-                self._cfr(traverser, **init_kwargs)
-
+            self._begin_iteration()
+            step(bucket_sims)
+            self._end_iteration()
             self.iterations += 1
             if i % log_every == 0:
                 print(f"  iter {i:>8,}  |  InfoSets: {len(self.regret_sum):>8,}")
+                if on_log is not None:
+                    on_log(i)
             # MEMORY-1: checkpoint periódico para evitar pérdida total en entrenos largos
             if save_every and i % save_every == 0:
                 self.save()
@@ -395,6 +472,101 @@ class MCCFRTrainer:
 
         print(f"Entrenamiento completado. InfoSets: {len(self.regret_sum):,}")
 
+    def train_parallel(self, num_iterations: int = 50_000, workers: int = None,
+                       sync_every: int = 500, log_every: int = 5_000,
+                       bucket_sims: int = 50, save_every: int = 10_000,
+                       on_log=None, seed=None):
+        """
+        External Sampling MCCFR en `workers` procesos.
+
+        Cada worker arranca con una copia de las tablas y ejecuta iteraciones
+        independientes con su propio flujo aleatorio (SeedSequence). Cada
+        sync_every iteraciones por worker, el proceso principal suma los
+        incrementos de regret_sum / strategy_sum de todos (reducción) y
+        reenvía el total; cada worker le resta el suyo y queda igual que la
+        tabla maestra. Entre sincronizaciones un worker no ve los regrets
+        de los demás (como un MCCFR con actualizaciones retrasadas).
+
+        Variantes (set_variant): los workers usan los pesos de la iteración
+        global que les toca (intercaladas: base + rank + k·workers); el suelo
+        de cfr+ y el descuento de DCFR se aplican además tras cada reducción
+        (el descuento sólo ahí, con t = número de reducciones).
+
+        Con POKER_SHARED_BUCKETS (card_abstractor.enable_shared_bucket_cache)
+        los workers comparten además los buckets calculados.
+
+        Parámetros
+        ----------
+        num_iterations : int        – iteraciones totales (repartidas entre workers)
+        workers        : int | None – procesos (None = os.cpu_count())
+        sync_every     : int        – iteraciones por worker entre reducciones
+        log_every, bucket_sims, save_every, on_log – como en train(); el log y
+                                      los checkpoints se hacen en la primera
+                                      reducción que alcanza cada múltiplo
+        seed           : int | None – semilla de los flujos de los workers
+                                      (random, np.random y los generadores de
+                                      card_abstractor, montecarlo y
+                                      range_equity); con la misma semilla y
+                                      sin POKER_SHARED_BUCKETS el resultado
+                                      es reproducible
+        """
+        import multiprocessing as mp
+
+        workers = max(1, workers or os.cpu_count() or 1)
+        blueprint_tree()                    # compilado antes del fork: lo heredan los workers
+        streams = np.random.SeedSequence(seed).spawn(workers)
+        procs, conns = [], []
+        for rank, ss in enumerate(streams):
+            parent, child = mp.Pipe()
+            proc = mp.Process(target=_worker_main, daemon=True,
+                              args=(child, ss, self.table, bucket_sims,
+                                    self.variant_config(), rank, workers))
+            proc.start()
+            child.close()
+            procs.append(proc)
+            conns.append(parent)
+
+        print(f"Iniciando MCCFR paralelo. Objetivo: {num_iterations:,} iteraciones "
+              f"en {workers} workers (sincronización cada {sync_every:,}).")
+        done = 0
+        try:
+            while done < num_iterations:
+                left   = num_iterations - done
+                counts = [min(sync_every, left // workers + (w < left % workers))
+                          for w in range(workers)]
+                for conn, n in zip(conns, counts):
+                    conn.send((n, self.iterations))
+                deltas = [conn.recv() for conn in conns]
+                total  = (_merge_deltas([d[0] for d in deltas]),
+                          _merge_deltas([d[1] for d in deltas]))
+                prev, done = done, done + sum(counts)
+                self.iterations += sum(counts)
+                t_block = max(1, self.iterations // (sync_every * workers))
+                for conn in conns:
+                    conn.send((total, t_block))
+                _apply_delta(self.regret_sum, total[0])
+                _apply_delta(self.strategy_sum, total[1])
+                self._after_reduction(t_block)
+
+                if done // log_every > prev // log_every:
+                    print(f"  iter {done:>8,}  |  InfoSets: {len(self.regret_sum):>8,}")
+                    if on_log is not None:
+                        on_log(done)
+                if save_every and done // save_every > prev // save_every:
+                    self.save()
+                    print(f"  ✓ Checkpoint iter {done:,} guardado.")
+        finally:
+            for conn in conns:
+                try:
+                    conn.send(None)
+                except OSError:                 # el worker ya terminó
+                    pass
+                conn.close()
+            for proc in procs:
+                proc.join()
+
+        print(f"Entrenamiento completado. InfoSets: {len(self.regret_sum):,}")
+
     # ── Consulta de estrategia ────────────────────────────────────────────────
 
     def get_strategy(self, key) -> np.ndarray:
@@ -412,9 +584,10 @@ class MCCFRTrainer:
         -------
         np.ndarray shape (NUM_ACTIONS,) normalizado a suma 1.
         """
-        if key not in self.strategy_sum:
+        r = self.table.find(key)
+        if r is None:
             return np.ones(NUM_ACTIONS, dtype=np.float64) / NUM_ACTIONS
-        s     = self.strategy_sum[key].copy()
+        s     = self.table.strategy[r].astype(np.float64)
         total = s.sum()
         if total > 0.0:
             return s / total
@@ -428,28 +601,39 @@ class MCCFRTrainer:
     # ── Serialización ─────────────────────────────────────────────────────────
 
     def save(self, path=None):
-        """Serializa el blueprint en disco (pickle)."""
+        """
+        Serializa el blueprint en disco (pickle): la lista de claves en orden
+        de fila y los dos arrays de InfosetTable, copiados en bloque.
+        """
         path = path or BLUEPRINT_PATH
         os.makedirs(os.path.dirname(path), exist_ok=True)
         with open(path, 'wb') as f:
             pickle.dump({
-                'regret_sum':   self.regret_sum,
-                'strategy_sum': self.strategy_sum,
-                'iterations':   self.iterations,
+                'table':      self.table.to_state(),
+                'iterations': self.iterations,
+                'variant':    self.variant_config(),
             }, f, protocol=4)
         print(f"Blueprint guardado en '{path}'  ({self.iterations:,} iters, "
               f"{len(self.regret_sum):,} InfoSets)")
 
     @classmethod
     def load(cls, path=None):
-        """Carga un blueprint previamente guardado con save()."""
+        """
+        Carga un blueprint guardado con save(). Acepta también el formato
+        anterior (dicts regret_sum / strategy_sum clave → ndarray); sin
+        variante guardada el trainer queda en 'vanilla'.
+        """
         path = path or BLUEPRINT_PATH
-        trainer = cls()
         with open(path, 'rb') as f:
             data = pickle.load(f)
-        trainer.regret_sum   = data['regret_sum']
-        trainer.strategy_sum = data['strategy_sum']
-        trainer.iterations   = data['iterations']
+        trainer = cls(**data.get('variant', {}))
+        if 'table' in data:
+            trainer.table = InfosetTable.from_state(data['table'])
+        else:
+            trainer.table = InfosetTable.from_dicts(data['regret_sum'], data['strategy_sum'],
+                                                    NUM_ACTIONS)
+        trainer.iterations = data['iterations']
+        trainer._begin_iteration()          # pesos de la variante para t = iterations + 1
         print(f"Blueprint cargado desde '{path}'  ({trainer.iterations:,} iters, "
               f"{len(trainer.regret_sum):,} InfoSets)")
         return trainer
@@ -484,8 +668,6 @@ class MCCFRTrainer:
         -------
         float – exploitabilidad en milli-big-blinds por mano (mbb/m)
         """
-        START_STACKS = [99.5, 99.0]   # stacks después de pagar blinds
-
         br_sum = [0.0, 0.0]
         for _ in range(num_samples):
             hand0, hand1, flop, turn, river = _deal()
@@ -493,161 +675,108 @@ class MCCFRTrainer:
             boards = [flop, turn, river]
             bkts   = self._precompute_buckets(hands, boards, sims=bucket_sims)
 
-            init = dict(
-                bkts=bkts, boards=boards,
-                street_idx=0, pot=1.5,
-                stacks=list(START_STACKS),
-                contribs=[0.5, 1.0],
-                bet_hist=[], n_raises=0,
-                to_call=0.5, position=0,
-                start_stacks=list(START_STACKS),
-            )
             for br_player in [0, 1]:
-                br_sum[br_player] += self._best_response(br_player, **init)
+                br_sum[br_player] += self._best_response(br_player, bkts)
 
         eps_bb  = sum(br_sum) / (2.0 * num_samples)
         return eps_bb * 1000.0   # → mbb/mano
 
-    def _best_response(self, br_player,
-                       bkts, boards, street_idx,
-                       pot, stacks, contribs,
-                       bet_hist, n_raises, to_call, position,
-                       start_stacks=None) -> float:
+    def _best_response(self, br_player, bkts, node=0) -> float:
         """
         Traversal recursivo de Best Response para br_player.
 
         - br_player  : elige la acción con máximo valor  (greedy)
         - oponente   : sigue la estrategia promedio del blueprint
-        - start_stacks: stacks al inicio de la mano para calcular inversión total
         """
-        if start_stacks is None:
-            start_stacks = list(stacks)
-
-        active = position
-        key    = _fast_key(active, street_idx, bkts, bet_hist)
-        mask   = self._mask(to_call, stacks[active], n_raises)
-
-        kw = dict(br_player=br_player, bkts=bkts, boards=boards,
-                  start_stacks=start_stacks)
+        tree   = self.tree
+        active = tree.player[node]
+        mask   = tree.mask[node]
+        child  = tree.child[node]
 
         if active == br_player:
             best = -1e9
-            for idx in np.where(mask)[0]:
-                v = self._apply_br(
-                    ABSTRACT_ACTIONS[idx], **kw,
-                    street_idx=street_idx, pot=pot,
-                    stacks=stacks, contribs=contribs,
-                    bet_hist=bet_hist, n_raises=n_raises,
-                    to_call=to_call, position=position,
-                )
+            for idx in tree.legal[node]:
+                v = self._br_value(br_player, bkts, int(child[idx]))
                 if v > best:
                     best = v
             return best
         else:
+            key   = _fast_key(active, tree.street[node], bkts, tree.hist[node])
             avg   = self.get_strategy(key) * mask
             total = avg.sum()
             avg   = avg / total if total > 0.0 else (mask.astype(float) / mask.sum())
             idx   = int(np.random.choice(NUM_ACTIONS, p=avg))
-            return self._apply_br(
-                ABSTRACT_ACTIONS[idx], **kw,
-                street_idx=street_idx, pot=pot,
-                stacks=stacks, contribs=contribs,
-                bet_hist=bet_hist, n_raises=n_raises,
-                to_call=to_call, position=position,
-            )
-
-    def _apply_br(self, action, br_player,
-                  bkts, boards, street_idx,
-                  pot, stacks, contribs,
-                  bet_hist, n_raises, to_call, position,
-                  start_stacks=None) -> float:
+            return self._br_value(br_player, bkts, int(child[idx]))
+
+    def _br_value(self, br_player, bkts, child) -> float:
         """
-        Aplica una acción y continúa el traversal de Best Response.
+        Valor de un hijo en el traversal de Best Response.
 
-        Retorna la utilidad NETA del br_player:
+        En los terminales retorna la utilidad NETA del br_player:
             ganancia_neta = pot × equity − inversión_total_del_br_player
-        donde inversión_total = start_stacks[br_player] − stacks_actuales[br_player].
+        donde inversión_total = stack de la raíz − stack final (term_invested).
         """
-        if start_stacks is None:
-            start_stacks = list(stacks)
-
-        active   = position
-        opponent = 1 - active
-
-        def invested(s):
-            """Inversión total del br_player hasta este momento."""
-            return start_stacks[br_player] - s[br_player]
-
-        def recurse(**kw_extra):
-            return self._best_response(
-                br_player, bkts=bkts, boards=boards,
-                start_stacks=start_stacks, **kw_extra)
-
-        if action == FOLD:
-            if br_player == opponent:
+        if child >= 0:
+            return self._best_response(br_player, bkts, child)
+        tree     = self.tree
+        t        = ~child
+        invested = float(tree.term_invested[t, br_player])
+
+        if tree.term_kind[t] == FOLDED:
+            if br_player != tree.term_player[t]:
                 # br_player gana: utilidad neta = pot − inversión_propia
-                return float(pot) - invested(stacks)
-            else:
-                # br_player foldea: pierde toda su inversión
-                return -invested(stacks)
-
-        elif action == CALL:
-            amount = min(to_call, stacks[active])
-            ns = list(stacks);  nc = list(contribs)
-            ns[active]  -= amount
-            nc[active]  += amount
-            new_pot = pot + amount
-
-            if nc[0] == nc[1] or ns[active] == 0.0:
-                if street_idx == 0 and active == 0 and not bet_hist:
-                    return recurse(street_idx=0, pot=new_pot, stacks=ns,
-                                   contribs=nc, bet_hist=[CALL],
-                                   n_raises=0, to_call=0.0, position=opponent)
-                if street_idx < 3:
-                    return recurse(street_idx=street_idx + 1, pot=new_pot,
-                                   stacks=ns, contribs=[0.0, 0.0],
-                                   bet_hist=[], n_raises=0,
-                                   to_call=0.0, position=1)
-                else:
-                    # Showdown: utilidad neta con inversión total acumulada
-                    b0 = bkts[(0, 3)]; b1 = bkts[(1, 3)]
-                    if   b0 > b1: eq0 = 0.5 + 0.5 * (b0 - b1) / POSTFLOP_BUCKETS
-                    elif b1 > b0: eq0 = 0.5 - 0.5 * (b1 - b0) / POSTFLOP_BUCKETS
-                    else:         eq0 = 0.5
-                    eq = eq0 if br_player == 0 else (1.0 - eq0)
-                    return eq * new_pot - invested(ns)
-            return recurse(street_idx=street_idx, pot=new_pot, stacks=ns,
-                           contribs=nc, bet_hist=bet_hist + [CALL],
-                           n_raises=n_raises,
-                           to_call=nc[opponent] - nc[active], position=opponent)
-
-        elif action == ALLIN:
-            amount = stacks[active]
-            ns = list(stacks);  nc = list(contribs)
-            ns[active]  = 0.0
-            nc[active] += amount
-            new_pot     = pot + amount
-            new_to_call = max(0.0, nc[active] - nc[opponent])
-            return recurse(street_idx=street_idx, pot=new_pot, stacks=ns,
-                           contribs=nc, bet_hist=bet_hist + [ALLIN],
-                           n_raises=n_raises + 1, to_call=new_to_call,
-                           position=opponent)
+                return float(tree.term_pot[t]) - invested
+            # br_player foldea: pierde toda su inversión
+            return -invested
+
+        # Showdown: utilidad neta con inversión total acumulada
+        b0 = bkts[(0, 3)]; b1 = bkts[(1, 3)]
+        if   b0 > b1: eq0 = 0.5 + 0.5 * (b0 - b1) / POSTFLOP_BUCKETS
+        elif b1 > b0: eq0 = 0.5 - 0.5 * (b1 - b0) / POSTFLOP_BUCKETS
+        else:         eq0 = 0.5
+        eq = eq0 if br_player == 0 else (1.0 - eq0)
+        return eq * float(tree.term_pot[t]) - invested
 
-        else:
-            ratio       = RAISE_RATIOS.get(action, 1.0)
-            raise_extra = min(ratio * pot, stacks[active] - to_call)
-            total_add   = to_call + raise_extra
-            if total_add >= stacks[active]:
-                total_add = stacks[active]
-                action    = ALLIN
-            ns = list(stacks);  nc = list(contribs)
-            ns[active]  -= total_add
-            nc[active]  += total_add
-            new_pot      = pot + total_add
-            new_to_call  = nc[active] - nc[opponent]
-            return recurse(street_idx=street_idx, pot=new_pot, stacks=ns,
-                           contribs=nc, bet_hist=bet_hist + [action],
-                           n_raises=n_raises + 1, to_call=new_to_call,
-                           position=opponent)
 
+# ── Worker de train_parallel ─────────────────────────────────────────────────
 
+def _worker_main(conn, seed_seq, table, bucket_sims, variant=None, rank=0, workers=1):
+    """
+    Bucle de un worker: recibe (n, iteraciones previas), ejecuta n
+    iteraciones sobre su copia de las tablas, envía sus incrementos, recibe
+    (total de la reducción, t) y aplica la parte de los demás workers.
+    None = terminar.
+    """
+    s1, s2 = seed_seq.generate_state(2)
+    random.seed(int(s1))
+    np.random.seed(int(s2))
+    # Los generadores propios de los buckets y de la equity se resiembran con
+    # entropía del sistema al hacer fork: también salen de la semilla del worker
+    import montecarlo
+    import range_equity
+    from abstracciones import card_abstractor
+    for mod, ss in zip((card_abstractor, montecarlo, range_equity), seed_seq.spawn(3)):
+        mod._rng = np.random.default_rng(ss)
+    trainer = MCCFRTrainer(**(variant or {}))
+    trainer.table = table
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        n, base = msg
+        trainer._touched = ({}, {})
+        for k in range(n):
+            trainer.iterations = base + rank + k * workers     # iteración global intercalada
+            trainer._begin_iteration()
+            trainer._iteration(bucket_sims)
+        own = (_table_delta(trainer.regret_sum, trainer._touched[0]),
+               _table_delta(trainer.strategy_sum, trainer._touched[1]))
+        trainer._touched = None
+        conn.send(own)
+        total, t_block = conn.recv()
+        for table, t, o in ((trainer.regret_sum, total[0], own[0]),
+                            (trainer.strategy_sum, total[1], own[1])):
+            _apply_delta(table, t)
+            _apply_delta(table, o, sign=-1.0)
+        trainer._after_reduction(t_block)
+    conn.close()
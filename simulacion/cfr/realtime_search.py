@@ -11,6 +11,8 @@ Para cada muestra de mano del oponente:
   1. Se precomputan TODOS los buckets de ambos jugadores en todas las calles
      (preflop, flop, turn, river) — UNA sola vez, O(sims_pequeños).
   2. Dentro del árbol CFR, los InfoSet keys se generan con _fast_key → O(1).
+     El subárbol hasta el horizonte se compila una vez por estado
+     (betting_tree.subgame_tree) y el CFR recorre ids de nodo.
   → Coste total por llamada a get_action: O(opp_samples × bucket_sims)
     en lugar de O(opp_samples × iterations × nodos × bucket_sims).
 
@@ -48,12 +50,13 @@ import numpy as np
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from abstracciones.card_abstractor import (
-    preflop_bucket, postflop_bucket, POSTFLOP_BUCKETS,
+    preflop_bucket, postflop_bucket, postflop_bucket_batch, POSTFLOP_BUCKETS,
 )
 from abstracciones.infoset_encoder import (
-    FOLD, CALL, RAISE_THIRD, RAISE_HALF, RAISE_POT, RAISE_2POT, ALLIN,
-    ABSTRACT_ACTIONS, NUM_ACTIONS, ACTION_IDX, RAISE_RATIOS,
+    CALL, RAISE_THIRD, RAISE_HALF, RAISE_POT, RAISE_2POT, ALLIN,
+    ABSTRACT_ACTIONS, NUM_ACTIONS, ACTION_IDX,
 )
+from cfr.betting_tree import FOLDED, LEAF, legal_mask, subgame_tree
 
 RANKS      = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
 SUITS      = ['s', 'h', 'd', 'c']
@@ -159,16 +162,7 @@ class RealtimeSearch:
 
     @staticmethod
     def _mask(to_call, stack, n_raises, raise_max=2):
-        m = np.ones(NUM_ACTIONS, dtype=bool)
-        if to_call == 0.0:
-            m[ACTION_IDX[FOLD]] = False
-        if n_raises >= raise_max:
-            for a in [RAISE_THIRD, RAISE_HALF, RAISE_POT, RAISE_2POT]:
-                m[ACTION_IDX[a]] = False
-        if stack <= to_call:
-            for a in [RAISE_THIRD, RAISE_HALF, RAISE_POT, RAISE_2POT]:
-                m[ACTION_IDX[a]] = False
-        return m
+        return legal_mask(to_call, stack, n_raises, raise_max)
 
     # ── Evaluación de hoja (blueprint leaf) ──────────────────────────────────
 
@@ -201,97 +195,39 @@ class RealtimeSearch:
         eq  = eq0 if traverser == 0 else (1.0 - eq0)
         return eq * pot - (1.0 - eq) * pot
 
-    # ── Paso de acción ────────────────────────────────────────────────────────
-
-    def _step(self, action, traverser, bkts,
-              street_idx, pot, stacks, contribs,
-              bet_hist, n_raises, to_call, position, depth_left):
-        active   = position
-        opponent = 1 - active
-
-        if action == FOLD:
-            return float(pot) if traverser == opponent else -float(contribs[active])
-
-        elif action == CALL:
-            amount = min(to_call, stacks[active])
-            ns = list(stacks);  nc = list(contribs)
-            ns[active] -= amount
-            nc[active] += amount
-            new_pot = pot + amount
-
-            if nc[0] == nc[1] or ns[active] == 0.0:
-                # BUG-9 fix: limp de SB preflop — el BB tiene opción de check/raise.
-                # En mccfr_trainer este caso existe; sin este bloque el game tree
-                # del realtime difiere del blueprint, invalidando la estrategia
-                # aprendida para cualquier mano que empiece con limp.
-                if street_idx == 0 and active == 0 and not bet_hist:
-                    return self._search(
-                        traverser, bkts, street_idx, new_pot, ns, nc,
-                        [CALL], 0, 0.0, opponent, depth_left)
-                if street_idx < 3:
-                    next_si = street_idx + 1
-                    if depth_left <= 0:
-                        return self._leaf_value(traverser, bkts, next_si, new_pot)
-                    return self._search(
-                        traverser, bkts, next_si, new_pot, ns,
-                        [0.0, 0.0], [], 0, 0.0, 1, depth_left - 1)
-                else:
-                    return self._showdown(traverser, bkts, new_pot)
-
-            return self._search(
-                traverser, bkts, street_idx, new_pot, ns, nc,
-                bet_hist + [CALL], n_raises,
-                nc[opponent] - nc[active], opponent, depth_left)
-
-        elif action == ALLIN:
-            amount = stacks[active]
-            ns = list(stacks);  nc = list(contribs)
-            ns[active] = 0.0
-            nc[active] += amount
-            new_pot     = pot + amount
-            new_to_call = max(0.0, nc[active] - nc[opponent])
-            return self._search(
-                traverser, bkts, street_idx, new_pot, ns, nc,
-                bet_hist + [ALLIN], n_raises + 1, new_to_call, opponent, depth_left)
-
-        else:
-            ratio       = RAISE_RATIOS.get(action, 1.0)
-            raise_extra = min(ratio * pot, stacks[active] - to_call)
-            total_add   = to_call + raise_extra
-            if total_add >= stacks[active]:
-                total_add = stacks[active]; action = ALLIN
-            ns = list(stacks);  nc = list(contribs)
-            ns[active]  -= total_add
-            nc[active]  += total_add
-            new_pot      = pot + total_add
-            new_to_call  = nc[active] - nc[opponent]
-            return self._search(
-                traverser, bkts, street_idx, new_pot, ns, nc,
-                bet_hist + [action], n_raises + 1, new_to_call, opponent, depth_left)
+    # ── Hijos del árbol ───────────────────────────────────────────────────────
+
+    def _value(self, tree, traverser, bkts, child):
+        """Valor de un hijo: recursión, fold, showdown u hoja del horizonte."""
+        if child >= 0:
+            return self._search(tree, traverser, bkts, child)
+        t    = ~child
+        kind = tree.term_kind[t]
+        if kind == FOLDED:
+            folder = tree.term_player[t]
+            return float(tree.term_pot[t]) if traverser != folder else -float(tree.term_contrib[t, folder])
+        if kind == LEAF:
+            return self._leaf_value(traverser, bkts, int(tree.term_street[t]), float(tree.term_pot[t]))
+        return self._showdown(traverser, bkts, float(tree.term_pot[t]))
 
     # ── CFR local del subgame ─────────────────────────────────────────────────
 
-    def _search(self, traverser, bkts,
-                street_idx, pot, stacks, contribs,
-                bet_hist, n_raises, to_call, position, depth_left):
+    def _search(self, tree, traverser, bkts, node=0):
         """
-        External Sampling CFR sobre el subgame.
+        External Sampling CFR sobre el subgame compilado (betting_tree.subgame_tree).
         Usa bkts precomputados para InfoSet keys → O(1) por nodo.
         """
-        active = position
+        active = tree.player[node]
 
-        key      = _fast_key(active, street_idx, bkts, bet_hist)
-        mask     = self._mask(to_call, stacks[active], n_raises)
+        key      = _fast_key(active, tree.street[node], bkts, tree.hist[node])
+        mask     = tree.mask[node]
         strategy = self._strategy(key, mask)
+        child    = tree.child[node]
 
         if active == traverser:
-            valid_idxs  = np.where(mask)[0]
             action_vals = np.zeros(NUM_ACTIONS)
-            for idx in valid_idxs:
-                action_vals[idx] = self._step(
-                    ABSTRACT_ACTIONS[idx], traverser, bkts,
-                    street_idx, pot, stacks, contribs,
-                    bet_hist, n_raises, to_call, position, depth_left)
+            for idx in tree.legal[node]:
+                action_vals[idx] = self._value(tree, traverser, bkts, int(child[idx]))
 
             ev = float(np.dot(strategy, action_vals))
             self._get_regrets(key)[:] += (action_vals - ev) * mask
@@ -300,10 +236,7 @@ class RealtimeSearch:
         else:
             idx = int(np.random.choice(NUM_ACTIONS, p=strategy))
             self._get_strat_sum(key)[:] += strategy
-            return self._step(
-                ABSTRACT_ACTIONS[idx], traverser, bkts,
-                street_idx, pot, stacks, contribs,
-                bet_hist, n_raises, to_call, position, depth_left)
+            return self._value(tree, traverser, bkts, int(child[idx]))
 
     # ── API pública ───────────────────────────────────────────────────────────
 
@@ -322,8 +255,10 @@ class RealtimeSearch:
         """
         Calcula la acción abstracta recomendada para el agente.
 
-        Para cada muestra de mano del oponente:
-          1. Precomputa todos los buckets UNA vez → O(bucket_sims)
+        Los buckets de la mano propia y de todas las manos rivales muestreadas
+        se calculan de una vez por calle con postflop_bucket_batch (quedan en
+        la caché LRU). Después, para cada muestra de mano del oponente:
+          1. Lee sus buckets de la caché → O(1)
           2. Ejecuta iters_per_sample iteraciones de CFR → O(1) por nodo
 
         Parámetros
@@ -353,10 +288,19 @@ class RealtimeSearch:
         deck_rem        = [c for c in _full_deck() if c not in known]
         iters_per_sample = max(1, self.iterations // max(opp_samples, 1))
 
+        opp_hands = []
         for _ in range(opp_samples):
             random.shuffle(deck_rem)
-            opp_hand = deck_rem[:2]
+            opp_hands.append(deck_rem[:2])
+        for n in (3, 4, 5):
+            if len(board) >= n:
+                postflop_bucket_batch(board[:n], [my_hand] + opp_hands)
+
+        # Subárbol desde el estado actual hasta el horizonte (caché LRU por estado)
+        tree = subgame_tree(street_idx, pot, stacks, contribs, bet_hist,
+                            n_raises, to_call, traverser, self.depth)
 
+        for opp_hand in opp_hands:
             hand0 = my_hand  if traverser == 0 else opp_hand
             hand1 = opp_hand if traverser == 0 else my_hand
 
@@ -367,10 +311,7 @@ class RealtimeSearch:
             # CFR sobre el subgame → O(1) por nodo
             for _ in range(iters_per_sample):
                 for t in [0, 1]:
-                    self._search(
-                        t, bkts, street_idx,
-                        pot, stacks, contribs, bet_hist,
-                        n_raises, to_call, traverser, self.depth)
+                    self._search(tree, t, bkts)
 
         # Extraer estrategia promedio del InfoSet actual del agente
         # Reutilizar los bkts de la última muestra como proxy
@@ -7,6 +7,7 @@ Uso
     python cfr/train_blueprint.py                          # 50 000 iters (rápido)
     python cfr/train_blueprint.py --iters 200000           # entrenamiento medio
     python cfr/train_blueprint.py --iters 1000000          # producción
+    python cfr/train_blueprint.py --iters 1000000 --workers 16   # en paralelo
 
 El blueprint resultante se guarda en cfr/blueprint.pkl y es cargado
 automáticamente por blueprint_action_callback en montecarlo.py.
@@ -17,6 +18,28 @@ Estrategia de entrenamiento recomendada
   Ronda 2 – 200 000 iters  : blueprint útil en juego  (≈ 5-15 min en CPU)
   Ronda 3 – 1 000 000 iters: producción  (≈ 30-90 min en CPU)
 
+Con --workers N > 1 las iteraciones se reparten entre N procesos
+(MCCFRTrainer.train_parallel): cada uno muestrea con su propio flujo
+aleatorio y cada --sync-every iteraciones se suman sus incrementos de
+regret_sum / strategy_sum en la tabla maestra, que se reenvía a todos.
+Con POKER_SHARED_BUCKETS=<nombre> los workers comparten además los buckets.
+
+Con --mode vector cada iteración muestrea sólo el board y recorre el árbol
+con vectores sobre todas las manos (cfr/vector_cfr.py). Cada iteración
+cubre todos los repartos del board, así que hacen falta muchas menos:
+    python cfr/train_blueprint.py --mode vector --iters 500 --log-every 50
+
+--variant elige la regla de acumulación de regrets y estrategia media
+(MCCFRTrainer.set_variant): vanilla, cfr+ (regrets truncados a ≥ 0),
+linear (pesos ∝ t) o dcfr (descuento con --alpha / --beta / --gamma).
+--avg-delay N deja fuera de la media las N primeras iteraciones. Con
+--resume sin --variant se mantiene la variante guardada en el blueprint:
+    python cfr/train_blueprint.py --variant dcfr --iters 200000
+
+En cada línea de log se imprimen las métricas de las cachés de abstracción
+y equity (cache_metrics.cache_report): aciertos, tamaño, bytes estimados y
+latencia acumulada de los fallos, para ajustar sus maxsize.
+
 Se puede hacer fine-tuning reanudando desde un blueprint previo:
     trainer = MCCFRTrainer.load()
     trainer.train(num_iterations=200_000)
@@ -31,7 +54,8 @@ import time
 # Asegurar que simulacion/ está en el path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from cfr.mccfr_trainer import MCCFRTrainer
+from cache_metrics import cache_report
+from cfr.mccfr_trainer import TRAIN_MODES, VARIANTS, MCCFRTrainer
 
 
 def parse_args():
@@ -45,7 +69,29 @@ def parse_args():
                    help='Reanudar entrenamiento desde blueprint existente')
     p.add_argument('--output',    type=str, default=None,
                    help='Ruta de salida del blueprint (default: cfr/blueprint.pkl)')
-    return p.parse_args()
+    p.add_argument('--workers',   type=int, default=1,
+                   help='Procesos de entrenamiento (default: 1 = secuencial; 0 = todos los núcleos)')
+    p.add_argument('--sync-every', type=int, default=500,
+                   help='Iteraciones por worker entre reducciones (default: 500)')
+    p.add_argument('--seed',      type=int, default=None,
+                   help='Semilla de los workers (default: aleatoria)')
+    p.add_argument('--mode',      choices=TRAIN_MODES, default='external',
+                   help='external = External Sampling por reparto; vector = CFR '
+                        'vectorial sobre todas las manos de un board (default: external)')
+    p.add_argument('--variant',   choices=VARIANTS, default=None,
+                   help='Variante de CFR (default: la del blueprint con --resume, si no vanilla)')
+    p.add_argument('--alpha',     type=float, default=1.5,
+                   help='DCFR: exponente de los regrets positivos (default: 1.5)')
+    p.add_argument('--beta',      type=float, default=0.0,
+                   help='DCFR: exponente de los regrets negativos (default: 0)')
+    p.add_argument('--gamma',     type=float, default=2.0,
+                   help='DCFR: exponente de la estrategia media (default: 2)')
+    p.add_argument('--avg-delay', type=int, default=0,
+                   help='Iteraciones iniciales fuera de la estrategia media (default: 0)')
+    args = p.parse_args()
+    if args.mode == 'vector' and args.workers != 1:
+        p.error('--mode vector sólo admite --workers 1')
+    return args
 
 
 def main():
@@ -57,9 +103,18 @@ def main():
     else:
         print("Iniciando entrenamiento desde cero…")
         trainer = MCCFRTrainer()
+    if args.variant is not None:
+        trainer.set_variant(args.variant, args.alpha, args.beta, args.gamma, args.avg_delay)
+    print(f"Variante de CFR: {trainer.variant}")
 
     t0 = time.time()
-    trainer.train(num_iterations=args.iters, log_every=args.log_every)
+    if args.workers == 1:
+        trainer.train(num_iterations=args.iters, log_every=args.log_every,
+                      on_log=lambda i: print(cache_report()), mode=args.mode)
+    else:
+        trainer.train_parallel(num_iterations=args.iters, workers=args.workers or None,
+                               sync_every=args.sync_every, log_every=args.log_every,
+                               on_log=lambda i: print(cache_report()), seed=args.seed)
     elapsed = time.time() - t0
 
     trainer.save(args.output)
@@ -0,0 +1,214 @@
+"""
+CFR vectorial sobre el árbol público (muestreo de chance sólo en el board).
+
+External Sampling resuelve un reparto concreto por traversal: la recursión
+de Python se paga por cada par de manos. Aquí, en cada iteración se muestrea
+sólo el board y el árbol compilado (betting_tree) se recorre una vez por
+jugador llevando vectores sobre TODAS las manos compatibles con el board
+(1.081 con 5 cartas) para los dos jugadores:
+
+    reach_i (H,)  – alcance propio del traverser (pondera la estrategia media)
+    reach_o (H,)  – alcance del rival, con la probabilidad de chance incluida
+    valor   (H,)  – valor contrafactual de cada mano del traverser
+
+En cada nodo la estrategia de cada mano es la de su bucket (la clave del
+InfoSet es la misma que en External Sampling: (player, street, bucket,
+bet_hist)), y las actualizaciones de regret y estrategia media se suman por
+bucket con np.bincount: una operación de arrays por acción y nodo en lugar
+de una recursión por reparto.
+
+Terminales con eliminación de cartas (mano del rival disjunta de la propia):
+    Σ_{h' ∩ h = ∅} x(h') = Σ x − X[c1] − X[c2] + x(h)     X[c] = Σ_{h' ∋ c} x(h')
+- fold    : pago fijo × alcance compatible del rival
+- showdown: la equity de buckets de MCCFRTrainer._showdown es lineal en
+            b_propio − b_rival, así que basta con Σ x y Σ x·b_rival.
+
+Escala: reach_o empieza en 1 / (H × H_rival) y reach_i en 1 / H, de modo que
+cada actualización es la esperanza de la de External Sampling sobre las
+manos del board y las dos formas de entrenar comparten tabla.
+
+Poda: un subárbol en el que el rival no llega con ninguna mano no cambia
+regrets y se salta (tampoco acumula estrategia media).
+
+Las actualizaciones usan los pesos de la variante de CFR del trainer
+(_w_regret, _w_strategy y el suelo de cfr+; ver MCCFRTrainer.set_variant).
+
+    trainer.train(num_iterations=200, mode='vector')
+"""
+
+import os
+import random
+import sys
+from itertools import combinations
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from abstracciones.card_abstractor import (
+    preflop_bucket, postflop_bucket_batch, PREFLOP_BUCKETS, POSTFLOP_BUCKETS,
+)
+from abstracciones.infoset_encoder import NUM_ACTIONS
+from cfr.betting_tree import FOLDED, blueprint_tree
+
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
+SUITS = ['s', 'h', 'd', 'c']
+_DECK = [r + s for r in RANKS for s in SUITS]
+
+_SD_DENOM = max(1, POSTFLOP_BUCKETS - 1)          # igual que MCCFRTrainer._showdown
+
+
+def _deal_board():
+    """Board completo (5 cartas) aleatorio, con el mismo generador que _deal."""
+    deck = list(_DECK)
+    random.shuffle(deck)
+    return deck[:5]
+
+
+def hand_range(board):
+    """
+    Manos compatibles con el board.
+
+    Retorna
+    -------
+    (hands, cards) – lista de [c1, c2] y array int (H, 2) de índices de carta
+    """
+    rest  = [i for i, c in enumerate(_DECK) if c not in board]
+    pairs = np.array(list(combinations(rest, 2)), dtype=np.int64)
+    return [[_DECK[a], _DECK[b]] for a, b in pairs], pairs
+
+
+def hand_buckets(board, hands, sims=50):
+    """Array int (4, H): bucket de cada mano en preflop, flop, turn y river."""
+    bkts    = np.empty((4, len(hands)), dtype=np.int64)
+    bkts[0] = [preflop_bucket(h, num_sims=sims) for h in hands]
+    for s, n in enumerate((3, 4, 5), start=1):
+        bkts[s] = postflop_bucket_batch(board[:n], hands)
+    return bkts
+
+
+class VectorCFR:
+    """
+    CFR vectorial sobre las tablas de un MCCFRTrainer.
+
+    Parámetros
+    ----------
+    trainer : MCCFRTrainer  – dueño de la InfosetTable que se actualiza
+    tree    : BettingTree | None – árbol a recorrer (None = blueprint_tree())
+    """
+
+    def __init__(self, trainer, tree=None):
+        self.trainer = trainer
+        self.tree    = tree if tree is not None else blueprint_tree()
+        # Filas de la tabla por (nodo, bucket); -1 = aún no creadas
+        self._rows   = np.full((self.tree.n_nodes, max(PREFLOP_BUCKETS, POSTFLOP_BUCKETS)),
+                               -1, dtype=np.int64)
+        self._table  = None
+
+    # ── Iteración ─────────────────────────────────────────────────────────────
+
+    def iteration(self, bucket_sims=50, board=None, bkts=None):
+        """
+        Una iteración: board muestreado (o dado), buckets de todas las manos
+        y un recorrido vectorial del árbol por jugador.
+
+        Retorna
+        -------
+        np.ndarray (2,) – valor medio de la raíz para cada traverser
+        """
+        if self._table is not self.trainer.table:         # tabla nueva (load, etc.)
+            self._table = self.trainer.table
+            self._rows[:] = -1
+        board = board if board is not None else _deal_board()
+        hands, cards = hand_range(board)
+        self._c1, self._c2 = cards[:, 0], cards[:, 1]
+        self._bkts = bkts if bkts is not None else hand_buckets(board, hands, bucket_sims)
+
+        n      = len(hands)
+        n_opp  = (52 - len(board) - 2) * (52 - len(board) - 3) // 2   # manos rivales por mano
+        values = np.zeros(2)
+        for traverser in (0, 1):
+            v = self._walk(traverser, 0, np.full(n, 1.0 / n), np.full(n, 1.0 / (n * n_opp)))
+            values[traverser] = v.sum()
+        return values
+
+    # ── Recorrido ─────────────────────────────────────────────────────────────
+
+    def _node_rows(self, node):
+        """Filas de la tabla de los buckets del nodo (las crea la primera vez)."""
+        tree   = self.tree
+        street = tree.street[node]
+        n_b    = PREFLOP_BUCKETS if street == 0 else POSTFLOP_BUCKETS
+        rows   = self._rows[node, :n_b]
+        if rows[0] < 0:
+            p, hist = tree.player[node], tree.hist[node]
+            rows[:] = [self._table.row((p, street, b, hist)) for b in range(n_b)]
+        return rows
+
+    def _strategy(self, rows, mask):
+        """Regret matching por bucket: (B, NUM_ACTIONS)."""
+        pos   = np.maximum(0.0, self._table._R[rows], dtype=np.float64) * mask
+        total = pos.sum(axis=1, keepdims=True)
+        unif  = mask / mask.sum()
+        return np.where(total > 0.0, pos / np.where(total > 0.0, total, 1.0), unif)
+
+    def _walk(self, traverser, node, reach_i, reach_o):
+        tree   = self.tree
+        active = tree.player[node]
+        street = tree.street[node]
+        mask   = tree.mask[node]
+        child  = tree.child[node]
+        rows   = self._node_rows(node)
+        bkt    = self._bkts[street]
+        sigma  = self._strategy(rows, mask)
+        s_hand = sigma[bkt]                                # (H, A)
+
+        if active == traverser:
+            n_b    = len(rows)
+            vals   = np.zeros((NUM_ACTIONS, len(bkt)))
+            for a in tree.legal[node]:
+                vals[a] = self._value(traverser, int(child[a]), reach_i * s_hand[:, a], reach_o)
+            ev     = np.einsum('ha,ah->h', s_hand, vals)
+            regret = np.zeros((n_b, NUM_ACTIONS))
+            for a in tree.legal[node]:
+                regret[:, a] = np.bincount(bkt, weights=vals[a] - ev, minlength=n_b)
+            tr = self.trainer                              # pesos de la variante de CFR
+            R  = self._table._R
+            R[rows] += tr._w_regret * regret
+            if tr.variant == 'cfr+':
+                R[rows] = np.maximum(R[rows], 0.0)
+            if tr._w_strategy:
+                self._table._S[rows] += (tr._w_strategy
+                                         * np.bincount(bkt, weights=reach_i, minlength=n_b)[:, None]
+                                         * sigma)
+            return ev
+
+        ev = np.zeros(len(bkt))
+        for a in tree.legal[node]:
+            r = reach_o * s_hand[:, a]
+            if r.any():
+                ev += self._value(traverser, int(child[a]), reach_i, r)
+        return ev
+
+    def _value(self, traverser, child, reach_i, reach_o):
+        """Valor contrafactual (H,) de un hijo: recursión o pago terminal."""
+        if child >= 0:
+            return self._walk(traverser, child, reach_i, reach_o)
+        tree = self.tree
+        t    = ~child
+        pot  = float(tree.term_pot[t])
+        if tree.term_kind[t] == FOLDED:
+            folder = tree.term_player[t]
+            payoff = pot if traverser != folder else -float(tree.term_contrib[t, folder])
+            return payoff * self._opp_sum(reach_o)
+        # Showdown: eq = 0.5 + 0.5 (b_propio − b_rival) / D  (lineal en los buckets)
+        b       = self._bkts[3]
+        contrib = float(tree.term_contrib[t, traverser])
+        half    = 0.5 * pot / _SD_DENOM
+        return (0.5 * pot - contrib + half * b) * self._opp_sum(reach_o) - half * self._opp_sum(reach_o * b)
+
+    def _opp_sum(self, x):
+        """Σ de x sobre las manos rivales disjuntas de cada mano (eliminación de cartas)."""
+        per_card = (np.bincount(self._c1, weights=x, minlength=52)
+                    + np.bincount(self._c2, weights=x, minlength=52))
+        return x.sum() - per_card[self._c1] - per_card[self._c2] + x
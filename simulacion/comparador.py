@@ -13,6 +13,7 @@ Uso
     python comparador.py --manos 200
     python comparador.py --manos 500 --fichas 200 --quiet
     python comparador.py --solo-equity --manos 100   # sin blueprint (fallback)
+    python comparador.py --manos 500 --equity-store  # reutiliza equity entre ejecuciones
 """
 
 import os
@@ -111,7 +112,11 @@ def run_benchmark(num_manos: int = 100,
       winrate_bb100: float       – BBs ganados cada 100 manos
       ci_lo, ci_hi : float       – IC 95% del winrate
       std          : float       – desviación estándar por mano
+      equity_cache : dict        – métricas de la caché de equity durante el benchmark
     """
+    from montecarlo import equity_cache_stats, reset_equity_cache_stats
+    reset_equity_cache_stats()
+
     engine = PokerCoreEngine(
         nombres_jugadores=[gto_nombre, rival_nombre],
         action_callback=None,
@@ -164,7 +169,8 @@ def run_benchmark(num_manos: int = 100,
 
     if not resultados:
         return {'resultados': [], 'winrate_bb100': 0.0,
-                'ci_lo': 0.0, 'ci_hi': 0.0, 'std': 0.0}
+                'ci_lo': 0.0, 'ci_hi': 0.0, 'std': 0.0,
+                'equity_cache': equity_cache_stats()}
 
     wr     = _mean(resultados) * 100.0   # BB/100
     ci_lo, ci_hi = _bootstrap_ci(resultados)
@@ -177,6 +183,7 @@ def run_benchmark(num_manos: int = 100,
         'ci_hi':         ci_hi,
         'std':           _std(resultados),
         'n_manos':       len(resultados),
+        'equity_cache':  equity_cache_stats(),
     }
 
 
@@ -196,8 +203,16 @@ def main():
                         help='Usar equity puro en lugar del blueprint GTO')
     parser.add_argument('--opp-samples', type=int, default=5,
                         help='Manos del oponente a muestrear en subgame search (default: 5)')
+    parser.add_argument('--equity-store', nargs='?', const='', default=None, metavar='PATH',
+                        help='Almacén persistente de equity (SQLite) compartido entre '
+                             'ejecuciones; sin PATH usa equity_store.sqlite')
     args = parser.parse_args()
 
+    if args.equity_store is not None:
+        from montecarlo import enable_equity_store
+        store = enable_equity_store(args.equity_store or None)
+        print(f"  Equity store: {store.path} ({len(store)} spots)")
+
     print(f"\n{'='*60}")
     print(f"  Benchmark HUNL: {args.manos} manos")
     print(f"  Fichas iniciales: {args.fichas} BBs")
@@ -244,6 +259,10 @@ def main():
     print(f"  Std/mano : {std:.3f} BBs")
     ganador = gto_nombre if wr > 0 else rival_nombre
     print(f"  Resultado: {'WIN' if wr > 0 else 'LOSS'} para {gto_nombre}")
+    ec = res['equity_cache']
+    print(f"  Caché eq.: {ec['hit_rate']:.1%} aciertos ({ec['hits']}/{ec['hits'] + ec['misses']}), "
+          f"{ec['evictions']} expulsiones, {ec['time_saved_s']:.1f}s ahorrados "
+          f"[{ec['size']}/{ec['maxsize']}]")
     print(f"\n{opp_model.summary()}")
     print(f"{'='*60}\n")
 
@@ -0,0 +1,187 @@
+"""
+Almacén persistente de equity compartido entre procesos (SQLite en modo WAL).
+
+La caché en memoria de montecarlo.get_equity_cached empieza vacía en cada
+proceso. EquityStore guarda en disco las mismas entradas — clave canónica
+(hole, board, num_players) → (equity, simulaciones) — para que comparador.py,
+generar_dataset.py y cualquier otro proceso reutilicen los spots ya calculados.
+
+- WAL: muchos lectores concurrentes y un escritor sin bloquearse entre sí.
+- Escrituras en lote: put() acumula en memoria y vuelca cada flush_every
+  entradas o cada flush_interval segundos, en una sola transacción, y al
+  salir del proceso (atexit y, en los hijos de multiprocessing, que no
+  ejecutan atexit, multiprocessing.util.Finalize).
+- Un valor sólo se sobrescribe si trae más simulaciones (o es exacto).
+- fork: SQLite no permite usar en el hijo una conexión abierta en el padre.
+  Tras un fork el hijo descarta la conexión y las entradas pendientes
+  heredadas (son del padre) y abre la suya al primer acceso. Un worker que
+  muere sin salir limpiamente (Pool.terminate) pierde lo que no haya volcado.
+
+Uso
+---
+    from montecarlo import enable_equity_store
+    enable_equity_store()                    # ruta por defecto
+    enable_equity_store('/tmp/eq.sqlite')    # ruta explícita
+
+    # o para cualquier proceso que importe montecarlo:
+    POKER_EQUITY_STORE=/tmp/eq.sqlite python comparador.py
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from multiprocessing import util
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'equity_store.sqlite')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS equity (
+    hole    TEXT    NOT NULL,
+    board   TEXT    NOT NULL,
+    players INTEGER NOT NULL,
+    equity  REAL    NOT NULL,
+    sims    REAL    NOT NULL,
+    PRIMARY KEY (hole, board, players)
+) WITHOUT ROWID
+"""
+
+_UPSERT = """
+INSERT INTO equity (hole, board, players, equity, sims) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (hole, board, players) DO UPDATE
+SET equity = excluded.equity, sims = excluded.sims
+WHERE excluded.sims > equity.sims
+"""
+
+
+# Almacenes abiertos en este proceso (para reiniciarlos en el hijo de un fork)
+# y conexiones heredadas: no se usan ni se cierran en el hijo (cerrarlas podría
+# hacer un checkpoint del WAL que sigue usando el padre)
+_STORES    = weakref.WeakSet()
+_INHERITED = []
+
+
+def _reset_after_fork():
+    for store in list(_STORES):
+        store._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _row_key(key):
+    hole, board, players = key
+    return ''.join(hole), ''.join(board), players
+
+
+class EquityStore:
+    """
+    Tabla SQLite (hole, board, players) → (equity, sims).
+
+    Parámetros
+    ----------
+    path           : str   – fichero SQLite (se crea si no existe)
+    flush_every    : int   – entradas pendientes que disparan una escritura en lote
+    flush_interval : float – segundos desde la última escritura que también la disparan
+    """
+
+    def __init__(self, path=DEFAULT_PATH, flush_every=256, flush_interval=5.0):
+        self.path           = path
+        self.flush_every    = flush_every
+        self.flush_interval = flush_interval
+        self._pending       = {}
+        self._lock          = threading.Lock()
+        self._conn          = None
+        self._closed        = False
+        self._last_flush    = time.monotonic()
+        self._connect()                    # crea fichero y esquema ya en este proceso
+        atexit.register(self.close)
+        _STORES.add(self)
+
+    def _connect(self):
+        """Conexión de este proceso; la abre la primera vez (también tras un fork)."""
+        if self._conn is None and not self._closed:
+            conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+            # Los hijos de multiprocessing salen con os._exit (sin atexit)
+            util.Finalize(self, self.close, exitpriority=10)
+        return self._conn
+
+    def _after_fork(self):
+        """Hijo de un fork: nada de lo heredado se usa (ver docstring del módulo)."""
+        self._lock = threading.Lock()
+        if self._conn is not None:
+            _INHERITED.append(self._conn)
+        self._conn       = None
+        self._pending    = {}
+        self._last_flush = time.monotonic()
+
+    def get(self, key):
+        """(equity, sims) para la clave canónica, o None si no está."""
+        row_key = _row_key(key)
+        with self._lock:
+            if row_key in self._pending:
+                return self._pending[row_key]
+            conn = self._connect()
+            if conn is None:
+                return None
+            row = conn.execute(
+                'SELECT equity, sims FROM equity WHERE hole=? AND board=? AND players=?',
+                row_key).fetchone()
+        return row
+
+    def put(self, key, equity, sims):
+        """Encola (equity, sims); vuelca a disco cada flush_every entradas o
+        flush_interval segundos."""
+        row_key = _row_key(key)
+        with self._lock:
+            prev = self._pending.get(row_key)
+            if prev is None or sims > prev[1]:
+                self._pending[row_key] = (float(equity), float(sims))
+            if (len(self._pending) >= self.flush_every
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def flush(self):
+        """Escribe las entradas pendientes en una sola transacción."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        conn = self._connect()
+        if conn is None:
+            return
+        rows = [k + v for k, v in self._pending.items()]
+        with conn:
+            conn.executemany(_UPSERT, rows)
+        self._pending.clear()
+
+    def close(self):
+        """Vuelca lo pendiente y cierra la conexión (idempotente)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            if self._conn is not None:
+                self._conn.close()
+            self._conn   = None
+            self._closed = True
+
+    def __len__(self):
+        with self._lock:
+            self._flush_locked()
+            conn = self._connect()
+            if conn is None:
+                return 0
+            return conn.execute('SELECT COUNT(*) FROM equity').fetchone()[0]
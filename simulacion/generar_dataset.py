@@ -2,6 +2,9 @@
 """
 Script que simula múltiples partidas completas de póker usando advanced_ia_action_callback en todas las fases.
 Imprime todo por pantalla y guarda la salida como string y estructura en dataset_mcts/dataset_advanced_full.jsonl.
+
+Con POKER_EQUITY_STORE=<fichero.sqlite> la equity calculada se comparte en disco
+con otras ejecuciones (ver equity_store.py).
 """
 
 import time
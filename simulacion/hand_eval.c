@@ -1,5 +1,4 @@
-
-
+#include <stdint.h>
 #include <poker_defs.h>
 #include <inlines/eval.h>
 
@@ -23,3 +22,17 @@ int eval_hand(int rank1, int suit1, int rank2, int suit2,
     return Hand_EVAL_N(hand, 7);
 }
 
+// Evalúa n manos de ncards cartas (5..7) en una sola llamada.
+// cards: buffer contiguo int8[n, ncards] con la codificación rank * 4 + suit (0..51)
+// out  : buffer int32[n] donde se escribe el HandVal de cada mano
+void eval_hands_batch(const int8_t *cards, int n, int ncards, int32_t *out) {
+    for (int i = 0; i < n; i++) {
+        const int8_t *row = cards + (long)i * ncards;
+        StdDeck_CardMask hand;
+        StdDeck_CardMask_RESET(hand);
+        for (int k = 0; k < ncards; k++)
+            StdDeck_CardMask_OR(hand, hand,
+                                StdDeck_MASK(StdDeck_MAKE_CARD(row[k] >> 2, row[k] & 3)));
+        out[i] = (int32_t) Hand_EVAL_N(hand, ncards);
+    }
+}
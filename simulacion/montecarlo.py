@@ -4,21 +4,64 @@ Módulo de cálculo de equity y callbacks de decisión para el agente de póker.
 
 Provee:
 - montecarlo_equity          : simulación Monte Carlo para estimar probabilidad de ganar.
-- get_equity_cached          : versión cacheada con límite de tamaño (LRU aproximado).
+- exact_equity               : equity exacta heads-up por enumeración (flop, turn, river).
+- get_equity_cached          : versión cacheada (LRU con métricas) por clave canónica de
+                               palos; elige enumeración exacta cuando es más barata.
+- equity_cache_stats         : aciertos, fallos, expulsiones y tiempo ahorrado de la caché.
+- enable_equity_store        : activa el almacén persistente en disco (equity_store.py),
+                               también con la variable de entorno POKER_EQUITY_STORE.
 - advanced_ia_action_callback: IA basada en equity + pot odds por fase.
 - human_bot_action_callback  : bot rival que simula un jugador mediocre.
 - blueprint_action_callback  : IA GTO híbrida:  blueprint MCCFR + subgame search
                                en tiempo real + ajuste por modelo del oponente.
 """
 
+import os
 import random
+import time
 from itertools import combinations
-from template import eval_hand_from_strings
+from math import comb
+
+import numpy as np
+
+from template import cards_to_ints, eval_hands_batch
+from abstracciones.suit_isomorphism import canonical_hand_board
+from cache_metrics import LRUCache, register
+import preflop_equity
 from poker_engine import compact_card
 
 # === CACHE GLOBAL DE EQUITY ===
-_equity_cache: dict = {}
-_EQUITY_CACHE_MAX_SIZE = 4096  # evita crecimiento ilimitado en partidas largas
+_EQUITY_CACHE_MAX_SIZE = 4096  # entradas por defecto (ver configure_equity_cache)
+_equity_cache = register(LRUCache(maxsize=_EQUITY_CACHE_MAX_SIZE, name='equity'))
+_EXACT = float('inf')           # nº de simulaciones de una entrada exacta
+
+# Almacén persistente opcional compartido entre procesos (ver enable_equity_store)
+_equity_store = None
+
+# Coste de muestrear una simulación (fila de claves aleatorias + argsort) medido
+# en filas de eval_hands_batch: decide cuándo la enumeración exacta sale más barata.
+_SAMPLE_COST_ROWS = 2
+
+# Simulaciones por bloque vectorizado (acota memoria con muchos rivales)
+_MC_CHUNK = 20000
+
+# Precisión adaptativa: bloque entre comprobaciones y z del intervalo de decisión
+_ADAPTIVE_CHUNK = 200
+_DECISION_Z     = 2.58      # 99 %
+
+# Generador de la simulación Monte Carlo. Como en card_abstractor, se vuelve a
+# sembrar en cada hijo de un fork (pool de multiprocessing, workers web): si no,
+# todos repetirían las mismas muestras y sus estimaciones estarían correladas.
+_rng = np.random.default_rng()
+
+
+def _reseed_after_fork():
+    global _rng
+    _rng = np.random.default_rng()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reseed_after_fork)
 
 # Funciones de equity Montecarlo
 
@@ -28,57 +71,261 @@ def generar_baraja_compacta():
     return [v + p for v in valores for p in palos]
 
 
-def montecarlo_equity(hole_cards, community_cards, num_players=2, num_simulations=500):
-    wins = ties = losses = 0
-    deck_base = generar_baraja_compacta()
-    # eliminar cartas visibles
-    for card in hole_cards + community_cards:
-        if card in deck_base:
-            deck_base.remove(card)
-    for _ in range(num_simulations):
-        deck = deck_base.copy()
-        # repartir a oponentes
-        opponents = []
-        for _ in range(num_players - 1):
-            opp = random.sample(deck, 2)
-            for c in opp:
-                deck.remove(c)
-            opponents.append(opp)
-        # completar board
-        board = community_cards.copy()
-        board += random.sample(deck, 5 - len(board))
-        # evaluar
-        my_score = eval_hand_from_strings(hole_cards, board)
-        best = my_score
-        tie = False
-        for opp in opponents:
-            score = eval_hand_from_strings(opp, board)
-            if score > best:
-                best = score; tie = False
-            elif score == best:
-                tie = True
-        if my_score == best and not tie:
-            wins += 1
-        elif tie:
-            ties += 1
-        else:
-            losses += 1
-    total = wins + ties + losses
-    return (wins + 0.5 * ties) / total if total else 0
-
-
-def get_equity_cached(hole_cards, community_cards, num_players=2, num_simulations=500):
-    key = (tuple(sorted(hole_cards)), tuple(sorted(community_cards)), num_players, num_simulations)
-    if key in _equity_cache:
-        return _equity_cache[key]
-    eq = montecarlo_equity(hole_cards, community_cards, num_players, num_simulations)
-    if len(_equity_cache) >= _EQUITY_CACHE_MAX_SIZE:
-        # Elimina la mitad de entradas más antiguas (FIFO aproximado)
-        for old_key in list(_equity_cache.keys())[:_EQUITY_CACHE_MAX_SIZE // 2]:
-            del _equity_cache[old_key]
-    _equity_cache[key] = eq
+def montecarlo_equity(hole_cards, community_cards, num_players=2, num_simulations=500,
+                      target_se=None, thresholds=None):
+    """
+    Equity Monte Carlo de hole_cards contra num_players-1 rivales aleatorios.
+
+    Todas las simulaciones se reparten de una vez: cada fila ordena el mazo
+    restante por claves aleatorias (argsort) y toma las primeras cartas para
+    los rivales y para completar el board. Héroe y rivales (cualquier número)
+    se evalúan con dos llamadas a eval_hands_batch por bloque de _MC_CHUNK
+    simulaciones. Empate con el mejor rival = 0.5.
+
+    Precisión adaptativa: con target_se y/o thresholds se simula en bloques de
+    _ADAPTIVE_CHUNK y se para en cuanto el error estándar baja de target_se o
+    el intervalo ±_DECISION_Z·SE no contiene ningún umbral de decisión (p.ej.
+    las pot odds). num_simulations pasa a ser el máximo: los spots marginales
+    lo agotan y los claros terminan mucho antes.
+
+    Parámetros
+    ----------
+    target_se  : float | None           – error estándar objetivo
+    thresholds : float | iterable | None – fronteras de decisión sobre la equity
+    """
+    if num_simulations <= 0:
+        return 0
+    eq, _ = _sample_equity(hole_cards, community_cards, num_players, num_simulations,
+                           target_se, thresholds)
+    return eq
+
+
+def _settled(mean, var, n, target_se, thresholds):
+    """True si la estimación (mean, var, n) ya cumple el criterio de parada."""
+    se = (max(var, 0.0) / n) ** 0.5
+    if target_se is not None and se <= target_se:
+        return True
+    if thresholds:
+        return all(abs(mean - t) > _DECISION_Z * se for t in thresholds)
+    return False
+
+
+def _sample_equity(hole_cards, community_cards, num_players, max_sims,
+                   target_se=None, thresholds=None, prior=(0.0, 0)):
+    """
+    Núcleo del Monte Carlo. prior = (equity, simulaciones) previas que se
+    continúan (su varianza se acota por eq·(1-eq), que es conservadora).
+
+    Retorna
+    -------
+    (equity, simulaciones totales)
+    """
+    if thresholds is not None and not hasattr(thresholds, '__iter__'):
+        thresholds = (thresholds,)
+    thresholds = tuple(thresholds or ())
+    adaptive   = target_se is not None or bool(thresholds)
+    step       = _ADAPTIVE_CHUNK if adaptive else _MC_CHUNK
+
+    known  = set(hole_cards + community_cards)
+    deck   = cards_to_ints([c for c in generar_baraja_compacta() if c not in known])
+    hole   = cards_to_ints(hole_cards)
+    comm   = cards_to_ints(community_cards)
+    n_opp  = num_players - 1
+    n_fill = 5 - len(community_cards)
+    n_draw = 2 * n_opp + n_fill
+
+    n  = prior[1]
+    s1 = prior[0] * n     # Σ x
+    s2 = s1               # Σ x²  (x ∈ {0, ½, 1} → x² ≤ x)
+    while n < max_sims:
+        if adaptive and n and _settled(s1 / n, s2 / n - (s1 / n) ** 2, n,
+                                       target_se, thresholds):
+            break
+        S = min(step, max_sims - n)
+        # permutación aleatoria por fila del mazo restante → primeras n_draw cartas
+        order = np.argsort(_rng.random((S, len(deck))), axis=1)[:, :n_draw]
+        draws = deck[order]
+        opps   = draws[:, :2 * n_opp].reshape(S * n_opp, 2)
+        boards = np.concatenate([np.broadcast_to(comm, (S, len(comm))),
+                                 draws[:, 2 * n_opp:]], axis=1)
+
+        my_score  = eval_hands_batch(np.broadcast_to(hole, (S, 2)), boards)
+        opp_score = eval_hands_batch(opps, np.repeat(boards, n_opp, axis=0)).reshape(S, n_opp)
+        best = opp_score.max(axis=1)
+        x    = (my_score > best) + 0.5 * (my_score == best)
+        s1  += float(x.sum())
+        s2  += float((x * x).sum())
+        n   += S
+    return (s1 / n if n else 0.0), n
+
+
+def _exact_rows(n_board):
+    """Filas que evalúa exact_equity heads-up con n_board cartas comunitarias."""
+    rest   = 50 - n_board
+    n_fill = 5 - n_board
+    return comb(rest, n_fill) * (comb(rest - n_fill, 2) + 1)
+
+
+def exact_equity(hole_cards, community_cards):
+    """
+    Equity heads-up exacta: enumera todos los runouts y todas las manos rivales.
+
+    River: 990 manos rivales; turn: 46 rivers × 990 manos. Todas las filas se
+    evalúan en una sola llamada a eval_hands_batch. Cada runout tiene el mismo
+    número de manos rivales, así que la equity es la media simple. Empate = 0.5.
+
+    Parámetros
+    ----------
+    hole_cards      : list[str] – 2 cartas del héroe
+    community_cards : list[str] – 3 a 5 cartas comunitarias
+
+    Retorna
+    -------
+    float – equity en [0, 1] (sin varianza)
+    """
+    n_fill = 5 - len(community_cards)
+    if not 0 <= n_fill <= 2:
+        raise ValueError(f"exact_equity requiere 3-5 cartas comunitarias, "
+                         f"recibió {len(community_cards)}")
+    known = set(hole_cards + community_cards)
+    deck  = cards_to_ints([c for c in generar_baraja_compacta() if c not in known])
+    m     = len(deck)
+
+    K, M    = comb(m, n_fill), comb(m, 2)
+    runouts = np.array(list(combinations(range(m), n_fill)), dtype=np.int64).reshape(K, n_fill)
+    pairs   = np.array(list(combinations(range(m), 2)), dtype=np.int64)
+
+    # (runout, mano rival) válidos: sin cartas compartidas
+    r_idx = np.repeat(np.arange(K), M)
+    p_idx = np.tile(np.arange(M), K)
+    if n_fill:
+        clash = (runouts[r_idx, :, None] == pairs[p_idx, None, :]).any(axis=(1, 2))
+        r_idx, p_idx = r_idx[~clash], p_idx[~clash]
+
+    boards = np.concatenate([
+        np.tile(cards_to_ints(community_cards), (K, 1)),
+        deck[runouts],
+    ], axis=1)
+    my_score  = eval_hands_batch(np.tile(cards_to_ints(hole_cards), (K, 1)), boards)
+    opp_score = eval_hands_batch(deck[pairs[p_idx]], boards[r_idx])
+    mine  = my_score[r_idx]
+    wins  = int((mine > opp_score).sum())
+    ties  = int((mine == opp_score).sum())
+    return (wins + 0.5 * ties) / len(opp_score)
+
+
+def _prefer_exact(n_board, num_players, num_simulations):
+    """True si enumerar exactamente cuesta menos que num_simulations muestras."""
+    if num_players != 2 or not 3 <= n_board <= 5:
+        return False
+    sampled = num_simulations * (num_players + _SAMPLE_COST_ROWS)
+    return _exact_rows(n_board) <= sampled
+
+
+def get_equity_cached(hole_cards, community_cards, num_players=2, num_simulations=500,
+                      target_se=None, thresholds=None):
+    """
+    Equity con caché keyed por la forma canónica de (hole, board) bajo
+    permutación de palos: AhKh en 2c7d9s y AsKs en 2h7c9d comparten entrada.
+
+    Cada entrada guarda (equity, simulaciones). Una petición con más
+    simulaciones que las guardadas sólo simula la diferencia y la combina con
+    la estimación previa (mejora in situ); una con menos reutiliza la entrada.
+    Con target_se / thresholds (ver montecarlo_equity) también sirve una
+    entrada que ya cumple el criterio de parada, y la mejora continúa desde ella.
+    Cuando exact_equity es más barata que el Monte Carlo pedido (river
+    siempre; turn con presupuestos altos) se guarda el valor exacto, que sirve
+    para cualquier presupuesto. Preflop heads-up se lee de la matriz exacta de
+    preflop_equity si está construida.
+
+    Con el almacén persistente activo (enable_equity_store) los fallos de la
+    caché en memoria se consultan primero en disco y lo calculado se escribe.
+    """
+    if thresholds is not None and not hasattr(thresholds, '__iter__'):
+        thresholds = (thresholds,)
+
+    def enough(e):
+        eq, n = e
+        if n >= num_simulations:
+            return True
+        return (target_se is not None or bool(thresholds)) and n > 0 and \
+            _settled(eq, eq * (1.0 - eq), n, target_se, thresholds)
+
+    hole_c, board_c = canonical_hand_board(hole_cards, community_cards)
+    key = (hole_c, board_c, num_players)
+    hit = _equity_cache.get(key, valid=enough)
+    if hit is not None:
+        return hit[0]
+    entry = _equity_cache.peek(key)
+    if _equity_store is not None:
+        stored = _equity_store.get(key)
+        if stored is not None and (entry is None or stored[1] > entry[1]):
+            entry = tuple(stored)
+            _equity_cache.put(key, entry)
+            if enough(entry):
+                return entry[0]
+    t0 = time.perf_counter()
+    if not community_cards and num_players == 2 and preflop_equity.available():
+        eq, n = preflop_equity.equity_vs_random(hole_cards), _EXACT
+    elif _prefer_exact(len(community_cards), num_players, num_simulations):
+        eq, n = exact_equity(list(hole_c), list(board_c)), _EXACT
+    elif num_simulations <= 0:
+        return 0
+    else:
+        eq, n = _sample_equity(list(hole_c), list(board_c), num_players, num_simulations,
+                               target_se, thresholds, prior=entry or (0.0, 0))
+    _equity_cache.put(key, (eq, n), cost=time.perf_counter() - t0)
+    if _equity_store is not None:
+        _equity_store.put(key, eq, n)
     return eq
 
+
+def configure_equity_cache(maxsize):
+    """Cambia el número máximo de entradas de la caché de equity en memoria."""
+    _equity_cache.resize(maxsize)
+
+
+def equity_cache_stats():
+    """Métricas de la caché de equity (aciertos, fallos, expulsiones, tiempo ahorrado)."""
+    return _equity_cache.stats()
+
+
+def reset_equity_cache_stats():
+    """Pone a cero las métricas de la caché de equity (conserva las entradas)."""
+    _equity_cache.reset_stats()
+
+
+def enable_equity_store(path=None):
+    """
+    Activa el almacén persistente de equity (SQLite compartido entre procesos).
+
+    Parámetros
+    ----------
+    path : str | None – fichero SQLite; None = equity_store.DEFAULT_PATH
+
+    Retorna
+    -------
+    EquityStore – el almacén activo
+    """
+    global _equity_store
+    from equity_store import EquityStore, DEFAULT_PATH
+    if _equity_store is not None:
+        _equity_store.close()
+    _equity_store = EquityStore(path or DEFAULT_PATH)
+    return _equity_store
+
+
+def disable_equity_store():
+    """Vuelca y cierra el almacén persistente; la caché en memoria sigue activa."""
+    global _equity_store
+    if _equity_store is not None:
+        _equity_store.close()
+        _equity_store = None
+
+
+if os.environ.get('POKER_EQUITY_STORE'):
+    enable_equity_store(os.environ['POKER_EQUITY_STORE'])
+
 # === IA avanzada ===
 
 def advanced_ia_action_callback(jugador, state, valid_actions):
@@ -102,14 +349,27 @@ def advanced_ia_action_callback(jugador, state, valid_actions):
         'river': 5000
     }
     num_sims = sims_map.get(fase, 500)
+    pot_odds = to_call / (pot + to_call) if (pot + to_call) > 0 else 0
+
+    # Fronteras de equity donde cambia la decisión en esta fase: el Monte
+    # Carlo para en cuanto la estimación queda claramente a un lado de todas
+    # (num_sims es el máximo para los spots marginales)
+    if to_call > 0:
+        thresholds = {
+            'preflop': (0.65, 0.45),
+            'flop':    (0.75, pot_odds, 0.5),
+            'turn':    (0.80, pot_odds),
+        }.get(fase, (0.85, pot_odds))
+    else:
+        thresholds = (0.5, 0.10)
 
     # Calcular equity según fase y board actual
-    equity = get_equity_cached(my_cards, community, num_players=2, num_simulations=num_sims)
+    equity = get_equity_cached(my_cards, community, num_players=2, num_simulations=num_sims,
+                               thresholds=thresholds)
 
     # Acciones de raise disponibles
     raises = [a for a in valid_actions if isinstance(a, tuple) and a[0] == 'raise']
     allowed = sorted([amt for _, amt in raises])
-    pot_odds = to_call / (pot + to_call) if (pot + to_call) > 0 else 0
 
     def pick_raise(ratio):
         if not allowed:
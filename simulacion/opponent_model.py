@@ -283,6 +283,17 @@ class OpponentModel:
 
         return adj
 
+    # ── Rango estimado ────────────────────────────────────────────────────────
+
+    def estimated_range(self, raised: bool = False):
+        """
+        Rango preflop estimado del rival como pesos sobre los 1.326 combos
+        (ver range_equity): el top-VPIP de manos, o el top-PFR si ha subido.
+        Con pocas manos observadas usa los valores por defecto de las stats.
+        """
+        from range_equity import top_range
+        return top_range(self.stats.pfr if raised else self.stats.vpip)
+
     # ── Representación ────────────────────────────────────────────────────────
 
     def summary(self) -> str:
@@ -2,7 +2,9 @@ import random
 import json
 import logging
 
-from template import eval_hand_from_strings
+import numpy as np
+
+from template import cards_to_ints, eval_hands_batch
 
 logging.basicConfig(
     level=logging.WARNING,
@@ -487,12 +489,11 @@ class PokerCoreEngine:
         # Showdown
         if len(self.mesa.community_cards) == 5:
             self.mesa.log_event(["phase", "showdown"])
-            board = [compact_card(c) for c in self.mesa.community_cards]
-            scores = []
-            for j in self.mesa.jugadores:
-                mano = [compact_card(c) for c in j.mano]
-                score = eval_hand_from_strings(mano, board)
-                scores.append(score)
+            board = cards_to_ints([compact_card(c) for c in self.mesa.community_cards])
+            manos = np.stack([cards_to_ints([compact_card(c) for c in j.mano])
+                              for j in self.mesa.jugadores])
+            scores = eval_hands_batch(manos, np.tile(board, (len(manos), 1))).tolist()
+            for j, score in zip(self.mesa.jugadores, scores):
                 self.mesa.log_event(["x", j.id, score])
 
             if scores[0] == scores[1]:
@@ -18,6 +18,9 @@ Uso
 
     # Validar estrategia después de entrenar:
     python pre_entrenamiento.py --iters 10000 --validate
+
+    # Variante de CFR (vanilla, cfr+, linear, dcfr; ver MCCFRTrainer.set_variant):
+    python pre_entrenamiento.py --iters 50000 --variant dcfr --alpha 1.5 --beta 0 --gamma 2
 """
 
 import os
@@ -30,7 +33,7 @@ _DIR = os.path.dirname(os.path.abspath(__file__))
 if _DIR not in sys.path:
     sys.path.insert(0, _DIR)
 
-from cfr.mccfr_trainer import MCCFRTrainer
+from cfr.mccfr_trainer import VARIANTS, MCCFRTrainer
 from abstracciones.infoset_encoder import (
     ABSTRACT_ACTIONS, CALL, RAISE_POT, encode_infoset,
 )
@@ -118,6 +121,16 @@ def main():
                         help='Mostrar muestra de estrategias al finalizar')
     parser.add_argument('--out',      type=str, default=None,
                         help='Ruta de salida del blueprint (default: cfr/blueprint.pkl)')
+    parser.add_argument('--variant',  choices=VARIANTS, default=None,
+                        help='Variante de CFR (default: la del blueprint con --resume, si no vanilla)')
+    parser.add_argument('--alpha',    type=float, default=1.5,
+                        help='DCFR: exponente de los regrets positivos (default: 1.5)')
+    parser.add_argument('--beta',     type=float, default=0.0,
+                        help='DCFR: exponente de los regrets negativos (default: 0)')
+    parser.add_argument('--gamma',    type=float, default=2.0,
+                        help='DCFR: exponente de la estrategia media (default: 2)')
+    parser.add_argument('--avg-delay', type=int, default=0,
+                        help='Iteraciones iniciales fuera de la estrategia media (default: 0)')
     args = parser.parse_args()
 
     # Cargar o crear trainer
@@ -127,6 +140,9 @@ def main():
     else:
         trainer = MCCFRTrainer()
         print("Iniciando entrenamiento desde cero.")
+    if args.variant is not None:
+        trainer.set_variant(args.variant, args.alpha, args.beta, args.gamma, args.avg_delay)
+    print(f"Variante de CFR: {trainer.variant}")
 
     # Entrenamiento
     t0 = time.time()
@@ -4,7 +4,8 @@ Pre-flight check para entrenamiento largo del blueprint.
 
 No modifica la matematica del trainer/solver. Solo orquesta un dry run:
   1) Entrena 10k iteraciones MCCFR en bloques de 1k y monitorea RAM/velocidad/nodos.
-  2) Imprime proxy de convergencia (regret medio absoluto global).
+  2) Imprime proxy de convergencia (regret medio absoluto global) y las
+     métricas de las cachés de abstracción/equity (cache_metrics) por bloque.
   3) Ejecuta hand-off de prueba al turn y valida que el subgame solver recibe rango logico.
   4) Genera STATUS.md con resumen final.
 """
@@ -32,7 +33,9 @@ _DIR = os.path.dirname(os.path.abspath(__file__))
 if _DIR not in sys.path:
     sys.path.insert(0, _DIR)
 
-from abstracciones.card_abstractor import PREFLOP_BUCKETS, POSTFLOP_BUCKETS, preflop_bucket, postflop_bucket
+from abstracciones.card_abstractor import (
+    PREFLOP_BUCKETS, POSTFLOP_BUCKETS, preflop_bucket, postflop_bucket_batch,
+)
 from abstracciones.infoset_encoder import (
     ABSTRACT_ACTIONS,
     ACTION_IDX,
@@ -40,6 +43,7 @@ from abstracciones.infoset_encoder import (
     FOLD,
     RAISE_RATIOS,
 )
+from cache_metrics import cache_report
 from cfr.mccfr_trainer import MCCFRTrainer
 from cfr.realtime_search import RealtimeSearch, _fast_key, _precompute_buckets
 
@@ -61,11 +65,11 @@ def _full_deck() -> List[str]:
     return [r + s for r in RANKS for s in SUITS]
 
 
-def _mean_abs_regret(regret_sum: Dict[Tuple, np.ndarray]) -> float:
-    if not regret_sum:
+def _mean_abs_regret(regrets: np.ndarray) -> float:
+    """Regret medio absoluto sobre todas las filas (n_infosets, NUM_ACTIONS)."""
+    if not len(regrets):
         return 0.0
-    vals = [float(np.mean(np.abs(arr))) for arr in regret_sum.values()]
-    return float(np.mean(vals)) if vals else 0.0
+    return float(np.abs(regrets).mean())
 
 
 def _check_action_guardrails() -> bool:
@@ -98,7 +102,7 @@ def monitor_training(total_iters: int, chunk: int, bucket_sims: int) -> Tuple[MC
         ram_mb = process.memory_info().rss / (1024 * 1024)
         ips = step / dt
         nodes = len(trainer.regret_sum)
-        proxy = _mean_abs_regret(trainer.regret_sum)
+        proxy = _mean_abs_regret(trainer.table.regrets)
 
         row = MonitorRow(
             iters=done,
@@ -112,6 +116,7 @@ def monitor_training(total_iters: int, chunk: int, bucket_sims: int) -> Tuple[MC
         print(
             f"{done:>5d} | {ram_mb:>7.1f} | {ips:>7.1f} | {nodes:>7d} | {proxy:>12.6f}"
         )
+        print(cache_report())
 
     return trainer, rows
 
@@ -120,7 +125,6 @@ def compute_turn_reach_probs(
     trainer: MCCFRTrainer,
     my_hand: List[str],
     board_turn: List[str],
-    hand_sims: int = 16,
 ) -> Dict[Tuple[str, str], float]:
     """
     Proxy de reach probabilities del rango rival en turn.
@@ -134,15 +138,17 @@ def compute_turn_reach_probs(
     probs: Dict[Tuple[str, str], float] = {}
     opp_pos = 1  # BB
 
-    for a, b in combinations(remaining, 2):
-        opp_hand = [a, b]
+    opp_hands = [[a, b] for a, b in combinations(remaining, 2)]
+    turn_bkts = postflop_bucket_batch(board_turn, opp_hands).tolist()
+
+    for opp_hand, turn_bkt in zip(opp_hands, turn_bkts):
+        a, b = opp_hand
 
         pf_bkt = preflop_bucket(opp_hand, num_sims=1)
         key_pf = (opp_pos, 0, pf_bkt, (CALL,))
         strat_pf = trainer.get_strategy(key_pf)
         p_continue_pf = max(1e-9, 1.0 - float(strat_pf[ACTION_IDX[FOLD]]))
 
-        turn_bkt = postflop_bucket(opp_hand, board_turn, num_sims=hand_sims)
         key_turn = (opp_pos, 2, turn_bkt, ())
         strat_turn = trainer.get_strategy(key_turn)
         p_continue_turn = max(1e-9, 1.0 - float(strat_turn[ACTION_IDX[FOLD]]))
@@ -293,7 +299,7 @@ def main() -> int:
     # Hand-off de prueba en turn con board inventado
     my_hand = ['Ah', 'Kd']
     board_turn = ['Qs', 'Jh', '7c', '2d']
-    hand_probs = compute_turn_reach_probs(trainer, my_hand=my_hand, board_turn=board_turn, hand_sims=16)
+    hand_probs = compute_turn_reach_probs(trainer, my_hand=my_hand, board_turn=board_turn)
 
     handoff_ok, top5, handoff_msg = handoff_turn_to_realtime(
         trainer=trainer,
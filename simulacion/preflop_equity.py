@@ -0,0 +1,310 @@
+"""
+Matriz exacta de equity preflop 169×169 (clase de mano vs clase de mano).
+
+Sustituye al Monte Carlo preflop (montecarlo_equity con 500 simulaciones y
+preflop_bucket vía compute_ehs(..., [])) por consultas a un array:
+
+- equity_vs_hand(h1, h2)   : clase vs clase (all-in preflop, heads-up)
+- equity_vs_random(hole)   : clase vs mano aleatoria
+- range_vs_range(w1, w2)   : dos rangos de pesos sobre las 169 clases
+
+Clases
+------
+Las 169 clases se ordenan en la cuadrícula 13×13 habitual, de A a 2:
+índice = (12 - r_alta) * 13 + (12 - r_baja), con las suited encima de la
+diagonal ('AKs' = 1) y las offsuit debajo ('AKo' = 13). HAND_CLASSES[i] es la
+etiqueta de la clase i.
+
+Cálculo exacto
+--------------
+E[i, j] = media sobre todos los pares de combos (a ∈ i, b ∈ j) sin cartas
+comunes y todos los boards de 5 cartas compatibles de [a gana] + ½[empate].
+
+Se enumeran los C(52,5) boards agrupados en sus 134.459 clases bajo
+permutación de palos (las clases de mano son invariantes, así que cada board
+canónico pesa tanto como su órbita). Para cada board se evalúan las 1.081
+manos compatibles, se ordenan por fuerza y, con histogramas acumulados por
+clase, se cuentan para cada combo los combos de cada clase que vence o con
+los que empata. Los pares que comparten carta se restan después (grupos de 46
+combos por carta). El trabajo se reparte en bloques de boards entre procesos.
+
+El resultado se guarda en preflop_equity.npy (169×169 float64) y se abre con
+memoria mapeada. Si no existe, available() es False y los llamadores usan su
+Monte Carlo de siempre.
+
+Uso
+---
+    python preflop_equity.py                 # construye con todos los núcleos
+    python preflop_equity.py --workers 4
+
+    from preflop_equity import equity_vs_random, equity_vs_hand
+    equity_vs_random(['Ah', 'Ad'])           # 0.8520...
+    equity_vs_hand(['Ah', 'Ad'], ['Kc', 'Kd'])
+"""
+
+import os
+import time
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'preflop_equity.npy')
+
+RANKS = '23456789TJQKA'
+SUITS = 'shdc'
+
+N_CLASSES = 169
+
+
+# ── Clases de mano ────────────────────────────────────────────────────────────
+
+def _class_of(r_a, s_a, r_b, s_b):
+    hi, lo = max(r_a, r_b), min(r_a, r_b)
+    if hi == lo or s_a != s_b:                    # pareja u offsuit: bajo la diagonal
+        return (12 - lo) * 13 + (12 - hi)
+    return (12 - hi) * 13 + (12 - lo)             # suited: sobre la diagonal
+
+
+def _label(idx):
+    row, col = divmod(idx, 13)
+    if row == col:
+        return RANKS[12 - row] * 2
+    if row < col:
+        return RANKS[12 - row] + RANKS[12 - col] + 's'
+    return RANKS[12 - col] + RANKS[12 - row] + 'o'
+
+
+HAND_CLASSES = [_label(i) for i in range(N_CLASSES)]
+
+# Los 1.326 combos (cartas 0..51 = rank*4 + suit) y su clase
+_COMBOS      = np.array(list(combinations(range(52), 2)), dtype=np.int64)
+_COMBO_CLASS = np.array([_class_of(a >> 2, a & 3, b >> 2, b & 3) for a, b in _COMBOS],
+                        dtype=np.int64)
+_COMBO_ID    = np.full((52, 52), -1, dtype=np.int64)
+_COMBO_ID[_COMBOS[:, 0], _COMBOS[:, 1]] = np.arange(len(_COMBOS))
+_COMBO_ID[_COMBOS[:, 1], _COMBOS[:, 0]] = np.arange(len(_COMBOS))
+
+_CARD2INT = {r + s: i * 4 + j for i, r in enumerate(RANKS) for j, s in enumerate(SUITS)}
+
+
+def hand_class_index(hole):
+    """Índice 0..168 de la clase de una mano ['Ah', 'Kd'] (o etiqueta 'AKo')."""
+    if isinstance(hole, str):
+        return HAND_CLASSES.index(hole)
+    a, b = _CARD2INT[hole[0]], _CARD2INT[hole[1]]
+    return _class_of(a >> 2, a & 3, b >> 2, b & 3)
+
+
+def _pair_counts():
+    """P[i, j] = nº de pares de combos (a ∈ i, b ∈ j) sin cartas comunes."""
+    c = _COMBOS
+    disjoint = ((c[:, 0, None] != c[None, :, 0]) & (c[:, 0, None] != c[None, :, 1]) &
+                (c[:, 1, None] != c[None, :, 0]) & (c[:, 1, None] != c[None, :, 1]))
+    onehot = np.zeros((len(c), N_CLASSES))
+    onehot[np.arange(len(c)), _COMBO_CLASS] = 1.0
+    return onehot.T @ disjoint @ onehot
+
+
+# ── Construcción ──────────────────────────────────────────────────────────────
+
+def canonical_boards():
+    """
+    Boards de 5 cartas canónicos bajo permutación de palos.
+
+    Retorna
+    -------
+    (boards, weights) – np.ndarray (B, 5) int8 y np.ndarray (B,) int64 con el
+                        tamaño de cada órbita (Σ weights = C(52, 5))
+    """
+    boards = np.array(list(combinations(range(52), 5)), dtype=np.int8)
+    bits   = (1 << (boards.astype(np.int64) >> 2))
+    masks  = np.stack([np.where((boards & 3) == s, bits, 0).sum(axis=1) for s in range(4)],
+                      axis=1)
+    masks  = -np.sort(-masks, axis=1)
+    key    = (masks[:, 0] << 39) | (masks[:, 1] << 26) | (masks[:, 2] << 13) | masks[:, 3]
+    _, first, counts = np.unique(key, return_index=True, return_counts=True)
+    return boards[first], counts.astype(np.int64)
+
+
+def _board_scores(board):
+    """
+    Suma, para un board, de [a gana] + ½[empate] sobre todos los pares de
+    combos compatibles (a, b) sin cartas comunes, agregada por clase.
+
+    Retorna
+    -------
+    np.ndarray (169, 169) float64
+    """
+    from tablas_eval import eval_batch
+
+    board   = np.asarray(board, dtype=np.int64)
+    on_b    = np.zeros(52, dtype=bool)
+    on_b[board] = True
+    valid   = ~(on_b[_COMBOS[:, 0]] | on_b[_COMBOS[:, 1]])
+    ids     = np.nonzero(valid)[0]
+    cls     = _COMBO_CLASS[ids]
+    n       = len(ids)
+
+    hands = np.concatenate([_COMBOS[ids], np.broadcast_to(board, (n, 5))], axis=1)
+    rank_of = np.zeros(len(_COMBOS), dtype=np.int64)
+    rank_of[ids] = eval_batch(hands)
+    r = rank_of[ids]
+
+    # Todos los pares compatibles con el board (aún sin descartar cartas comunes)
+    order    = np.argsort(r, kind='stable')
+    r_sorted = r[order]
+    onehot   = np.zeros((n + 1, N_CLASSES))
+    onehot[np.arange(1, n + 1), cls[order]] = 1.0
+    cum      = np.cumsum(onehot, axis=0)                    # cum[k] = clases de los k primeros
+    lo       = np.searchsorted(r_sorted, r, side='left')
+    hi       = np.searchsorted(r_sorted, r, side='right')
+    per_a    = 0.5 * (cum[lo] + cum[hi])                    # vence + ½ empata, por clase
+    flat     = (cls[:, None] * N_CLASSES + np.arange(N_CLASSES)).ravel()
+    scores   = np.bincount(flat, weights=per_a.ravel(), minlength=N_CLASSES ** 2)
+
+    # Restar pares que comparten carta: grupos de 46 combos por carta libre
+    free   = np.nonzero(~on_b)[0]
+    groups = _COMBO_ID[free[:, None], free[None, :]]
+    groups = groups[~np.eye(len(free), dtype=bool)].reshape(len(free), len(free) - 1)
+    rg     = rank_of[groups]
+    val    = (rg[:, :, None] > rg[:, None, :]) + 0.5 * (rg[:, :, None] == rg[:, None, :])
+    cg     = _COMBO_CLASS[groups]
+    idx    = (cg[:, :, None] * N_CLASSES + cg[:, None, :]).ravel()
+    scores -= np.bincount(idx, weights=val.ravel(), minlength=N_CLASSES ** 2)
+    # (a, a) comparte dos cartas: está en dos grupos pero una sola vez en el total
+    scores += np.bincount(cls * (N_CLASSES + 1), minlength=N_CLASSES ** 2) * 0.5
+    return scores.reshape(N_CLASSES, N_CLASSES)
+
+
+def _board_chunk(args):
+    boards, weights = args
+    acc = np.zeros((N_CLASSES, N_CLASSES))
+    for board, w in zip(boards, weights):
+        acc += w * _board_scores(board)
+    return acc
+
+
+def build_table(workers=None, chunk=512, verbose=True):
+    """
+    Calcula la matriz exacta repartiendo los boards canónicos entre procesos.
+
+    Parámetros
+    ----------
+    workers : int | None – procesos (None = os.cpu_count())
+    chunk   : int        – boards por tarea
+
+    Retorna
+    -------
+    np.ndarray float64 (169, 169) – E[i, j] = equity de la clase i contra la j
+    """
+    from multiprocessing import Pool
+
+    boards, weights = canonical_boards()
+    tasks = [(boards[i:i + chunk], weights[i:i + chunk]) for i in range(0, len(boards), chunk)]
+    workers = workers or os.cpu_count() or 1
+    total   = np.zeros((N_CLASSES, N_CLASSES))
+    t0      = time.time()
+    with Pool(workers) as pool:
+        for k, part in enumerate(pool.imap_unordered(_board_chunk, tasks), 1):
+            total += part
+            if verbose and (k % 20 == 0 or k == len(tasks)):
+                print(f"  {k}/{len(tasks)} bloques  ({time.time() - t0:.0f}s)")
+    denom = _pair_counts() * comb(48, 5)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denom > 0, total / denom, 0.0)
+
+
+# ── Carga y consultas ─────────────────────────────────────────────────────────
+
+_matrix = None        # np.ndarray (169, 169) memmap
+_pairs  = None        # P[i, j]: pares de combos compatibles (pesos de rango)
+_vs_rnd = None        # equity de cada clase contra una mano aleatoria
+
+
+def available():
+    """True si preflop_equity.npy existe y tiene el formato esperado."""
+    return _load() is not None
+
+
+def _load():
+    global _matrix, _pairs, _vs_rnd
+    if _matrix is not None:
+        return _matrix
+    if not os.path.exists(TABLE_PATH):
+        return None
+    try:
+        m = np.load(TABLE_PATH, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if m.shape != (N_CLASSES, N_CLASSES):
+        return None
+    _pairs  = _pair_counts()
+    _vs_rnd = (m * _pairs).sum(axis=1) / _pairs.sum(axis=1)
+    _matrix = m
+    return _matrix
+
+
+def _require():
+    m = _load()
+    if m is None:
+        raise FileNotFoundError(
+            f"No existe '{TABLE_PATH}'. Constrúyela con: python preflop_equity.py")
+    return m
+
+
+def equity_matrix():
+    """Matriz (169, 169) memmap: E[i, j] = equity de la clase i contra la j."""
+    return _require()
+
+
+def equity_vs_hand(hole, opp):
+    """Equity all-in preflop de la clase de hole contra la clase de opp."""
+    return float(_require()[hand_class_index(hole), hand_class_index(opp)])
+
+
+def equity_vs_random(hole):
+    """Equity all-in preflop de hole contra una mano aleatoria."""
+    _require()
+    return float(_vs_rnd[hand_class_index(hole)])
+
+
+def vs_random_vector():
+    """np.ndarray (169,) con la equity de cada clase contra una mano aleatoria."""
+    _require()
+    return _vs_rnd
+
+
+def range_vs_range(w1, w2):
+    """
+    Equity del rango w1 contra el rango w2.
+
+    Parámetros
+    ----------
+    w1, w2 : array-like (169,) – peso de cada clase (frecuencia por combo, 0..1)
+
+    Retorna
+    -------
+    float – equity de w1 ponderada por combos compatibles
+    """
+    m  = _require()
+    w1 = np.asarray(w1, dtype=np.float64)
+    w2 = np.asarray(w2, dtype=np.float64)
+    pw = _pairs * w1[:, None] * w2[None, :]
+    return float((pw * m).sum() / pw.sum())
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Construye la matriz de equity preflop 169×169')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Procesos paralelos (default: todos los núcleos)')
+    args = parser.parse_args()
+
+    t0 = time.time()
+    table = build_table(workers=args.workers)
+    np.save(TABLE_PATH, table)
+    print(f"Tabla guardada en '{TABLE_PATH}'  ({time.time() - t0:.0f}s)")
+    print(f"  AA vs KK  = {table[0, 14]:.4f}")
+    print(f"  AKs vs QQ = {table[1, 28]:.4f}")
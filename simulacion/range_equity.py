@@ -0,0 +1,276 @@
+"""
+Equity contra rangos ponderados sobre los 1.326 combos.
+
+Un rango es un vector de pesos (1326,) en el orden de preflop_equity._COMBOS
+(pares de cartas 0..51 en orden lexicográfico); peso = frecuencia del combo.
+En lugar de muestrear una mano rival por rollout, se evalúan de una vez las
+1.326 manos en cada runout y se compara la del héroe contra el rango entero:
+
+- hand_vs_range(hole, board, villain)     : una mano contra un rango
+- range_vs_range(hero, villain, board)    : rango contra rango
+- combo_showdown(board, villain, hero)    : sumas (gana, total) por combo
+
+Card removal
+------------
+En cada runout los combos que tocan board, runout o la mano del héroe no
+cuentan. Para no comparar par a par, la fuerza del rival se acumula en un
+histograma de pesos por valor de mano: "pesos por debajo de mi mano" es una
+suma acumulada. La escala de eval_hands_batch depende del backend (HandVal
+de la librería C, tablas_eval, Python), así que los valores de cada bloque
+se comprimen antes a su rango denso 0..V-1, que conserva el orden. Después se restan, para cada carta del héroe,
+los 51 combos rivales que la contienen (y se repone el propio combo, que se
+ha restado dos veces).
+
+Runouts: se enumeran todos si caben en max_runouts (river 1, turn 48,
+flop 1.176) y si no se muestrean (preflop).
+
+Uso
+---
+    from range_equity import weights_from_hands, hand_vs_range
+    villain = weights_from_hands(['QQ+', 'AKs'])  # ver weights_from_hands
+    hand_vs_range(['Ah', 'Kd'], ['2c', '7h', 'Qs'], villain)
+"""
+
+import os
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from preflop_equity import (
+    HAND_CLASSES, N_CLASSES, _COMBOS, _COMBO_CLASS, _COMBO_ID, _CARD2INT,
+)
+from template import eval_hands_batch
+
+N_COMBOS = len(_COMBOS)
+RANKS    = '23456789TJQKA'
+
+# Máscara de 52 bits de cada combo y los 51 combos que contienen cada carta
+_COMBO_MASK = (np.uint64(1) << _COMBOS[:, 0].astype(np.uint64)) | \
+              (np.uint64(1) << _COMBOS[:, 1].astype(np.uint64))
+_CARD_GROUP = _COMBO_ID[~np.eye(52, dtype=bool)].reshape(52, 51)
+
+_RUNOUT_CHUNK = 64
+
+# Generador de los runouts muestreados; como en card_abstractor, cada hijo de
+# un fork lo vuelve a sembrar para no repetir los mismos runouts
+_rng = np.random.default_rng()
+
+
+def _reseed_after_fork():
+    global _rng
+    _rng = np.random.default_rng()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reseed_after_fork)
+
+
+# ── Construcción de rangos ────────────────────────────────────────────────────
+
+def combo_index(hole):
+    """Índice 0..1325 de una mano ['Ah', 'Kd'] o 'AhKd'."""
+    if isinstance(hole, str):
+        hole = [hole[:2], hole[2:]]
+    return int(_COMBO_ID[_CARD2INT[hole[0]], _CARD2INT[hole[1]]])
+
+
+def _expand_label(label):
+    """'QQ+', 'ATs+', 'AK' → lista de clases (índices de HAND_CLASSES)."""
+    plus = label.endswith('+')
+    base = label.rstrip('+')
+    if len(base) == 2 and base[0] != base[1]:
+        return _expand_label(base + 's' + ('+' if plus else '')) + \
+            _expand_label(base + 'o' + ('+' if plus else ''))
+    if not plus:
+        return [HAND_CLASSES.index(base)]
+    hi, lo = RANKS.index(base[0]), RANKS.index(base[1])
+    if hi == lo:                                   # QQ+ → QQ, KK, AA
+        return [HAND_CLASSES.index(RANKS[r] * 2) for r in range(hi, 13)]
+    return [HAND_CLASSES.index(base[0] + RANKS[r] + base[2])   # ATs+ → ATs..AKs
+            for r in range(lo, hi)]
+
+
+def weights_from_classes(class_weights):
+    """Vector (1326,) a partir de pesos por clase (169,)."""
+    return np.asarray(class_weights, dtype=np.float64)[_COMBO_CLASS]
+
+
+def weights_from_hands(hands):
+    """
+    Vector de pesos (1326,) a partir de una lista de manos.
+
+    Acepta combos concretos ('AsAh' o ['As', 'Ah']) y clases con notación
+    habitual ('AKs', 'QQ', 'AK' = suited + offsuit, 'QQ+', 'ATs+'). Lista
+    vacía = rango completo (mano aleatoria).
+    """
+    if not hands:
+        return np.ones(N_COMBOS)
+    w = np.zeros(N_COMBOS)
+    for h in hands:
+        if isinstance(h, (list, tuple)) or (len(h) == 4 and h[1] in 'shdc'):
+            w[combo_index(h)] = 1.0
+        else:
+            for cls in _expand_label(h):
+                w[_COMBO_CLASS == cls] = 1.0
+    return w
+
+
+def _class_example(label):
+    """Un combo concreto de la clase: 'AKs' → ['As', 'Ks'], 'AKo'/'AA' → ['As', 'Kh']."""
+    return [label[0] + 's', label[1] + ('s' if label.endswith('s') else 'h')]
+
+
+def top_range(fraction):
+    """
+    Rango con el `fraction` (0..1) de combos más fuertes según la equity
+    preflop contra mano aleatoria (p.ej. el VPIP de un rival).
+    """
+    import preflop_equity
+    if preflop_equity.available():
+        strength = np.asarray(preflop_equity.vs_random_vector())
+    else:
+        from abstracciones.card_abstractor import compute_ehs
+        strength = np.array([compute_ehs(_class_example(c), [], 300) for c in HAND_CLASSES])
+    per_class = np.bincount(_COMBO_CLASS, minlength=N_CLASSES)
+    order     = np.argsort(-strength, kind='stable')
+    target    = fraction * N_COMBOS
+    cw, taken = np.zeros(N_CLASSES), 0.0
+    for cls in order:
+        if taken >= target:
+            break
+        cw[cls] = min(1.0, (target - taken) / per_class[cls])
+        taken  += per_class[cls]
+    return weights_from_classes(cw)
+
+
+# ── Núcleo vectorizado ────────────────────────────────────────────────────────
+
+def _runouts(board_i, max_runouts, rng):
+    free   = np.setdiff1d(np.arange(52), board_i)
+    n_fill = 5 - len(board_i)
+    if comb(len(free), n_fill) <= max_runouts:
+        idx = np.array(list(combinations(range(len(free)), n_fill)),
+                       dtype=np.int64).reshape(comb(len(free), n_fill), n_fill)
+    else:
+        idx = np.argsort(rng.random((max_runouts, len(free))), axis=1)[:, :n_fill]
+    return free[idx]
+
+
+def combo_showdown(board, villain, hero=None, max_runouts=1500, rng=None):
+    """
+    Sumas de showdown de cada combo del héroe contra el rango rival.
+
+    Parámetros
+    ----------
+    board       : list[str]         – 0-5 cartas comunitarias
+    villain     : array-like (1326,) – pesos del rango rival
+    hero        : array-like (1326,) | None – combos del héroe a calcular
+                  (None = todos los compatibles con el board)
+    max_runouts : int – runouts enumerados si caben; si no, muestreados
+
+    Retorna
+    -------
+    (win, tot) – np.ndarray (1326,) float64: Σ peso·([gana] + ½[empata]) y
+                 Σ peso sobre los runouts; equity del combo a = win[a] / tot[a]
+    """
+    rng     = rng or _rng
+    board_i = np.array([_CARD2INT[c] for c in board], dtype=np.int64)
+    b_mask  = np.uint64(0)
+    for c in board_i:
+        b_mask |= np.uint64(1) << np.uint64(c)
+    on_board = (_COMBO_MASK & b_mask) != 0
+    wv = np.where(on_board, 0.0, np.asarray(villain, dtype=np.float64))
+    if hero is None:
+        heroes = np.nonzero(~on_board)[0]
+    else:
+        heroes = np.nonzero((np.asarray(hero) > 0) & ~on_board)[0]
+
+    runouts = _runouts(board_i, max_runouts, rng)
+    win = np.zeros(N_COMBOS)
+    tot = np.zeros(N_COMBOS)
+    if len(heroes) == 0 or not wv.any():
+        return win, tot
+
+    groups = [_CARD_GROUP[_COMBOS[heroes, j]] for j in (0, 1)]     # (H, 51) ×2
+    for start in range(0, len(runouts), _RUNOUT_CHUNK):
+        ro = runouts[start:start + _RUNOUT_CHUNK]
+        K  = len(ro)
+        boards = np.concatenate([np.broadcast_to(board_i, (K, len(board_i))), ro], axis=1)
+
+        r_mask = np.zeros(K, dtype=np.uint64)
+        for j in range(ro.shape[1]):
+            r_mask |= np.uint64(1) << ro[:, j].astype(np.uint64)
+        alive = (_COMBO_MASK[None, :] & (r_mask[:, None] | b_mask)) == 0   # (K, 1326)
+        w     = wv[None, :] * alive
+
+        # Los combos muertos (carta repetida) se evalúan con dos cartas libres
+        # de su runout: el evaluador no admite duplicados y su peso ya es 0
+        used = np.zeros((K, 52), dtype=bool)
+        used[np.arange(K)[:, None], boards] = True
+        spare = np.argsort(used, axis=1, kind='stable')[:, :2]
+        holes = np.where(alive[:, :, None], _COMBOS[None, :, :], spare[:, None, :])
+        scores = eval_hands_batch(holes.reshape(K * N_COMBOS, 2).astype(np.int8),
+                                  np.repeat(boards, N_COMBOS, axis=0).astype(np.int8))
+        _, scores = np.unique(scores, return_inverse=True)     # rango denso
+        scores = scores.reshape(K, N_COMBOS)
+        n_val  = int(scores.max()) + 1
+
+        # Histograma de pesos rivales por valor → "peso por debajo" acumulado
+        flat  = (np.arange(K)[:, None] * n_val + scores).ravel()
+        hist  = np.bincount(flat, weights=w.ravel(),
+                            minlength=K * n_val).reshape(K, n_val)
+        below = np.cumsum(hist, axis=1) - hist
+        rows  = np.arange(K)[:, None]
+        s_h   = scores[:, heroes]
+        w_win = below[rows, s_h] + 0.5 * hist[rows, s_h]
+        w_tot = np.broadcast_to(hist.sum(axis=1)[:, None], s_h.shape).copy()
+
+        # Card removal: combos rivales que comparten carta con el héroe
+        for g in groups:
+            sg = scores[:, g]                                           # (K, H, 51)
+            wg = w[:, g]
+            cmp = (sg < s_h[:, :, None]) + 0.5 * (sg == s_h[:, :, None])
+            w_win -= (wg * cmp).sum(axis=2)
+            w_tot -= wg.sum(axis=2)
+        w_win += 0.5 * w[:, heroes]        # el propio combo se restó dos veces
+        w_tot += w[:, heroes]
+
+        h_alive = alive[:, heroes]
+        win[heroes] += (w_win * h_alive).sum(axis=0)
+        tot[heroes] += (w_tot * h_alive).sum(axis=0)
+    return win, tot
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+def hand_vs_range(hole, board, villain, max_runouts=1500):
+    """
+    Equity de una mano contra un rango ponderado.
+
+    Parámetros
+    ----------
+    hole    : list[str]          – 2 cartas del héroe
+    board   : list[str]          – 0-5 cartas comunitarias
+    villain : array-like (1326,) – pesos del rival (ver weights_from_hands)
+
+    Retorna
+    -------
+    float – equity en [0, 1]; 0.0 si ningún combo rival es compatible
+    """
+    hero = np.zeros(N_COMBOS)
+    a    = combo_index(hole)
+    hero[a] = 1.0
+    win, tot = combo_showdown(board, villain, hero, max_runouts)
+    return float(win[a] / tot[a]) if tot[a] > 0 else 0.0
+
+
+def range_vs_range(hero, villain, board=(), max_runouts=1500):
+    """
+    Equity del rango hero contra el rango villain (pesos (1326,) cada uno),
+    ponderando cada par de combos compatibles por el producto de pesos.
+    """
+    hero = np.asarray(hero, dtype=np.float64)
+    win, tot = combo_showdown(list(board), villain, hero, max_runouts)
+    den = (hero * tot).sum()
+    return float((hero * win).sum() / den) if den > 0 else 0.0
@@ -0,0 +1,244 @@
+"""
+Evaluador de manos de 5-7 cartas por tablas precomputadas (puro Python/NumPy).
+
+Sustituye al evaluador Python de fuerza bruta (_py_eval_hand: 21 llamadas a
+_rank_five con Counter y sorted) cuando libhand_eval.so no está disponible.
+
+Codificación de cartas
+----------------------
+    carta = rank * 4 + suit      rank 0..12 ('2'..'A'), suit 0..3 ('s','h','d','c')
+
+Es la misma codificación 0..51 que usa abstracciones.card_abstractor._CARD2INT.
+
+Tablas
+------
+- Manos sin color: el multiconjunto de rangos (5, 6 o 7 cartas) se indexa con
+  un hash perfecto combinatorio. Para rangos ordenados r_0 ≤ … ≤ r_{n-1}:
+
+        idx = Σ_i C(r_i + i, i + 1)
+
+  que es una biyección sobre [0, C(12 + n, n)). Hay una tabla por tamaño n
+  (6.188 + 18.564 + 50.388 entradas).
+- Color: como mucho un palo puede reunir ≥5 cartas de 7, y con color no cabe
+  póker ni full. El valor se lee de una tabla de 8.192 entradas indexada por la
+  máscara de 13 bits de los rangos del palo del color.
+
+Los valores son el orden denso de las 7.462 clases de mano (1 = 7-5-4-3-2
+sin color, 7462 = escalera real). Convención: mayor = mejor mano.
+
+Todas las tablas se guardan concatenadas en un único array uint16 en
+hand_eval_table.npy (~160 KB), que se construye UNA vez (~1,5 s) y después se
+abre con memoria mapeada (np.load(mmap_mode='r')).
+
+Uso
+---
+    python tablas_eval.py            # (re)construye hand_eval_table.npy
+
+    from tablas_eval import eval_cards, eval_batch
+    eval_cards([48, 49, 50, 51, 0])               # mano de 5-7 enteros
+    eval_batch(np.array([[...7 cartas...], ...])) # np.ndarray (N,) uint16
+"""
+
+import os
+from collections import Counter
+from itertools import combinations, combinations_with_replacement
+from math import comb
+
+import numpy as np
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'hand_eval_table.npy')
+
+# ── Layout de la tabla concatenada ────────────────────────────────────────────
+
+_SIZES        = {n: comb(12 + n, n) for n in (5, 6, 7)}
+_OFFSET       = {5: 0, 6: _SIZES[5], 7: _SIZES[5] + _SIZES[6]}
+_FLUSH_OFFSET = _OFFSET[7] + _SIZES[7]
+_TABLE_SIZE   = _FLUSH_OFFSET + (1 << 13)
+
+# Hash perfecto de multiconjuntos: _MS_HASH[i, r] = C(r + i, i + 1)
+_MS_HASH = np.array([[comb(r + i, i + 1) for r in range(13)] for i in range(7)],
+                    dtype=np.int64)
+_MS_HASH_FLAT = _MS_HASH.ravel().tolist()
+
+# Conteo de palos en campos de 3 bits (máx. 7 cartas por palo → cabe en 3 bits)
+_SUIT_INC = np.array([1 << (3 * (c & 3)) for c in range(52)], dtype=np.int64)
+_SUIT_INC_LIST = _SUIT_INC.tolist()
+_FLUSH_SUIT = np.full(1 << 12, -1, dtype=np.int8)
+for _key in range(1 << 12):
+    for _s in range(4):
+        if (_key >> (3 * _s)) & 7 >= 5:
+            _FLUSH_SUIT[_key] = _s
+_FLUSH_SUIT_LIST = _FLUSH_SUIT.tolist()
+
+# Estado cargado perezosamente (ver _load)
+_table      = None   # np.ndarray uint16 (memmap si existe el fichero)
+_table_list = None   # copia list[int] para la ruta escalar (indexado más rápido)
+
+
+# ── Construcción ──────────────────────────────────────────────────────────────
+
+def _score5(ranks, flush):
+    """
+    Valor comparable (tupla) de una mano de exactamente 5 rangos.
+    Categorías: 0=carta alta … 8=escalera de color.
+    """
+    cnt    = Counter(ranks)
+    groups = sorted(cnt.items(), key=lambda kv: (kv[1], kv[0]), reverse=True)
+    counts = [g[1] for g in groups]
+    order  = tuple(g[0] for g in groups)
+
+    straight_top = -1
+    if len(cnt) == 5:
+        hi, lo = max(ranks), min(ranks)
+        if hi - lo == 4:
+            straight_top = hi
+        elif sorted(ranks) == [0, 1, 2, 3, 12]:   # rueda A-2-3-4-5
+            straight_top = 3
+
+    if straight_top >= 0 and flush:  return (8, straight_top)
+    if counts[0] == 4:               return (7,) + order
+    if counts[:2] == [3, 2]:         return (6,) + order
+    if flush:                        return (5,) + order
+    if straight_top >= 0:            return (4, straight_top)
+    if counts[0] == 3:               return (3,) + order
+    if counts[:2] == [2, 2]:         return (2,) + order
+    if counts[0] == 2:               return (1,) + order
+    return (0,) + order
+
+
+def _multiset_index(sorted_ranks):
+    return sum(comb(r + i, i + 1) for i, r in enumerate(sorted_ranks))
+
+
+def build_table():
+    """
+    Calcula la tabla completa en memoria.
+
+    Retorna
+    -------
+    np.ndarray uint16 shape (_TABLE_SIZE,) – 0 en entradas imposibles
+    """
+    scores = {}   # (ranks5 ordenados, flush) → tupla comparable
+
+    def best(ranks, flush):
+        top = None
+        for sub in set(combinations(ranks, 5)):
+            k = (sub, flush)
+            s = scores.get(k)
+            if s is None:
+                s = scores[k] = _score5(sub, flush)
+            if top is None or s > top:
+                top = s
+        return top
+
+    raw = {}   # posición en la tabla → tupla comparable
+    for n in (5, 6, 7):
+        for ranks in combinations_with_replacement(range(13), n):
+            if max(Counter(ranks).values()) > 4:
+                continue
+            raw[_OFFSET[n] + _multiset_index(ranks)] = best(ranks, False)
+    for mask in range(1 << 13):
+        ranks = tuple(r for r in range(13) if mask >> r & 1)
+        if len(ranks) >= 5:
+            raw[_FLUSH_OFFSET + mask] = best(ranks, True)
+
+    dense = {s: i + 1 for i, s in enumerate(sorted(set(scores.values())))}
+    table = np.zeros(_TABLE_SIZE, dtype=np.uint16)
+    for pos, s in raw.items():
+        table[pos] = dense[s]
+    return table
+
+
+def _load():
+    """Abre la tabla (memmap); la construye y guarda si no existe."""
+    global _table, _table_list
+    if _table is not None:
+        return _table
+    table = None
+    if os.path.exists(TABLE_PATH):
+        try:
+            table = np.load(TABLE_PATH, mmap_mode='r')
+            if table.shape != (_TABLE_SIZE,) or table.dtype != np.uint16:
+                table = None   # fichero de otra versión → reconstruir
+        except (OSError, ValueError):
+            table = None
+    if table is None:
+        table = build_table()
+        try:
+            np.save(TABLE_PATH, table)
+            table = np.load(TABLE_PATH, mmap_mode='r')
+        except OSError:
+            pass   # directorio de solo lectura: se usa la tabla en memoria
+    _table      = table
+    _table_list = table.tolist()
+    return _table
+
+
+# ── Evaluación ────────────────────────────────────────────────────────────────
+
+def eval_cards(cards):
+    """
+    Evalúa una mano de 5, 6 o 7 cartas codificadas como enteros 0..51.
+
+    Retorna
+    -------
+    int – clase de mano 1..7462 (mayor = mejor)
+    """
+    if _table_list is None:
+        _load()
+    key = 0
+    for c in cards:
+        key += _SUIT_INC_LIST[c]
+    fs = _FLUSH_SUIT_LIST[key]
+    if fs >= 0:
+        mask = 0
+        for c in cards:
+            if c & 3 == fs:
+                mask |= 1 << (c >> 2)
+        return _table_list[_FLUSH_OFFSET + mask]
+    idx = _OFFSET[len(cards)]
+    for i, r in enumerate(sorted(c >> 2 for c in cards)):
+        idx += _MS_HASH_FLAT[i * 13 + r]
+    return _table_list[idx]
+
+
+def eval_batch(cards):
+    """
+    Evaluación vectorizada de N manos del mismo tamaño (5, 6 o 7 cartas).
+
+    Parámetros
+    ----------
+    cards : np.ndarray shape (N, n) – enteros de carta 0..51
+
+    Retorna
+    -------
+    np.ndarray uint16 (N,) – clase de mano 1..7462 (mayor = mejor)
+    """
+    table = _load()
+    cards = np.asarray(cards, dtype=np.int64)
+    n     = cards.shape[1]
+    ranks = cards >> 2
+
+    r_sorted = np.sort(ranks, axis=1)
+    idx = _OFFSET[n] + _MS_HASH[np.arange(n), r_sorted].sum(axis=1)
+    out = np.asarray(table[idx])
+
+    fs = _FLUSH_SUIT[_SUIT_INC[cards].sum(axis=1)]
+    fl = fs >= 0
+    if fl.any():
+        sub   = cards[fl]
+        in_fs = (sub & 3) == fs[fl, None].astype(np.int64)
+        mask  = np.where(in_fs, 1 << (sub >> 2), 0).sum(axis=1)   # bits distintos
+        out[fl] = table[_FLUSH_OFFSET + mask]
+    return out
+
+
+if __name__ == '__main__':
+    import time
+    t0 = time.time()
+    if os.path.exists(TABLE_PATH):
+        os.remove(TABLE_PATH)
+    _load()
+    print(f"Tabla guardada en '{TABLE_PATH}'  ({_TABLE_SIZE:,} entradas, "
+          f"{time.time() - t0:.1f}s)")
@@ -116,3 +116,18 @@ def get_rival_hand(position, action_key, subkey=None):
         combos = list(combinations(deck, 2))
         return random.choice(combos)
     return random.choice(hands)
+
+
+def get_rival_range(position, action_key, subkey=None):
+    """
+    Rango del rival para posición y acción como vector de pesos (1326,) sobre
+    todos los combos (ver range_equity), en lugar de una sola mano muestreada.
+    Acepta combos ('AsAh') y clases ('AKs', 'QQ+'). Sin manos: rango completo.
+    """
+    from range_equity import weights_from_hands
+    bucket = preflop_ranges.get(position, {})
+    if subkey and isinstance(bucket.get(action_key), dict):
+        hands = bucket[action_key].get(subkey, [])
+    else:
+        hands = bucket.get(action_key, [])
+    return weights_from_hands(hands)
@@ -4,6 +4,8 @@ import random
 from collections import Counter
 from itertools import combinations
 
+import numpy as np
+
 ##  export LD_LIBRARY_PATH=$LD_LIBRARY_PATH:$(pwd)/lib/.libs !!!!
 ## IMPORTANTE INCLUIR LA RUTA DE LA LIBRERIA EN LA TERMINAL
 # === Configuración de ruta a la librería desde subcarpeta ===
@@ -21,11 +23,23 @@ rank_inv = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
 
 # === Evaluador nativo (poker-eval via ctypes) — opcional =====================
 _lib = None
+_lib_batch = False   # True si la librería exporta eval_hands_batch (buffer NumPy)
 try:
     os.environ['LD_LIBRARY_PATH'] = os.environ.get('LD_LIBRARY_PATH', '') + ':' + LIBS_DIR
     _lib = ctypes.CDLL(LIB_PATH)
     _lib.eval_hand.argtypes = [ctypes.c_int] * 14
     _lib.eval_hand.restype  = ctypes.c_int
+    try:
+        # void eval_hands_batch(const int8_t *cards, int n, int ncards, int32_t *out)
+        _lib.eval_hands_batch.argtypes = [
+            np.ctypeslib.ndpointer(dtype=np.int8,  ndim=2, flags='C_CONTIGUOUS'),
+            ctypes.c_int, ctypes.c_int,
+            np.ctypeslib.ndpointer(dtype=np.int32, ndim=1, flags='C_CONTIGUOUS'),
+        ]
+        _lib.eval_hands_batch.restype = None
+        _lib_batch = True
+    except AttributeError:
+        _lib_batch = False   # .so compilado antes de añadir la entrada batch
 except OSError:
     _lib = None   # fallback: treys o evaluador puro Python
 
@@ -37,6 +51,15 @@ try:
 except ImportError:
     _treys_eval = None
 
+# === Evaluador por tablas precomputadas (tablas_eval.py, NumPy) ==============
+# Hash perfecto de 5-7 cartas sobre una tabla memory-mapped: ~60x más rápido
+# que _py_eval_hand y sin dependencias nativas. Se antepone a treys y Python.
+_tablas_eval = None
+try:
+    import tablas_eval as _tablas_eval
+except ImportError:
+    _tablas_eval = None
+
 # === Evaluador puro Python (fallback cuando libhand_eval.so no está disponible) =
 
 _RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
@@ -92,12 +115,32 @@ def tuple_to_card(card_tuple):
     return rank_inv[card_tuple[0]] + suit_inv[card_tuple[1]]
 
 
+# Codificación entera 0..51 (rank * 4 + suit), idéntica a card_abstractor._CARD2INT
+_CARD2INT = {r + s: rank_map[r] * 4 + suit_map[s] for r in rank_map for s in suit_map}
+_INT2CARD = {v: k for k, v in _CARD2INT.items()}
+
+
+def cards_to_ints(cards):
+    """Convierte ['Ah', 'Ks', ...] en np.ndarray int8 con la codificación 0..51."""
+    return np.array([_CARD2INT[c] for c in cards], dtype=np.int8)
+
+
+def ints_to_cards(ints):
+    """Inversa de cards_to_ints: enteros 0..51 → ['Ah', 'Ks', ...]."""
+    return [_INT2CARD[int(c)] for c in ints]
+
+
 def eval_hand_from_strings(hand, board):
     """
     Evalúa una mano de póker (2 hole + hasta 5 board) y devuelve su score.
 
-    Prioridad: libhand_eval.so (C) → treys → Python puro.
-    Convención: mayor = mejor mano.
+    Prioridad: libhand_eval.so (C) → tablas_eval (NumPy) → treys → Python puro.
+    Convención: mayor = mejor mano. La escala depende del backend: solo es
+    comparable entre llamadas del mismo proceso.
+
+    Con la entrada batch de la librería C se evalúan exactamente las cartas
+    dadas. Una librería antigua (sólo eval_hand, 7 cartas fijas) rellena las
+    manos de 5-6 cartas con la carta 0 (2s), que puede cambiar su valor.
 
     Parámetros
     ----------
@@ -108,12 +151,19 @@ def eval_hand_from_strings(hand, board):
     -------
     int – puntuación de la mejor mano de 5 (mayor = mejor)
     """
+    if _lib_batch:
+        cards = np.array([[_CARD2INT[c] for c in hand + board]], dtype=np.int8)
+        out = np.empty(1, dtype=np.int32)
+        _lib.eval_hands_batch(cards, 1, cards.shape[1], out)
+        return int(out[0])
     if _lib is not None:
         cards = hand + board
         ints = [val for card in cards for val in card_to_tuple(card)]
         while len(ints) < 14:
             ints.append(0)
         return _lib.eval_hand(*ints[:14])
+    if _tablas_eval is not None and 5 <= len(hand) + len(board) <= 7:
+        return _tablas_eval.eval_cards([_CARD2INT[c] for c in hand + board])
     if _treys_eval is not None and len(board) == 5:
         # treys devuelve 1 (mejor) … 7462 (peor) → negamos para mayor=mejor
         try:
@@ -125,6 +175,49 @@ def eval_hand_from_strings(hand, board):
     return _py_eval_hand(hand, board)
 
 
+def eval_hands_batch(hole, board):
+    """
+    Evalúa N manos de una sola vez sobre la codificación entera 0..51.
+
+    Prioridad: libhand_eval.so (C, entrada batch eval_hands_batch con un único
+    cruce ctypes; o eval_hand fila a fila si la librería es antigua) →
+    tablas_eval (NumPy vectorizado) → evaluador Python fila a fila. Dentro de
+    un proceso la escala coincide con la de eval_hand_from_strings: las dos
+    usan el mismo backend y, con la librería C, el mismo número de cartas
+    (las k + 2 dadas con la entrada batch; 7 con el 2s de relleno de
+    eval_hand en una librería antigua, ver eval_hand_from_strings).
+
+    Parámetros
+    ----------
+    hole  : np.ndarray shape (N, 2)  – hole cards de cada mano
+    board : np.ndarray shape (N, k)  – k = 3..5 cartas comunitarias por mano
+
+    Retorna
+    -------
+    np.ndarray int64 (N,) – puntuación de la mejor mano de 5 (mayor = mejor)
+    """
+    if _lib_batch:
+        # Un único cruce ctypes por batch: buffer int8[N, 7] → int32[N]
+        cards = np.ascontiguousarray(
+            np.concatenate([np.asarray(hole), np.asarray(board)], axis=1), dtype=np.int8)
+        out = np.empty(len(cards), dtype=np.int32)
+        _lib.eval_hands_batch(cards, len(cards), cards.shape[1], out)
+        return out.astype(np.int64)
+    cards = np.concatenate([np.asarray(hole), np.asarray(board)], axis=1).astype(np.int64)
+    if _lib is not None:
+        ranks, suits = (cards >> 2).tolist(), (cards & 3).tolist()
+        out = np.empty(len(cards), dtype=np.int64)
+        for i, (rs, ss) in enumerate(zip(ranks, suits)):
+            ints = [v for pair in zip(rs, ss) for v in pair]
+            ints += [0] * (14 - len(ints))
+            out[i] = _lib.eval_hand(*ints)
+        return out
+    if _tablas_eval is not None:
+        return _tablas_eval.eval_batch(cards).astype(np.int64)
+    return np.array([eval_hand_from_strings(ints_to_cards(row[:2]), ints_to_cards(row[2:]))
+                     for row in cards], dtype=np.int64)
+
+
 def create_deck():
     """Devuelve una baraja completa tipo ['2s', '2h', ..., 'As']."""
     return [r + s for r in rank_map for s in suit_map]
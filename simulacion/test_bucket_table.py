@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tests unitarios para la tabla offline de buckets postflop
+(abstracciones/bucket_table.py)
+
+Verifica:
+  1. Hash perfecto: 1.755 flops canónicos, claves invariantes de palos,
+     índice de combo = orden lexicográfico de preflop_equity
+  2. build_table + postflop_bucket: lectura directa del array, isomorfos en
+     la misma celda y respaldo a la caché LRU fuera de la tabla
+  3. SharedBucketCache: claves empaquetadas, sondeo lleno, otro proceso lee y
+     escribe la misma tabla y postflop_bucket la usa como segundo nivel
+"""
+
+import os
+import sys
+import tempfile
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+if _DIR not in sys.path:
+    sys.path.insert(0, _DIR)
+
+import numpy as np
+import abstracciones.bucket_table as bt
+import abstracciones.card_abstractor as ca
+from abstracciones.suit_isomorphism import canonical_hand_board
+from preflop_equity import _COMBOS
+
+
+# ── Test 1: hash perfecto ─────────────────────────────────────────────────────
+
+def test_perfect_hash():
+    assert len(bt.canonical_board_keys(3)) == 1755
+    assert all(bt._combo_index(a, b) == i for i, (a, b) in enumerate(_COMBOS))
+    assert bt.board_key(['Ah', '7h', '2c']) == bt.board_key(['As', '7s', '2d'])
+    assert bt.board_key(['Ah', '7h', '2c']) != bt.board_key(['Ah', '7c', '2c'])
+    for key in bt.canonical_board_keys(3)[::97]:
+        board = bt._decode_board(key)
+        assert bt.board_key(board) == key
+        assert canonical_hand_board((), board)[1] == board
+    print("PASS test_perfect_hash")
+
+
+# ── Test 2: construcción y consulta ───────────────────────────────────────────
+
+def test_build_and_lookup():
+    saved = bt.TABLE_DIR
+    bt.TABLE_DIR = tempfile.mkdtemp()
+    try:
+        assert not bt.available('flop')
+        bt.unload()
+        n = bt.build_table('flop', workers=1, limit=2, verbose=False)
+        assert n == 2 and bt.available('flop')
+        table = np.load(bt.table_paths('flop')[0])
+        assert table.shape == (2, bt.N_COMBOS) and table.dtype == np.uint8
+
+        board = bt._decode_board(bt.canonical_board_keys(3)[1])     # ('2d', '2h', '3s')
+        for hand in (['As', 'Kd'], ['As', 'Kh'], ['4s', '4h']):
+            hand_c, board_c = canonical_hand_board(hand, board)
+            cell = table[1, bt._combo_index(*sorted(bt._CARD2INT[c] for c in hand_c))]
+            assert cell != bt.EMPTY
+            assert ca.postflop_bucket(hand, list(board)) == cell
+            assert bt.lookup(hand_c, board_c) == cell
+        # (As Kd) y (As Kh) sobre 2d 2h 3s son isomorfos (d ↔ h) → misma celda
+        assert ca.postflop_bucket(['As', 'Kd'], list(board)) == \
+            ca.postflop_bucket(['As', 'Kh'], list(board))
+
+        # Board fuera de la tabla → None y respaldo a la LRU
+        assert bt.lookup(('As', 'Kd'), ('7c', '8h', 'Qs')) is None
+        assert 0 <= ca.postflop_bucket(['As', 'Kd'], ['7c', '8h', 'Qs']) < ca.POSTFLOP_BUCKETS
+    finally:
+        bt.TABLE_DIR = saved
+        ca.clear_postflop_cache()
+    print("PASS test_build_and_lookup")
+
+
+# ── Test 3: caché compartida entre procesos ──────────────────────────────────
+
+def _child_roundtrip(name, queue):
+    from abstracciones.shared_buckets import SharedBucketCache
+    cache = SharedBucketCache(name)
+    got   = cache.get(('Ah', 'Kd'), ('2c', '7h', 'Qs'))
+    cache.put(('As', 'Ks'), ('2c', '7h', 'Qs', 'Td'), 9)
+    ca.enable_shared_bucket_cache(name)
+    ca.postflop_bucket(['Qc', 'Qd'], ['2c', '7h', 'Js'])
+    ca.disable_shared_bucket_cache()
+    cache.close()
+    queue.put((got, cache.owner))
+
+
+def test_shared_bucket_cache():
+    import multiprocessing as mp
+    from abstracciones.shared_buckets import SharedBucketCache, pack_key
+    name = f'test_buckets_{os.getpid()}'
+    assert pack_key(('Ah', 'Kd'), ('2c', '7h', 'Qs')) != pack_key(('Ah', 'Kd'), ('2c', '7h', 'Qs', '2s'))
+    assert pack_key(('2s', '3s'), ()) == 1 | (5 << 6)
+
+    cache = SharedBucketCache(name, slots=1000)
+    try:
+        assert cache.owner and cache.slots == 1024
+        assert cache.get(('Ah', 'Kd'), ('2c', '7h', 'Qs')) is None
+        cache.put(('Ah', 'Kd'), ('2c', '7h', 'Qs'), 13)
+        cache.put(('Ah', 'Kd'), ('2c', '7h', 'Qs'), 13)         # misma posición
+        assert cache.get(('Ah', 'Kd'), ('2c', '7h', 'Qs')) == 13
+        assert cache.stats()['size'] == 1
+
+        ctx   = mp.get_context('spawn')                          # proceso sin herencia
+        queue = ctx.Queue()
+        child = ctx.Process(target=_child_roundtrip, args=(name, queue))
+        child.start()
+        got, child_owner = queue.get(timeout=120)
+        child.join()
+        assert got == 13 and not child_owner
+        assert cache.get(('As', 'Ks'), ('2c', '7h', 'Qs', 'Td')) == 9
+
+        # El bucket que calculó el hijo se sirve aquí sin recalcular
+        ca._postflop_cache.clear()
+        ca.enable_shared_bucket_cache(name)
+        assert not ca._shared_buckets.owner
+        hand_t, board_t = canonical_hand_board(['Qc', 'Qd'], ['2c', '7h', 'Js'])
+        expected = ca._shared_buckets.get(hand_t, board_t)
+        assert expected is not None
+        saved, ca._compute_postflop_bucket = ca._compute_postflop_bucket, None
+        try:
+            assert ca.postflop_bucket(['Qh', 'Qs'], ['2h', '7c', 'Jd']) == expected
+        finally:
+            ca._compute_postflop_bucket = saved
+        assert ca._shared_buckets.stats()['hits'] == 2
+
+        # Sondeo lleno: la entrada no se guarda y cuenta como expulsión
+        cache.clear()
+        full = SharedBucketCache(name + '_full', slots=512)
+        try:
+            for a, b in [(r1 + 's', r2 + 'h') for r1 in ca.RANKS for r2 in ca.RANKS][:169]:
+                for board in (('2c',), ('2c', '3d'), ('2c', '3d', '4d'), ('2c', '3d', '4d', '5d')):
+                    full.put((a, b), board, 1)
+            assert full.evictions > 0 and full.stats()['size'] <= 512
+        finally:
+            full.close()
+    finally:
+        ca.disable_shared_bucket_cache()
+        cache.close()
+        ca.clear_postflop_cache()
+    print("PASS test_shared_bucket_cache")
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    tests = [
+        test_perfect_hash,
+        test_build_and_lookup,
+        test_shared_bucket_cache,
+    ]
+    failed = []
+    for t in tests:
+        try:
+            t()
+        except Exception as e:
+            print(f"FAIL {t.__name__}: {e}")
+            failed.append(t.__name__)
+
+    print(f"\n{'='*50}")
+    print(f"Tests tabla de buckets: {len(tests) - len(failed)}/{len(tests)} PASARON")
+    if failed:
+        print(f"Fallidos: {failed}")
+        sys.exit(1)
+    else:
+        print("Todos los tests pasaron.")
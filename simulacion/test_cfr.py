@@ -10,6 +10,18 @@ Verifica:
   5. Que save() / load() es round-trip exacto
   6. Que exploitability() devuelve un número finito > 0
   7. Que la exploitabilidad desciende al aumentar iteraciones
+  8. train_parallel: la reducción de incrementos no pierde ni duplica
+     actualizaciones (masa de la raíz = 2 × iteraciones) y es reproducible
+     con la misma semilla
+  9. InfosetTable: filas contiguas que crecen, vista tipo dict y carga de
+     blueprints en el formato anterior (dicts de ndarrays)
+ 10. betting_tree: árbol finito, máscaras y transiciones de la raíz,
+     pagos terminales coherentes y subárboles con horizonte cacheados
+ 11. CFR vectorial: sumas con eliminación de cartas, mismas tablas que con
+     matrices densas de pares de manos y train(mode='vector')
+ 12. Variantes de CFR: pesos por iteración, regrets ≥ 0 con cfr+ (External
+     Sampling, vectorial y paralelo), descuento de DCFR, avg_delay y la
+     variante guardada con el blueprint
 """
 
 import os
@@ -20,9 +32,14 @@ _DIR = os.path.dirname(os.path.abspath(__file__))
 if _DIR not in sys.path:
     sys.path.insert(0, _DIR)
 
+import pickle
+
 import numpy as np
-from cfr.mccfr_trainer import MCCFRTrainer, _deal, _fast_key
-from abstracciones.infoset_encoder import NUM_ACTIONS, FOLD, ACTION_IDX
+from cfr import betting_tree as bt
+from cfr.infoset_table import InfosetTable
+from cfr.vector_cfr import VectorCFR, hand_buckets, hand_range
+from cfr.mccfr_trainer import VARIANTS, MCCFRTrainer, _deal, _fast_key, _apply_delta, _merge_deltas
+from abstracciones.infoset_encoder import NUM_ACTIONS, FOLD, CALL, ALLIN, ACTION_IDX
 
 
 def _train_small(iters=200, sims=20) -> MCCFRTrainer:
@@ -158,6 +175,281 @@ def test_exploitability_decreases():
     print("PASS test_exploitability_decreases")
 
 
+# ── Test 8: entrenamiento en paralelo ─────────────────────────────────────────
+
+def test_train_parallel():
+    a, b = {'x': np.ones(3)}, {'x': np.full(3, 2.0), 'y': np.ones(3)}
+    merged = _merge_deltas([a, b])
+    assert np.allclose(merged['x'], 3.0) and np.allclose(merged['y'], 1.0)
+    table = {'x': np.zeros(3)}
+    _apply_delta(table, merged)
+    _apply_delta(table, b, sign=-1.0)
+    assert np.allclose(table['x'], 1.0) and np.allclose(table['y'], 0.0)
+    assert np.allclose(a['x'], 1.0)                     # los incrementos no se alteran
+
+    t = _train_small(iters=60)
+    t.train_parallel(num_iterations=150, workers=2, sync_every=20,
+                     log_every=1000, save_every=0, seed=0)
+    assert t.iterations == 210
+    # La raíz (SB preflop sin acciones) se visita en los dos traversals de
+    # cada iteración y acumula una estrategia de masa 1 cada vez
+    root = sum(v.sum() for k, v in t.strategy_sum.items()
+               if k[0] == 0 and k[1] == 0 and k[3] == ())
+    assert abs(root - 2 * 210) < 1e-3, root          # float32
+    for key in list(t.strategy_sum)[:50]:
+        assert abs(t.get_strategy(key).sum() - 1.0) < 1e-9
+
+    # Misma semilla → mismas tablas (también el muestreo de buckets)
+    runs = []
+    for _ in range(2):
+        r = MCCFRTrainer()
+        r.train_parallel(num_iterations=40, workers=2, sync_every=10,
+                         log_every=1000, save_every=0, seed=123)
+        runs.append(r.table)
+    assert list(runs[0].index) == list(runs[1].index)
+    np.testing.assert_array_equal(runs[0].regrets, runs[1].regrets)
+    np.testing.assert_array_equal(runs[0].strategy, runs[1].strategy)
+    print(f"PASS test_train_parallel  ({len(t.regret_sum)} InfoSets)")
+
+
+# ── Test 9: InfosetTable ──────────────────────────────────────────────────────
+
+def test_infoset_table():
+    table = InfosetTable(NUM_ACTIONS, capacity=2)
+    for i in range(5):                                   # crece 2 → 4 → 8
+        table.regret_row(('k', i))[:] += i
+    table.strategy_row(('k', 4))[:] += 0.5
+    assert len(table) == 5 and table.regrets.shape == (5, NUM_ACTIONS)
+    assert table.regrets.dtype == np.float32 and table.nbytes() == 2 * 8 * NUM_ACTIONS * 4
+    assert np.all(table.regrets[:, 0] == np.arange(5))
+    assert ('k', 3) in table.regret_sum and table.regret_sum.get(('x',)) is None
+    assert np.all(table.strategy_sum[('k', 4)] == 0.5) and np.all(table.strategy_sum[('k', 0)] == 0)
+    assert dict(table.regret_sum.items()).keys() == table.index.keys()
+
+    t = _train_small(iters=100)
+    legacy = {
+        'regret_sum':   {k: v.astype(np.float64) for k, v in t.regret_sum.items()},
+        'strategy_sum': {k: v.astype(np.float64) for k, v in t.strategy_sum.items()},
+        'iterations':   t.iterations,
+    }
+    with tempfile.NamedTemporaryFile(suffix='.pkl', delete=False) as f:
+        pickle.dump(legacy, f, protocol=4)
+        path = f.name
+    try:
+        t2 = MCCFRTrainer.load(path)
+        assert t2.iterations == 100 and len(t2.regret_sum) == len(t.regret_sum)
+        np.testing.assert_array_equal(t2.table.regrets, t.table.regrets)
+        np.testing.assert_array_equal(t2.table.strategy, t.table.strategy)
+        key = next(iter(t.strategy_sum))
+        np.testing.assert_allclose(t2.get_strategy(key), t.get_strategy(key))
+        t2.train(num_iterations=20, log_every=1000, save_every=0)   # sigue entrenando
+        assert t2.iterations == 120
+    finally:
+        os.unlink(path)
+    print(f"PASS test_infoset_table  ({len(t.regret_sum)} InfoSets)")
+
+
+# ── Test 10: árbol de apuestas compilado ──────────────────────────────────────
+
+def test_betting_tree():
+    tree = bt.blueprint_tree()
+    assert tree is MCCFRTrainer().tree and tree is bt.blueprint_tree()
+    assert (tree.n_nodes, tree.n_terminals) == (360_208, 521_291)
+
+    # Raíz: SB con 0.5 por pagar; máscaras = legal_mask del estado de cada nodo
+    assert (tree.player[0], tree.street[0], tree.hist[0]) == (0, 0, ())
+    assert tree.pot[0] == 1.5 and tree.to_call[0] == 0.5
+    rng = np.random.default_rng(0)
+    for n in [0] + rng.integers(0, tree.n_nodes, 2000).tolist():
+        n_raises = sum(a != CALL for a in tree.hist[n])
+        np.testing.assert_array_equal(
+            tree.mask[n], MCCFRTrainer._mask(tree.to_call[n], tree.stacks[n, tree.player[n]], n_raises))
+        assert tree.legal[n] == tuple(np.flatnonzero(tree.mask[n]))
+    allin = tree.mask[:, ACTION_IDX[ALLIN]]
+    acting = tree.stacks[np.arange(tree.n_nodes), tree.player]
+    assert not allin[acting == 0.0].any()              # sin all-ins de 0 fichas
+
+    # Limp del SB → opción del BB → check → flop con el BB primero
+    limp = int(tree.child[0, ACTION_IDX[CALL]])
+    assert (tree.player[limp], tree.hist[limp], tree.to_call[limp], tree.pot[limp]) == \
+        (1, (CALL,), 0.0, 2.0)
+    flop = int(tree.child[limp, ACTION_IDX[CALL]])
+    assert (tree.player[flop], tree.street[flop], tree.hist[flop], tree.pot[flop]) == (1, 1, (), 2.0)
+
+    # Terminales: fold del SB pierde su ciega; el bote = 1.5 + lo invertido desde la raíz
+    t = ~int(tree.child[0, ACTION_IDX[FOLD]])
+    assert tree.term_kind[t] == bt.FOLDED and tree.term_player[t] == 0
+    assert tree.term_contrib[t, 0] == 0.5 and tree.term_invested[t, 0] == 0.0
+    np.testing.assert_allclose(tree.term_pot, 1.5 + tree.term_invested.sum(axis=1))
+    sd = tree.term_kind == bt.SHOWDOWN
+    assert set(tree.term_kind) == {bt.FOLDED, bt.SHOWDOWN} and (tree.term_street[sd] == 3).all()
+
+    # Subárbol del search: horizonte con hojas LEAF y caché por estado
+    args = (1, 4.5, [97.5, 95.5], [0.0, 0.0], [], 0, 0.0, 1, 0)
+    sub  = bt.subgame_tree(*args)
+    leaf = sub.term_kind == bt.LEAF
+    assert leaf.any() and (sub.term_street[leaf] == 2).all() and not (sub.term_kind == bt.SHOWDOWN).any()
+    assert set(sub.street) == {1} and bt.subgame_tree(*args) is sub
+    print(f"PASS test_betting_tree  ({tree.n_nodes:,} nodos, {tree.n_terminals:,} terminales, "
+          f"{tree.nbytes() / 1e6:.0f} MB)")
+
+
+# ── Test 11: CFR vectorial ────────────────────────────────────────────────────
+
+def _compatible(cards):
+    """(H, H) True si las dos manos no comparten carta."""
+    return ~(cards[:, None, :, None] == cards[None, :, None, :]).any(axis=(2, 3))
+
+
+class _DenseVectorCFR(VectorCFR):
+    """Referencia: terminales con matrices (H, H) de pares de manos compatibles."""
+
+    def _value(self, traverser, child, reach_i, reach_o):
+        if child >= 0:
+            return self._walk(traverser, child, reach_i, reach_o)
+        tree, t = self.tree, ~child
+        compat  = self._compat
+        pot     = tree.term_pot[t]
+        if tree.term_kind[t] == bt.FOLDED:
+            folder = tree.term_player[t]
+            payoff = pot if traverser != folder else -tree.term_contrib[t, folder]
+            return payoff * (compat @ reach_o)
+        b    = self._bkts[3]
+        diff = (b[:, None] - b[None, :]) / 15.0
+        eq   = np.where(diff > 0, 0.5 + 0.5 * diff, np.where(diff < 0, 0.5 - 0.5 * -diff, 0.5))
+        return ((eq * pot - tree.term_contrib[t, traverser]) * compat) @ reach_o
+
+
+def test_vector_cfr():
+    board = ['2c', '7h', 'Qs', 'Td', '3s']
+    hands, cards = hand_range(board)
+    assert len(hands) == 1081 and cards.shape == (1081, 2)
+    bkts = hand_buckets(board, hands, sims=20)
+
+    # Σ sobre manos rivales disjuntas = producto por la matriz de compatibilidad
+    x   = np.random.default_rng(0).random(len(hands))
+    vec = VectorCFR(MCCFRTrainer(), tree=bt.compile_tree(3, 10.0, (20.0, 20.0), (0.0, 0.0),
+                                                        (), 0, 0.0, 1))
+    vec._c1, vec._c2 = cards[:, 0], cards[:, 1]
+    compat = _compatible(cards)
+    assert compat.sum(axis=1).min() == compat.sum(axis=1).max() == 990
+    np.testing.assert_allclose(vec._opp_sum(x), compat @ x)
+
+    # Mismas tablas que la referencia densa tras varias iteraciones
+    ref = _DenseVectorCFR(MCCFRTrainer(), tree=vec.tree)
+    ref._compat = compat
+    for _ in range(3):
+        v1 = vec.iteration(board=board, bkts=bkts)
+        v2 = ref.iteration(board=board, bkts=bkts)
+        np.testing.assert_allclose(v1, v2, rtol=1e-9)
+    assert list(vec.trainer.table.index) == list(ref.trainer.table.index)
+    np.testing.assert_allclose(vec.trainer.table.regrets, ref.trainer.table.regrets, rtol=1e-4, atol=1e-9)
+    np.testing.assert_allclose(vec.trainer.table.strategy, ref.trainer.table.strategy, rtol=1e-4)
+
+    # train(mode='vector'): el mejor bucket de river no foldea ante un all-in
+    # (CALL y ALLIN son equivalentes: los dos ponen el stack entero)
+    t = MCCFRTrainer()
+    t._vector = VectorCFR(t, tree=vec.tree)
+    import cfr.vector_cfr as vcfr
+    board_fn, vcfr._deal_board = vcfr._deal_board, lambda: list(board)
+    try:
+        t.train(num_iterations=30, log_every=1000, save_every=0, mode='vector')
+    finally:
+        vcfr._deal_board = board_fn
+    assert t.iterations == 30
+    top = t.get_strategy((0, 3, int(bkts[3].max()), (ALLIN,)))
+    assert top[ACTION_IDX[FOLD]] < 0.05, top
+    try:
+        t.train(num_iterations=1, mode='chance')
+        raise AssertionError("mode inválido aceptado")
+    except ValueError:
+        pass
+    print(f"PASS test_vector_cfr  ({len(t.regret_sum)} InfoSets, P(fold | top, all-in) = "
+          f"{top[ACTION_IDX[FOLD]]:.3f})")
+
+
+# ── Test 12: variantes de CFR ─────────────────────────────────────────────────
+
+def _root_mass(t):
+    return sum(v.sum() for k, v in t.strategy_sum.items()
+               if k[0] == 0 and k[1] == 0 and k[3] == ())
+
+
+def test_cfr_variants():
+    # Pesos de la iteración t = iterations + 1
+    t = MCCFRTrainer('linear')
+    t.iterations = 4
+    t._begin_iteration()
+    assert (t._w_regret, t._w_strategy) == (5.0, 5.0)
+    t.set_variant('cfr+', avg_delay=3)
+    assert (t._w_regret, t._w_strategy) == (1.0, 2.0)
+    t.iterations = 1
+    t._begin_iteration()
+    assert t._w_strategy == 0.0
+    try:
+        MCCFRTrainer('cfr++')
+        raise AssertionError("variante inválida aceptada")
+    except ValueError:
+        pass
+
+    # Descuento de DCFR (α = 1.5, β = 0, γ = 2)
+    t = MCCFRTrainer('dcfr')
+    t.table.regret_row('a')[:] = [4.0, -4.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+    t.table.strategy_row('a')[:] = 8.0
+    t._discount(3)
+    ta = 3 ** 1.5
+    np.testing.assert_allclose(t.regret_sum['a'][:2], [4.0 * ta / (ta + 1.0), -2.0], rtol=1e-6)
+    np.testing.assert_allclose(t.strategy_sum['a'], 8.0 * (3 / 4) ** 2, rtol=1e-6)
+
+    # cfr+: ningún regret negativo en External Sampling ni en paralelo
+    t = MCCFRTrainer('cfr+')
+    t.train(num_iterations=60, log_every=1000, bucket_sims=20, save_every=0)
+    assert t.table.regrets.min() >= 0.0
+    t.train_parallel(num_iterations=40, workers=2, sync_every=10,
+                     log_every=1000, save_every=0, seed=0)
+    assert t.iterations == 100 and t.table.regrets.min() >= 0.0
+
+    # ... ni en el CFR vectorial
+    board = ['2c', '7h', 'Qs', 'Td', '3s']
+    hands, _ = hand_range(board)
+    t = MCCFRTrainer('cfr+')
+    vec = VectorCFR(t, tree=bt.compile_tree(3, 10.0, (20.0, 20.0), (0.0, 0.0), (), 0, 0.0, 1))
+    bkts = hand_buckets(board, hands, sims=20)
+    for _ in range(2):
+        t._begin_iteration()
+        vec.iteration(board=board, bkts=bkts)
+        t.iterations += 1
+    assert len(t.regret_sum) > 0 and t.table.regrets.min() >= 0.0
+
+    # avg_delay: la media empieza en t = avg_delay + 1 con peso t − avg_delay
+    t = MCCFRTrainer('linear', avg_delay=20)
+    t.train(num_iterations=20, log_every=1000, bucket_sims=20, save_every=0)
+    assert len(t.strategy_sum) > 0 and not t.table.strategy.any()
+    t.train(num_iterations=2, log_every=1000, bucket_sims=20, save_every=0)
+    assert abs(_root_mass(t) - 2 * (1 + 2)) < 1e-4, _root_mass(t)
+
+    # La variante viaja con el blueprint
+    with tempfile.NamedTemporaryFile(suffix='.pkl', delete=False) as f:
+        path = f.name
+    try:
+        t.save(path)
+        t2 = MCCFRTrainer.load(path)
+        assert t2.variant_config() == t.variant_config()
+        assert (t2._w_regret, t2._w_strategy) == (23.0, 3.0)     # t = 23, avg_delay = 20
+    finally:
+        os.unlink(path)
+    assert MCCFRTrainer().variant == VARIANTS[0] == 'vanilla'
+
+    # train_on (aprendizaje online de web/app.py): mismos pesos que train()
+    t = MCCFRTrainer('linear')
+    h0, h1, flop, turn, river = _deal()
+    bkts = t._precompute_buckets([h0, h1], [flop, turn, river], sims=20)
+    t.train_on(bkts)
+    t.train_on(bkts)
+    assert t.iterations == 2 and abs(_root_mass(t) - 2 * (1 + 2)) < 1e-4, _root_mass(t)
+    print("PASS test_cfr_variants")
+
+
 # ── Runner ────────────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
@@ -169,6 +461,11 @@ if __name__ == "__main__":
         test_save_load,
         test_exploitability_finite,
         test_exploitability_decreases,
+        test_train_parallel,
+        test_infoset_table,
+        test_betting_tree,
+        test_vector_cfr,
+        test_cfr_variants,
     ]
     failed = []
     for t in tests:
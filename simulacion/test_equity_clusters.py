@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Tests unitarios para la abstracción postflop de abstracciones/card_abstractor.py
+(clustering EMD, muestreo, buckets por lotes, EHS exacto en river)
+
+Verifica:
+  1. Histograma de equity: suma 1, delta exacta en river
+  2. k-means EMD separa grupos evidentes y ordena clusters por equity
+  3. build_equity_clusters (pool) guarda centroides e índice; postflop_bucket
+     los usa (índice de asignaciones y centroide más cercano)
+  4. Muestreo vectorizado de compute_ehs / compute_ehs2: cartas distintas,
+     reproducible con rng explícito y generador distinto en cada hijo (fork)
+  5. postflop_bucket_batch: -1 en choques con el board, isomorfos una vez,
+     EHS² por lotes ≈ EHS² escalar y, con clusters, river idéntico al escalar
+  6. EHS en river exacto (990 rivales enumerados), determinista y en lote
+"""
+
+import os
+import sys
+import tempfile
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+if _DIR not in sys.path:
+    sys.path.insert(0, _DIR)
+
+import numpy as np
+import abstracciones.card_abstractor as ca
+from abstracciones.suit_isomorphism import canonical_hand_board
+from montecarlo import exact_equity
+
+
+# ── Test 1: histogramas ───────────────────────────────────────────────────────
+
+def test_equity_histogram():
+    rng = np.random.default_rng(0)
+    hole, board = ['Ah', 'Kd'], ['2c', '7h', 'Qs', 'Td', '3s']
+    h = ca._equity_histogram(ca._cards_to_ints(hole), ca._cards_to_ints(board), 20, rng)
+    assert h.shape == (20,) and abs(h.sum() - 1.0) < 1e-12
+    assert int(np.argmax(h)) == min(int(exact_equity(hole, board) * 20), 19)
+    h = ca._equity_histogram(ca._cards_to_ints(['7c', '2d']),
+                             ca._cards_to_ints(['Ks', 'Qs', 'Js']), 10, rng)
+    assert abs(h.sum() - 1.0) < 1e-12 and h[:5].sum() > 0.7
+    print("PASS test_equity_histogram")
+
+
+# ── Test 2: k-means EMD ───────────────────────────────────────────────────────
+
+def test_kmeans_emd():
+    rng   = np.random.default_rng(1)
+    hists = np.zeros((90, 10))
+    hists[:30, 8] = 1.0                           # fuertes
+    hists[30:60, 1] = 1.0                         # débiles
+    hists[60:, [1, 8]] = 0.5                      # proyectos polarizados
+    cents, labels = ca._kmeans_emd(hists, 3, rng)
+    assert set(labels[:30]) == {2} and set(labels[30:60]) == {0} and set(labels[60:]) == {1}
+    assert np.allclose(cents[2], hists[0]) and np.allclose(cents.sum(axis=1), 1.0)
+    print("PASS test_kmeans_emd")
+
+
+# ── Test 3: build + postflop_bucket ───────────────────────────────────────────
+
+def test_build_and_lookup():
+    path = os.path.join(tempfile.mkdtemp(), 'equity_clusters.pkl')
+    try:
+        clusters = ca.build_equity_clusters(n_samples=300, bins=10, k=4, workers=2,
+                                            path=path, seed=3, chunk=50, verbose=False)
+        assert os.path.exists(path)
+        assert set(clusters['centroids']) == {3, 4, 5}
+        assert all(c.shape == (4, 10) for c in clusters['centroids'].values())
+        assert len(clusters['index']) > 250
+        assert set(clusters['index'].values()) <= set(range(4))
+
+        # Entrada del índice: se resuelve sin simular (isomorfos incluidos)
+        (hand, board), bucket = next(iter(clusters['index'].items()))
+        assert ca.postflop_bucket(list(hand), list(board)) == bucket
+        remap = {'s': 'h', 'h': 's', 'd': 'c', 'c': 'd'}
+        swap  = lambda cards: [c[0] + remap[c[1]] for c in cards]
+        assert ca.postflop_bucket(swap(hand), swap(board)) == bucket
+
+        # Fuera del índice: centroide más cercano
+        hand, board = ['Ah', 'Ad'], ['Ac', '7h', '2s', '9d', '4c']
+        assert canonical_hand_board(hand, board) not in clusters['index']
+        assert ca.postflop_bucket(hand, board) == 3
+        assert ca.postflop_bucket(['3c', '2d'], ['Ks', 'Qs', 'Js', '8h', '9h']) == 0
+    finally:
+        ca._clusters = None                       # volver al fichero por defecto
+        ca.clear_postflop_cache()
+    print("PASS test_build_and_lookup")
+
+
+# ── Test 4: muestreo sin reemplazo ────────────────────────────────────────────
+
+def _child_draw(_):
+    return float(ca._rng.random())
+
+
+def test_vectorized_sampling():
+    from multiprocessing import Pool
+    avail = np.setdiff1d(np.arange(52, dtype=np.int8), ca._cards_to_ints(['Ah', 'Kd', '2c']))
+    s = ca._sample_cards(avail, 5000, 6, np.random.default_rng(0))
+    assert s.shape == (5000, 6) and s.dtype == np.int8
+    assert np.isin(s, avail).all()
+    assert (np.sort(s, axis=1)[:, 1:] != np.sort(s, axis=1)[:, :-1]).all()
+    freq = np.bincount(s[:, 0], minlength=52)[avail]          # primera posición uniforme
+    assert freq.min() > 60 and freq.max() < 160
+
+    hole, board = ['Ah', 'Kd'], ['2c', '7h', 'Qs']
+    assert ca.compute_ehs2(hole, board, 200, np.random.default_rng(7)) == \
+        ca.compute_ehs2(hole, board, 200, np.random.default_rng(7))
+    assert abs(ca.compute_ehs(hole, board, 4000) - exact_equity(hole, board)) < 0.03
+
+    with Pool(2) as pool:
+        draws = pool.map(_child_draw, range(2), chunksize=1)
+    assert len(set(draws + [_child_draw(0)])) == 3
+    print("PASS test_vectorized_sampling")
+
+
+# ── Test 5: buckets por lotes ─────────────────────────────────────────────────
+
+def test_postflop_bucket_batch():
+    board = ['2c', '7h', 'Qs']
+    ca.clear_postflop_cache()
+    out = ca.postflop_bucket_batch(board)
+    assert out.shape == (1326,) and (out == -1).sum() == 1326 - 1176
+    assert ((out[out >= 0] >= 0) & (out[out >= 0] < ca.POSTFLOP_BUCKETS)).all()
+    assert len(ca._postflop_cache) == 1176                 # rainbow: sin simetrías
+    again = ca.postflop_bucket_batch(board, [['Ah', 'Kd'], ['2c', '3d']])
+    assert again[0] == ca.postflop_bucket(['Ah', 'Kd'], board) and again[1] == -1
+
+    ca.clear_postflop_cache()
+    mono = ['2h', '7h', 'Qh']                              # s, d, c intercambiables
+    ca.postflop_bucket_batch(mono, [['As', 'Kd'], ['Ad', 'Kc'], ['Ac', 'Ks']])
+    assert len(ca._postflop_cache) == 1
+
+    hands = [h for h in ca._ALL_HANDS if not set(h) & set(board)][::9]
+    holes = np.array([ca._cards_to_ints(h) for h in hands], dtype=np.int8)
+    batch = ca.compute_ehs2_batch(holes, ca._cards_to_ints(board), 3000, np.random.default_rng(2))
+    single = np.array([ca.compute_ehs2(h, board, 3000, np.random.default_rng(3)) for h in hands])
+    assert np.abs(batch - single).mean() < 0.015
+
+    path = os.path.join(tempfile.mkdtemp(), 'equity_clusters.pkl')
+    try:
+        ca.build_equity_clusters(n_samples=90, bins=10, k=4, workers=1, path=path,
+                                 seed=4, verbose=False)
+        river = ['2c', '7h', 'Qs', 'Td', '3s']
+        hands = [['Ah', 'Kd'], ['7c', '7d'], ['4s', '5s'], ['Qh', 'Jh'], ['Ts', 'Tc']]
+        ca._postflop_cache.clear()
+        batch = ca.postflop_bucket_batch(river, hands).tolist()
+        ca._postflop_cache.clear()
+        assert batch == [ca.postflop_bucket(h, river) for h in hands]
+    finally:
+        ca._clusters = None
+        ca.clear_postflop_cache()
+    print("PASS test_postflop_bucket_batch")
+
+
+# ── Test 6: EHS exacto en river ───────────────────────────────────────────────
+
+def test_exact_river_ehs():
+    from itertools import combinations
+    hole, board = ['Ah', 'Kd'], ['2c', '7h', 'Qs', 'Td', '3s']
+    known = set(hole + board)
+    deck  = [r + s for r in ca.RANKS for s in ca.SUITS if r + s not in known]
+    opps  = np.array([ca._cards_to_ints(list(o)) for o in combinations(deck, 2)], dtype=np.int8)
+    assert len(opps) == 990
+    b_i    = np.broadcast_to(ca._cards_to_ints(board), (990, 5))
+    mine   = ca._best_hand_batch(np.broadcast_to(ca._cards_to_ints(hole), (990, 2)), b_i)
+    theirs = ca._best_hand_batch(opps, b_i)
+    manual = float(((mine > theirs) + 0.5 * (mine == theirs)).mean())
+
+    assert ca.compute_ehs(hole, board, 50) == manual == ca.compute_ehs(hole, board, 5000)
+    assert ca.compute_ehs2(hole, board, 10) == manual
+    holes = np.array([ca._cards_to_ints(h) for h in (hole, ['7c', '7d'], ['Js', '9s'])], dtype=np.int8)
+    batch = ca.compute_ehs_batch(holes, ca._cards_to_ints(board))
+    assert batch[0] == manual
+    assert batch[1] == ca.compute_ehs(['7c', '7d'], board) and batch[2] == ca.compute_ehs(['Js', '9s'], board)
+    print("PASS test_exact_river_ehs")
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    tests = [
+        test_equity_histogram,
+        test_kmeans_emd,
+        test_build_and_lookup,
+        test_vectorized_sampling,
+        test_postflop_bucket_batch,
+        test_exact_river_ehs,
+    ]
+    failed = []
+    for t in tests:
+        try:
+            t()
+        except Exception as e:
+            print(f"FAIL {t.__name__}: {e}")
+            failed.append(t.__name__)
+
+    print(f"\n{'='*50}")
+    print(f"Tests clustering EMD: {len(tests) - len(failed)}/{len(tests)} PASARON")
+    if failed:
+        print(f"Fallidos: {failed}")
+        sys.exit(1)
+    else:
+        print("Todos los tests pasaron.")
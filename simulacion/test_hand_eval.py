@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Tests unitarios para el evaluador de manos (template.py + tablas_eval.py)
+
+Verifica:
+  1. Orden correcto entre categorías (carta alta … escalera real)
+  2. La rueda A-2-3-4-5 pierde contra la escalera al 6
+  3. Kickers y mejores 5 de 7 cartas
+  4. eval_batch coincide con eval_cards fila a fila
+  5. eval_hand_from_strings usa el backend de tablas sin libhand_eval.so
+  6. eval_hands_batch coincide con eval_hand_from_strings (board de 3 a 5)
+  7. El evaluador directo de card_abstractor coincide con las 21 combinaciones
+  8. Con la librería C (simulada) las dos funciones evalúan el mismo número
+     de cartas: las dadas con la entrada batch, 7 con el 2s de relleno sin ella
+"""
+
+import os
+import sys
+import random
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+if _DIR not in sys.path:
+    sys.path.insert(0, _DIR)
+
+import numpy as np
+import template
+from template import (
+    _CARD2INT, cards_to_ints, create_deck, eval_hand_from_strings, eval_hands_batch,
+)
+from tablas_eval import eval_cards, eval_batch
+
+
+def _ev(cards):
+    return eval_cards([_CARD2INT[c] for c in cards])
+
+
+# ── Test 1: orden de categorías ───────────────────────────────────────────────
+
+def test_category_order():
+    hands = [
+        ['7s', '5h', '4d', '3c', '2s'],          # carta alta (peor mano)
+        ['As', 'Kh', 'Qd', 'Jc', '9s'],          # carta alta A
+        ['2s', '2h', '4d', '3c', '6s'],          # pareja
+        ['2s', '2h', '3d', '3c', '5s'],          # dobles parejas
+        ['2s', '2h', '2d', '3c', '5s'],          # trío
+        ['As', '2h', '3d', '4c', '5s'],          # escalera (rueda)
+        ['2h', '4h', '6h', '8h', 'Th'],          # color
+        ['2s', '2h', '2d', '3c', '3s'],          # full
+        ['2s', '2h', '2d', '2c', '3s'],          # póker
+        ['Ah', 'Kh', 'Qh', 'Jh', 'Th'],          # escalera real
+    ]
+    vals = [_ev(h) for h in hands]
+    assert vals == sorted(vals) and len(set(vals)) == len(vals), vals
+    assert vals[0] == 1 and vals[-1] == 7462, vals
+    print("PASS test_category_order")
+
+
+# ── Test 2: rueda ─────────────────────────────────────────────────────────────
+
+def test_wheel_is_lowest_straight():
+    wheel = _ev(['As', '2h', '3d', '4c', '5s'])
+    six   = _ev(['2h', '3d', '4c', '5s', '6s'])
+    assert wheel < six, f"rueda={wheel} escalera al 6={six}"
+    print("PASS test_wheel_is_lowest_straight")
+
+
+# ── Test 3: kickers y mejores 5 de 7 ──────────────────────────────────────────
+
+def test_kickers_and_best_five():
+    # Pareja de 6 con kickers bajos > pareja de 5 con kickers altos
+    assert _ev(['6s', '6h', '4d', '3c', '2s']) > _ev(['5s', '5h', 'Ad', 'Kc', 'Qs'])
+    # Mismo full del board: empate aunque las hole cards difieran
+    board = ['Ks', 'Kh', 'Kd', '7c', '7s']
+    assert _ev(['2c', '3d'] + board) == _ev(['4c', '5d'] + board)
+    # Escalera de color en 7 cartas con color más alto disponible
+    sf = _ev(['9h', '8h', '7h', '6h', '5h', 'Ah', '2c'])
+    assert sf > _ev(['Ah', 'Kh', 'Qh', 'Jh', '9h', '2c', '3d'])
+    print("PASS test_kickers_and_best_five")
+
+
+# ── Test 4: batch = escalar ───────────────────────────────────────────────────
+
+def test_batch_matches_scalar():
+    rng = random.Random(7)
+    for n in (5, 6, 7):
+        hands = [rng.sample(range(52), n) for _ in range(500)]
+        batch = eval_batch(np.array(hands))
+        assert [int(v) for v in batch] == [eval_cards(h) for h in hands], n
+    print("PASS test_batch_matches_scalar")
+
+
+# ── Test 5: integración con template ──────────────────────────────────────────
+
+def test_eval_hand_from_strings_table_backend():
+    if template._lib is not None:
+        print("SKIP test_eval_hand_from_strings_table_backend (libhand_eval.so)")
+        return
+    deck = create_deck()
+    for _ in range(200):
+        cards = random.sample(deck, 7)
+        assert eval_hand_from_strings(cards[:2], cards[2:]) == _ev(cards)
+    print("PASS test_eval_hand_from_strings_table_backend")
+
+
+# ── Test 6: eval_hands_batch ──────────────────────────────────────────────────
+
+def test_eval_hands_batch():
+    deck = create_deck()
+    for n_board in (3, 4, 5):
+        deals = [random.sample(deck, 2 + n_board) for _ in range(300)]
+        hole  = np.stack([cards_to_ints(d[:2]) for d in deals])
+        board = np.stack([cards_to_ints(d[2:]) for d in deals])
+        got   = eval_hands_batch(hole, board)
+        assert got.shape == (300,)
+        assert got.tolist() == [eval_hand_from_strings(d[:2], d[2:]) for d in deals], n_board
+    print("PASS test_eval_hands_batch")
+
+
+# ── Test 7: evaluador directo de card_abstractor ──────────────────────────────
+
+def test_direct_eval_matches_combos():
+    from abstracciones.card_abstractor import _best_hand_batch, _best_hand_batch_combos
+    rng = np.random.default_rng(11)
+    for n in (5, 6, 7):
+        cards = np.argsort(rng.random((20000, 52)), axis=1)[:, :n].astype(np.int8)
+        got   = _best_hand_batch(cards[:, :2], cards[:, 2:])
+        ref   = _best_hand_batch_combos(cards[:, :2], cards[:, 2:])
+        assert np.array_equal(got, ref), n
+    # Rueda + trío: el orden heredado de _eval5_batch se conserva
+    wheel_trips = cards_to_ints(['As', 'Ah', 'Ad', '2c', '3s', '4h', '5d'])[None, :]
+    assert _best_hand_batch(wheel_trips[:, :2], wheel_trips[:, 2:]) == \
+        _best_hand_batch_combos(wheel_trips[:, :2], wheel_trips[:, 2:])
+    print("PASS test_direct_eval_matches_combos")
+
+
+# ── Test 8: librería C (simulada) ─────────────────────────────────────────────
+
+class _FakeLib:
+    """libhand_eval.so simulada sobre tablas_eval: eval_hand evalúa las 7
+    cartas de sus 14 argumentos (el relleno 0, 0 es el 2s) y
+    eval_hands_batch las ncards de cada fila."""
+
+    def eval_hand(self, *ints):
+        return eval_cards(sorted({r * 4 + s for r, s in zip(ints[::2], ints[1::2])}))
+
+    def eval_hands_batch(self, cards, n, ncards, out):
+        out[:] = [eval_cards(row[:ncards].tolist()) for row in cards[:n]]
+
+
+def test_c_backend_card_count():
+    lib, lib_batch = template._lib, template._lib_batch
+    deck = create_deck()
+    wheel = (['Ah', '3d'], ['4c', '5h', 'Kd'])          # con el 2s sería escalera
+    try:
+        template._lib = _FakeLib()
+        for batch in (True, False):
+            template._lib_batch = batch
+            for n_board in (3, 4, 5):
+                deals = [random.sample(deck, 2 + n_board) for _ in range(100)]
+                hole  = np.stack([cards_to_ints(d[:2]) for d in deals])
+                board = np.stack([cards_to_ints(d[2:]) for d in deals])
+                assert eval_hands_batch(hole, board).tolist() == \
+                    [eval_hand_from_strings(d[:2], d[2:]) for d in deals], (batch, n_board)
+            got = eval_hand_from_strings(*wheel)
+            assert got == _ev(wheel[0] + wheel[1] + ([] if batch else ['2s'])), batch
+    finally:
+        template._lib, template._lib_batch = lib, lib_batch
+    print("PASS test_c_backend_card_count")
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    tests = [
+        test_category_order,
+        test_wheel_is_lowest_straight,
+        test_kickers_and_best_five,
+        test_batch_matches_scalar,
+        test_eval_hand_from_strings_table_backend,
+        test_eval_hands_batch,
+        test_direct_eval_matches_combos,
+        test_c_backend_card_count,
+    ]
+    failed = []
+    for t in tests:
+        try:
+            t()
+        except Exception as e:
+            print(f"FAIL {t.__name__}: {e}")
+            failed.append(t.__name__)
+
+    print(f"\n{'='*50}")
+    print(f"Tests evaluador: {len(tests) - len(failed)}/{len(tests)} PASARON")
+    if failed:
+        print(f"Fallidos: {failed}")
+        sys.exit(1)
+    else:
+        print("Todos los tests pasaron.")
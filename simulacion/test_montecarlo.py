@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Tests unitarios para el cálculo de equity (montecarlo.py)
+
+Verifica:
+  1. exact_equity en river coincide con la enumeración manual de las 990 manos
+  2. exact_equity en turn: nuts imbatibles = 1.0 y rango [0, 1]
+  3. montecarlo_equity converge a exact_equity
+  4. get_equity_cached elige enumeración exacta en river y la comparte entre presupuestos
+  5. montecarlo_equity multiway y por bloques
+  6. canonical_hand_board: invariante bajo permutación de palos
+  7. get_equity_cached comparte entradas isomorfas y mejora la precisión in situ
+  8. EquityStore persiste entre conexiones y get_equity_cached lo reutiliza
+  9. LRUCache: expulsión LRU real, métricas de aciertos/fallos y uso desde varios hilos
+ 10. Precisión adaptativa: spots claros paran pronto, marginales agotan el máximo
+ 11. Registro de cachés: todas las de abstracción/equity, bytes y latencia de fallos
+ 12. Cada hijo de un fork muestrea con un generador distinto
+ 13. EquityStore tras un fork: el hijo abre su propia conexión, no vuelca lo
+     pendiente del padre y escribe lo suyo al salir (sin atexit)
+"""
+
+import os
+import sys
+import tempfile
+from itertools import combinations
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+if _DIR not in sys.path:
+    sys.path.insert(0, _DIR)
+
+import numpy as np
+
+import montecarlo
+from montecarlo import (
+    exact_equity, generar_baraja_compacta, get_equity_cached, montecarlo_equity,
+)
+from template import eval_hand_from_strings
+from abstracciones.suit_isomorphism import canonical_hand_board
+
+
+# ── Test 1: river exacto ──────────────────────────────────────────────────────
+
+def test_exact_river_matches_enumeration():
+    hole  = ['Ah', 'Kd']
+    board = ['2c', '7h', 'Qs', 'Td', '3s']
+    deck  = [c for c in generar_baraja_compacta() if c not in hole + board]
+    me    = eval_hand_from_strings(hole, board)
+    total = 0.0
+    for opp in combinations(deck, 2):
+        s = eval_hand_from_strings(list(opp), board)
+        total += 1.0 if me > s else 0.5 if me == s else 0.0
+    assert abs(exact_equity(hole, board) - total / 990) < 1e-12
+    print("PASS test_exact_river_matches_enumeration")
+
+
+# ── Test 2: turn exacto ───────────────────────────────────────────────────────
+
+def test_exact_turn():
+    # Escalera real ya hecha en el turn: gana todos los runouts
+    assert exact_equity(['Ah', 'Kh'], ['Qh', 'Jh', 'Th', '2c']) == 1.0
+    eq = exact_equity(['7c', '2d'], ['Ah', 'Kh', 'Qd', '9s'])
+    assert 0.0 <= eq < 0.2, eq
+    print("PASS test_exact_turn")
+
+
+# ── Test 3: Monte Carlo converge a exacto ─────────────────────────────────────
+
+def test_montecarlo_close_to_exact():
+    hole, board = ['Jc', 'Jd'], ['9h', '5s', '2c', 'Kd']
+    exact = exact_equity(hole, board)
+    mc    = montecarlo_equity(hole, board, num_players=2, num_simulations=20000)
+    assert abs(mc - exact) < 0.02, (mc, exact)
+    print("PASS test_montecarlo_close_to_exact")
+
+
+# ── Test 4: selección automática en get_equity_cached ─────────────────────────
+
+def test_cached_picks_exact_on_river():
+    montecarlo._equity_cache.clear()
+    hole, board = ['Ah', 'Kd'], ['2c', '7h', 'Qs', 'Td', '3s']
+    eq = get_equity_cached(hole, board, 2, 5000)
+    assert eq == exact_equity(hole, board)
+    assert get_equity_cached(hole, board, 2, 2000) == eq
+    assert len(montecarlo._equity_cache) == 1
+    # Preflop y multiway siguen por Monte Carlo
+    assert not montecarlo._prefer_exact(0, 2, 5000)
+    assert not montecarlo._prefer_exact(5, 3, 5000)
+    print("PASS test_cached_picks_exact_on_river")
+
+
+# ── Test 5: multiway vectorizado ──────────────────────────────────────────────
+
+def test_montecarlo_multiway_and_chunks():
+    # Escalera real en la mesa: todos empatan con cualquier número de rivales
+    board = ['Ah', 'Kh', 'Qh', 'Jh', 'Th']
+    assert montecarlo_equity(['2c', '3d'], board, num_players=6, num_simulations=500) == 0.5
+    # AA contra 2 rivales aleatorios ≈ 0.73
+    eq = montecarlo_equity(['As', 'Ad'], [], num_players=3, num_simulations=20000)
+    assert 0.70 < eq < 0.76, eq
+    old_chunk = montecarlo._MC_CHUNK
+    montecarlo._MC_CHUNK = 333
+    try:
+        eq = montecarlo_equity(['As', 'Ad'], [], num_players=3, num_simulations=5000)
+    finally:
+        montecarlo._MC_CHUNK = old_chunk
+    assert 0.69 < eq < 0.77, eq
+    print("PASS test_montecarlo_multiway_and_chunks")
+
+
+# ── Test 6: canonicalización de palos ─────────────────────────────────────────
+
+def test_canonical_hand_board():
+    a = canonical_hand_board(['Ah', 'Kh'], ['2c', '7d', '9s'])
+    assert a == canonical_hand_board(['Ks', 'As'], ['9d', '2h', '7c'])
+    # Suited vs offsuit y color posible vs no: claves distintas
+    assert a != canonical_hand_board(['Ah', 'Kd'], ['2c', '7d', '9s'])
+    assert a != canonical_hand_board(['Ah', 'Kh'], ['2h', '7d', '9s'])
+    # Todas las permutaciones de palos dan la misma clave
+    from itertools import permutations
+    hole, board = ['Qs', 'Js'], ['Ts', '9h', '2h', '2d']
+    keys = set()
+    for perm in permutations('shdc'):
+        m = dict(zip('shdc', perm))
+        keys.add(canonical_hand_board([c[0] + m[c[1]] for c in hole],
+                                      [c[0] + m[c[1]] for c in board]))
+    assert len(keys) == 1, keys
+    print("PASS test_canonical_hand_board")
+
+
+# ── Test 7: caché canónica con mejora de precisión ────────────────────────────
+
+def test_cache_isomorphic_and_upgrade():
+    montecarlo._equity_cache.clear()
+    eq1 = get_equity_cached(['Ah', 'Kh'], ['2c', '7d', '9s'], 2, 500)
+    eq2 = get_equity_cached(['As', 'Ks'], ['2h', '7c', '9d'], 2, 300)
+    assert eq1 == eq2 and len(montecarlo._equity_cache) == 1
+    key = next(iter(montecarlo._equity_cache))
+    get_equity_cached(['Ad', 'Kd'], ['2s', '7h', '9c'], 2, 2000)
+    assert len(montecarlo._equity_cache) == 1
+    assert montecarlo._equity_cache[key][1] == 2000
+    print("PASS test_cache_isomorphic_and_upgrade")
+
+
+# ── Test 8: almacén persistente ────────────────────────────────────────────────
+
+def test_equity_store_persistence():
+    from equity_store import EquityStore
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'eq.sqlite')
+        key  = (('Ah', 'Ks'), ('2s', '7h', '9d'), 2)
+        st   = EquityStore(path, flush_every=2)
+        st.put(key, 0.6, 500)
+        st.put(key, 0.1, 100)            # menos simulaciones: se ignora
+        st.close()
+        st = EquityStore(path)
+        assert st.get(key) == (0.6, 500.0)
+        st.close()
+
+        # Integración: un "proceso" nuevo (caché en memoria vacía) lee de disco
+        montecarlo._equity_cache.clear()
+        montecarlo.enable_equity_store(path)
+        try:
+            eq = get_equity_cached(['Qc', 'Qd'], ['2h', '5s', '9c'], 2, 800)
+            montecarlo.disable_equity_store()
+            montecarlo._equity_cache.clear()
+            montecarlo.enable_equity_store(path)
+            assert get_equity_cached(['Qh', 'Qs'], ['2d', '5c', '9h'], 2, 500) == eq
+        finally:
+            montecarlo.disable_equity_store()
+            montecarlo._equity_cache.clear()
+    print("PASS test_equity_store_persistence")
+
+
+# ── Test 9: LRU con métricas ──────────────────────────────────────────────────
+
+def test_lru_cache_metrics():
+    from cache_metrics import LRUCache
+    c = LRUCache(maxsize=2)
+    c.put('a', 1, cost=0.5)
+    c.put('b', 2)
+    assert c.get('a') == 1                # 'a' pasa a ser la más reciente
+    c.put('c', 3)                         # expulsa 'b', no 'a'
+    assert 'a' in c and 'b' not in c and c.evictions == 1
+    assert c.get('b') is None
+    assert c.get('a', valid=lambda v: v > 5) is None   # precisión insuficiente
+    st = c.stats()
+    assert (st['hits'], st['misses'], st['size']) == (1, 2, 2), st
+    assert st['time_saved_s'] == 0.5
+
+    # Otro hilo (petición de Flask) inserta entre la lectura y move_to_end de
+    # get(): con el lock espera a que get() termine en lugar de expulsar la
+    # clave a medias (KeyError)
+    import threading
+    c, others = LRUCache(maxsize=4), []
+
+    def evict_meanwhile(v):
+        th = threading.Thread(target=lambda: [c.put(('x', i), i) for i in range(4)])
+        th.start()
+        th.join(timeout=0.2)
+        others.append(th)
+        return True
+
+    c.put('k', 1)
+    assert c.get('k', valid=evict_meanwhile) == 1
+    others[0].join()
+    assert 'k' not in c and len(c) == 4 and c.evictions == 1
+
+    montecarlo._equity_cache.clear()
+    montecarlo.reset_equity_cache_stats()
+    get_equity_cached(['9c', '9d'], ['Ah', '7s', '2d', 'Kc', '4h'], 2, 500)
+    get_equity_cached(['9h', '9s'], ['Ad', '7c', '2h', 'Ks', '4d'], 2, 500)
+    st = montecarlo.equity_cache_stats()
+    assert (st['hits'], st['misses']) == (1, 1), st
+    print("PASS test_lru_cache_metrics")
+
+
+# ── Test 10: precisión adaptativa ─────────────────────────────────────────────
+
+def test_adaptive_stopping():
+    old_rng = montecarlo._rng
+    montecarlo._rng = np.random.default_rng(3)
+    try:
+        # Spot claro: AA en board seco frente a umbral 0.5 → para en el primer bloque
+        eq, n = montecarlo._sample_equity(['Ah', 'Ad'], ['Kh', '7c', '2d'], 2, 5000,
+                                          thresholds=0.5)
+        assert n == montecarlo._ADAPTIVE_CHUNK and eq > 0.8, (eq, n)
+        # Spot marginal: umbrales pegados a la equity real → agota el máximo
+        hole, board = ['9h', '8h'], ['Th', '7c', '2d', 'Ks']
+        exact = exact_equity(hole, board)
+        eq, n = montecarlo._sample_equity(hole, board, 2, 3000,
+                                          thresholds=(exact - 0.005, exact + 0.005))
+        assert n == 3000, n
+        # Error estándar objetivo
+        eq, n = montecarlo._sample_equity(hole, board, 2, 20000, target_se=0.02)
+        assert n < 20000 and (eq * (1 - eq) / n) ** 0.5 < 0.025, (eq, n)
+
+        # La caché sirve una entrada que ya decide y no re-simula
+        montecarlo._equity_cache.clear()
+        eq1 = get_equity_cached(['Ah', 'Ad'], ['Kh', '7c', '2d'], 2, 5000, thresholds=0.5)
+        assert montecarlo._equity_cache.peek(next(iter(montecarlo._equity_cache)))[1] < 5000
+        assert get_equity_cached(['As', 'Ac'], ['Ks', '7h', '2c'], 2, 5000,
+                                 thresholds=0.5) == eq1
+    finally:
+        montecarlo._rng = old_rng
+        montecarlo._equity_cache.clear()
+    print("PASS test_adaptive_stopping")
+
+
+# ── Test 11: registro de cachés ───────────────────────────────────────────────
+
+def test_cache_registry():
+    import cache_metrics
+    import abstracciones.card_abstractor as ca
+    from cache_metrics import LRUCache, all_stats, cache_report, register, unregister
+
+    names = [st['name'] for st in all_stats()]
+    for name in ('equity', 'postflop_bucket', 'preflop_ehs', 'river_opponents', 'bucket_table'):
+        assert name in names, names
+
+    c = register(LRUCache(maxsize=2, name='_test'))
+    try:
+        c.put('a', np.zeros(1000), cost=0.25)
+        c.put('b', np.zeros(1000), cost=0.5)
+        c.put('c', np.zeros(1000))                   # expulsa 'a'
+        st = next(s for s in all_stats() if s['name'] == '_test')
+        assert st['miss_time_s'] == 0.75 and st['evictions'] == 1
+        assert 16000 <= st['bytes'] < 20000, st['bytes']     # 2 × 8 KB de datos
+        register('_fn', lambda: {'size': 3, 'hits': 7})
+        st = next(s for s in all_stats() if s['name'] == '_fn')
+        assert (st['size'], st['hits'], st['misses'], st['bytes']) == (3, 7, 0, 0)
+
+        board = ['2c', '7h', 'Qs', 'Td', '3s']
+        ca.clear_postflop_cache()
+        cache_metrics.reset_all_stats()
+        ca.postflop_bucket(['Ah', 'Kd'], board)
+        ca.postflop_bucket(['As', 'Kd'], ['2c', '7s', 'Qh', 'Td', '3h'])    # isomorfa
+        st = {s['name']: s for s in all_stats()}['postflop_bucket']
+        assert (st['hits'], st['misses'], st['size']) == (1, 1, 1), st
+        assert st['miss_time_s'] > 0 and st['bytes'] > 0
+        report = cache_report()
+        assert 'postflop_bucket' in report and '_test' in report
+    finally:
+        unregister('_test')
+        unregister('_fn')
+        ca.clear_postflop_cache()
+    print("PASS test_cache_registry")
+
+
+# ── Test 12: generador por proceso ────────────────────────────────────────────
+
+def _child_draw(_):
+    return float(montecarlo._rng.random())
+
+
+def test_rng_reseeded_after_fork():
+    import multiprocessing as mp
+    with mp.get_context('fork').Pool(2) as pool:
+        draws = pool.map(_child_draw, range(2), chunksize=1)
+    assert len(set(draws + [_child_draw(0)])) == 3, draws
+    print("PASS test_rng_reseeded_after_fork")
+
+
+# ── Test 13: almacén persistente en procesos hijos ────────────────────────────
+
+def _child_equities():
+    get_equity_cached(['Ah', 'Kd'], ['2c', '7h', 'Qs'], 2, 300)
+    get_equity_cached(['9s', '9d'], ['2c', '7h', 'Qs'], 2, 300)
+
+
+def test_equity_store_after_fork():
+    import multiprocessing as mp
+    from equity_store import EquityStore
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'eq.sqlite')
+        montecarlo._equity_cache.clear()
+        store = montecarlo.enable_equity_store(path)
+        try:
+            store.put((('Qc', 'Qd'), ('2h', '5s', '9c'), 2), 0.8, 100)     # pendiente del padre
+            proc = mp.get_context('fork').Process(target=_child_equities)
+            proc.start()
+            proc.join()
+            assert proc.exitcode == 0
+            check = EquityStore(path)
+            assert len(check) == 2, len(check)           # sólo las del hijo
+            montecarlo.disable_equity_store()
+            assert len(check) == 3
+            check.close()
+        finally:
+            montecarlo.disable_equity_store()
+            montecarlo._equity_cache.clear()
+    print("PASS test_equity_store_after_fork")
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    tests = [
+        test_exact_river_matches_enumeration,
+        test_exact_turn,
+        test_montecarlo_close_to_exact,
+        test_cached_picks_exact_on_river,
+        test_montecarlo_multiway_and_chunks,
+        test_canonical_hand_board,
+        test_cache_isomorphic_and_upgrade,
+        test_equity_store_persistence,
+        test_lru_cache_metrics,
+        test_adaptive_stopping,
+        test_cache_registry,
+        test_rng_reseeded_after_fork,
+        test_equity_store_after_fork,
+    ]
+    failed = []
+    for t in tests:
+        try:
+            t()
+        except Exception as e:
+            print(f"FAIL {t.__name__}: {e}")
+            failed.append(t.__name__)
+
+    print(f"\n{'='*50}")
+    print(f"Tests equity: {len(tests) - len(failed)}/{len(tests)} PASARON")
+    if failed:
+        print(f"Fallidos: {failed}")
+        sys.exit(1)
+    else:
+        print("Todos los tests pasaron.")
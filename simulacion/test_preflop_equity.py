@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests unitarios para la matriz de equity preflop (preflop_equity.py)
+
+Verifica:
+  1. Las 169 clases y el índice de una mano concreta
+  2. La agregación por board coincide con la comparación par a par
+  3. Los boards canónicos cubren los C(52,5) boards
+  4. Valores conocidos y consistencia de la matriz (si está construida)
+  5. Tabla EHS distribuida (abstracciones/preflop_ehs.json): checksum,
+     precarga en preflop_bucket y rechazo de un fichero alterado
+"""
+
+import os
+import sys
+from math import comb
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+if _DIR not in sys.path:
+    sys.path.insert(0, _DIR)
+
+import numpy as np
+import preflop_equity as pe
+from tablas_eval import eval_batch
+
+
+# ── Test 1: clases ────────────────────────────────────────────────────────────
+
+def test_hand_classes():
+    assert len(set(pe.HAND_CLASSES)) == 169
+    assert pe.hand_class_index(['Ah', 'Ad']) == pe.HAND_CLASSES.index('AA') == 0
+    assert pe.HAND_CLASSES[pe.hand_class_index(['Kh', 'Ah'])] == 'AKs'
+    assert pe.HAND_CLASSES[pe.hand_class_index(['2c', '7d'])] == '72o'
+    assert np.bincount(pe._COMBO_CLASS).tolist().count(6) == 13      # parejas
+    assert np.bincount(pe._COMBO_CLASS).tolist().count(4) == 78      # suited
+    print("PASS test_hand_classes")
+
+
+# ── Test 2: agregación por board ──────────────────────────────────────────────
+
+def test_board_scores_match_pairwise():
+    board = np.array([0, 17, 34, 51, 22])
+    got   = pe._board_scores(board)
+
+    c     = pe._COMBOS[~np.isin(pe._COMBOS, board).any(axis=1)]
+    r     = eval_batch(np.concatenate([c, np.broadcast_to(board, (len(c), 5))], axis=1))
+    r     = r.astype(np.int64)
+    dis   = ((c[:, 0, None] != c[None, :, 0]) & (c[:, 0, None] != c[None, :, 1]) &
+             (c[:, 1, None] != c[None, :, 0]) & (c[:, 1, None] != c[None, :, 1]))
+    val   = ((r[:, None] > r[None, :]) + 0.5 * (r[:, None] == r[None, :])) * dis
+    cls   = [pe._class_of(a >> 2, a & 3, b >> 2, b & 3) for a, b in c]
+    oh    = np.zeros((len(c), 169))
+    oh[np.arange(len(c)), cls] = 1.0
+    assert np.allclose(got, oh.T @ val @ oh)
+    print("PASS test_board_scores_match_pairwise")
+
+
+# ── Test 3: boards canónicos ──────────────────────────────────────────────────
+
+def test_canonical_boards():
+    boards, weights = pe.canonical_boards()
+    assert len(boards) == 134459
+    assert weights.sum() == comb(52, 5)
+    print("PASS test_canonical_boards")
+
+
+# ── Test 4: matriz construida ─────────────────────────────────────────────────
+
+def test_matrix_values():
+    if not pe.available():
+        print("SKIP test_matrix_values (python preflop_equity.py)")
+        return
+    assert abs(pe.equity_vs_hand(['Ah', 'Ad'], ['Kc', 'Kd']) - 0.8195) < 0.001
+    assert abs(pe.equity_vs_random(['Ah', 'Ad']) - 0.8520) < 0.001
+    assert abs(pe.equity_vs_random(['7c', '2d']) - 0.3460) < 0.001
+    m, p = np.asarray(pe.equity_matrix()), pe._pair_counts()
+    assert np.allclose((m + m.T)[p > 0], 1.0)
+    w1, w2 = np.zeros(169), np.zeros(169)
+    w1[pe.hand_class_index('AKs')] = 1.0
+    w2[pe.hand_class_index('QQ')]  = 1.0
+    assert abs(pe.range_vs_range(w1, w2) - pe.equity_vs_hand('AKs', 'QQ')) < 1e-12
+    assert abs(pe.range_vs_range(w1, np.ones(169)) - pe.equity_vs_random('AKs')) < 1e-12
+    print("PASS test_matrix_values")
+
+
+# ── Test 5: tabla EHS distribuida ─────────────────────────────────────────────
+
+def test_shipped_preflop_ehs():
+    import json
+    import tempfile
+    import warnings
+    from abstracciones import preflop_ehs
+    import abstracciones.card_abstractor as ca
+
+    table = preflop_ehs.load_preflop_ehs()
+    assert table is not None and list(table) == pe.HAND_CLASSES
+    assert abs(table['AA'] - 0.8520) < 0.001 and abs(table['72o'] - 0.3458) < 0.001
+    if pe.available():
+        assert np.allclose([table[c] for c in pe.HAND_CLASSES], pe.vs_random_vector(), atol=1e-6)
+
+    assert len(ca._preflop_ehs_cache) >= 169
+    assert ca._preflop_ehs_cache[('A', 'K', True)] == table['AKs']
+    assert ca._preflop_ehs_cache[('7', '2', False)] == table['72o']
+
+    with open(preflop_ehs.PREFLOP_EHS_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+    data['ehs'][0] = 0.5
+    path = os.path.join(tempfile.mkdtemp(), 'preflop_ehs.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        assert preflop_ehs.load_preflop_ehs(path) is None
+    assert caught and 'checksum' in str(caught[0].message)
+    print("PASS test_shipped_preflop_ehs")
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    tests = [
+        test_hand_classes,
+        test_board_scores_match_pairwise,
+        test_canonical_boards,
+        test_matrix_values,
+        test_shipped_preflop_ehs,
+    ]
+    failed = []
+    for t in tests:
+        try:
+            t()
+        except Exception as e:
+            print(f"FAIL {t.__name__}: {e}")
+            failed.append(t.__name__)
+
+    print(f"\n{'='*50}")
+    print(f"Tests equity preflop: {len(tests) - len(failed)}/{len(tests)} PASARON")
+    if failed:
+        print(f"Fallidos: {failed}")
+        sys.exit(1)
+    else:
+        print("Todos los tests pasaron.")
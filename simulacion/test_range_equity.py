@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests unitarios para la equity contra rangos (range_equity.py)
+
+Verifica:
+  1. Mano vs rango ponderado en river = comparación manual combo a combo
+  2. Mano vs rango completo = exact_equity (turn y flop)
+  3. Rango vs rango: simetría E(A,B) + E(B,A) = 1
+  4. Construcción de rangos (notación, preflop_ranges.json, opponent model)
+  5. Mismo resultado con otros backends del evaluador (escala fuera de 0..7462)
+  6. Cada hijo de un fork muestrea runouts con un generador distinto
+"""
+
+import os
+import sys
+from itertools import combinations
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+if _DIR not in sys.path:
+    sys.path.insert(0, _DIR)
+
+import numpy as np
+import range_equity as rq
+from montecarlo import exact_equity, generar_baraja_compacta
+from template import eval_hand_from_strings
+
+
+# ── Test 1: river ponderado ───────────────────────────────────────────────────
+
+def test_river_weighted_matches_manual():
+    hole, board = ['Ah', 'Kd'], ['2c', '7h', 'Qs', 'Td', '3s']
+    rng  = np.random.default_rng(5)
+    w    = rng.random(rq.N_COMBOS)
+    deck = [c for c in generar_baraja_compacta() if c not in hole + board]
+    me   = eval_hand_from_strings(hole, board)
+    num = den = 0.0
+    for opp in combinations(deck, 2):
+        wi  = w[rq.combo_index(list(opp))]
+        s   = eval_hand_from_strings(list(opp), board)
+        num += wi * (1.0 if me > s else 0.5 if me == s else 0.0)
+        den += wi
+    assert abs(rq.hand_vs_range(hole, board, w) - num / den) < 1e-12
+    print("PASS test_river_weighted_matches_manual")
+
+
+# ── Test 2: rango completo = equity exacta ────────────────────────────────────
+
+def test_full_range_matches_exact():
+    full = np.ones(rq.N_COMBOS)
+    for hole, board in ((['Jc', 'Jd'], ['9h', '5s', '2c', 'Kd']),
+                        (['Ah', 'Kd'], ['2c', '7h', 'Qs'])):
+        assert abs(rq.hand_vs_range(hole, board, full) - exact_equity(hole, board)) < 1e-12
+    print("PASS test_full_range_matches_exact")
+
+
+# ── Test 3: simetría rango vs rango ───────────────────────────────────────────
+
+def test_range_vs_range_symmetry():
+    board = ['2c', '7h', 'Qs', 'Td']
+    a = rq.weights_from_hands(['QQ+', 'AK'])
+    b = rq.weights_from_hands(['TT', '99', 'KQs', 'JTs'])
+    assert abs(rq.range_vs_range(a, b, board) + rq.range_vs_range(b, a, board) - 1.0) < 1e-9
+    print("PASS test_range_vs_range_symmetry")
+
+
+# ── Test 4: construcción de rangos ────────────────────────────────────────────
+
+def test_range_construction():
+    assert rq.weights_from_hands(['QQ+']).sum() == 18
+    assert rq.weights_from_hands(['AK']).sum() == 16
+    assert rq.weights_from_hands(['ATs+', 'AsAh']).sum() == 17
+    assert rq.weights_from_hands([]).sum() == rq.N_COMBOS
+    assert abs(rq.top_range(0.25).sum() - 0.25 * rq.N_COMBOS) < 1e-9
+
+    from tablas_preflop import get_rival_range
+    w = get_rival_range('SB', 'open')
+    assert w.shape == (rq.N_COMBOS,) and w[rq.combo_index('AsAh')] == 1.0
+
+    from opponent_model import OpponentModel
+    r = OpponentModel().estimated_range()
+    assert abs(r.sum() - 0.5 * rq.N_COMBOS) < 1e-9          # VPIP por defecto 50 %
+    print("PASS test_range_construction")
+
+
+# ── Test 5: escala del evaluador ──────────────────────────────────────────────
+
+def test_evaluator_scale_independent():
+    import template
+    villain = rq.weights_from_hands(['TT+', 'AQ+', 'KQs', '76s'])
+    river   = ['2c', '7h', 'Qs', 'Td', '3s']          # sin escaleras posibles
+    ref = [(b, rq.combo_showdown(b, villain)) for b in (river, river[:4])]
+
+    # Valores del orden de los HandVal de la librería C
+    base = rq.eval_hands_batch
+    rq.eval_hands_batch = lambda hole, board: 5_000_000 + 4_099 * base(hole, board)
+    try:
+        for board, (win, tot) in ref:
+            w2, t2 = rq.combo_showdown(board, villain)
+            np.testing.assert_allclose(w2, win, rtol=1e-12)
+            np.testing.assert_allclose(t2, tot, rtol=1e-12)
+    finally:
+        rq.eval_hands_batch = base
+
+    # Evaluador puro Python (escala 13⁵ por categoría)
+    tablas, template._tablas_eval = template._tablas_eval, None
+    try:
+        if template._lib is None:
+            w2, t2 = rq.combo_showdown(river, villain)
+            np.testing.assert_allclose(w2, ref[0][1][0], rtol=1e-12)
+            np.testing.assert_allclose(t2, ref[0][1][1], rtol=1e-12)
+    finally:
+        template._tablas_eval = tablas
+    print("PASS test_evaluator_scale_independent")
+
+
+# ── Test 6: generador por proceso ─────────────────────────────────────────────
+
+def _child_draw(_):
+    return float(rq._rng.random())
+
+
+def test_rng_reseeded_after_fork():
+    import multiprocessing as mp
+    with mp.get_context('fork').Pool(2) as pool:
+        draws = pool.map(_child_draw, range(2), chunksize=1)
+    assert len(set(draws + [_child_draw(0)])) == 3, draws
+    print("PASS test_rng_reseeded_after_fork")
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    tests = [
+        test_river_weighted_matches_manual,
+        test_full_range_matches_exact,
+        test_range_vs_range_symmetry,
+        test_range_construction,
+        test_evaluator_scale_independent,
+        test_rng_reseeded_after_fork,
+    ]
+    failed = []
+    for t in tests:
+        try:
+            t()
+        except Exception as e:
+            print(f"FAIL {t.__name__}: {e}")
+            failed.append(t.__name__)
+
+    print(f"\n{'='*50}")
+    print(f"Tests equity por rangos: {len(tests) - len(failed)}/{len(tests)} PASARON")
+    if failed:
+        print(f"Fallidos: {failed}")
+        sys.exit(1)
+    else:
+        print("Todos los tests pasaron.")
@@ -9,6 +9,7 @@ GET  /api/estado         → Estado JSON de la mano actual
 POST /api/accion         → Aplica acción del humano (fold/call/check/raise/all_in)
 POST /api/nueva_mano     → Siguiente mano tras ver resultado
 GET  /api/stats          → Stats del oponente model (VPIP, PFR, AF, …)
+GET  /api/cache_stats    → Métricas de las cachés de equity y abstracción (aciertos, bytes, …)
 POST /api/recargar_blueprint → Recarga el blueprint desde disco
 
 Diseño
@@ -56,7 +57,7 @@ except Exception:
     _ABSTRACTOR_AVAILABLE = False
 
 try:
-    from template import eval_hand_from_strings
+    from template import cards_to_ints, eval_hands_batch
     _EVAL_AVAILABLE = True
 except Exception:
     _EVAL_AVAILABLE = False
@@ -168,18 +169,8 @@ def _online_learn(hand_sb, hand_bb, community, deck_fill,
                 None, hands, boards, sims=bucket_sims
             ) if False else _blueprint._precompute_buckets(hands, boards, sims=bucket_sims)
 
-            init_kwargs = dict(
-                bkts=bkts, boards=boards,
-                street_idx=0, pot=1.5,
-                stacks=[99.5, 99.0],
-                contribs=[0.5, 1.0],
-                bet_hist=[], n_raises=0,
-                to_call=0.5, position=0,
-            )
             for _ in range(n_iters // 2):
-                for traverser in [0, 1]:
-                    _blueprint._cfr(traverser, **init_kwargs)
-                _blueprint.iterations += 1
+                _blueprint.train_on(bkts)
 
         _hands_since_save += 1
         if _hands_since_save >= _SAVE_EVERY_N_HANDS:
@@ -526,11 +517,14 @@ class PartidaWeb:
 
         if _EVAL_AVAILABLE and len(board) >= 3:
             try:
-                rank0 = eval_hand_from_strings(h0 + board)
-                rank1 = eval_hand_from_strings(h1 + board)
-                if rank0 < rank1:
+                # Ambas manos en una sola llamada (convención: mayor = mejor)
+                rank0, rank1 = eval_hands_batch(
+                    np.stack([cards_to_ints(h0), cards_to_ints(h1)]),
+                    np.tile(cards_to_ints(board), (2, 1)),
+                ).tolist()
+                if rank0 > rank1:
                     winner = 0
-                elif rank1 < rank0:
+                elif rank1 > rank0:
                     winner = 1
                 else:
                     winner = -1  # split
@@ -1043,6 +1037,17 @@ def stats():
     })
 
 
+@app.route('/api/cache_stats', methods=['GET'])
+def cache_stats():
+    """Métricas de las cachés del proceso (para dimensionarlas en producción)."""
+    try:
+        from montecarlo import equity_cache_stats
+        from cache_metrics import all_stats
+    except Exception:
+        return jsonify({"disponible": False})
+    return jsonify({"disponible": True, "equity": equity_cache_stats(), "caches": all_stats()})
+
+
 @app.route('/api/recargar_blueprint', methods=['POST'])
 def recargar_blueprint():
     """Recarga el blueprint desde disco (útil tras continuar entrenamiento)."""